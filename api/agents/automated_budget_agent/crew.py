@@ -1,6 +1,6 @@
 from tabulate import tabulate
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task,tool
+from crewai.project import CrewBase, agent, before_kickoff, crew, task,tool
 from crewai_tools import CSVSearchTool
 from dotenv import load_dotenv
 import os
@@ -21,8 +21,25 @@ class AutomatedBudgetingAgent:
         )
         return csv_search_tool
 
-    def __init__(self, inputs):
-        self.csv_search_tool = self.create_csv_search_tool(inputs["file_path"])
+    def __init__(self, inputs, analyze=None):
+        """
+        analyze(file_path) returns the budget figures computed from the file, with
+        lines_of_business() and to_markdown(); the API passes its pandas analytics.
+        With it the file is never embedded and the analysis task is skipped.
+        """
+        self.analyze = analyze
+        self.csv_search_tool = None if analyze else self.create_csv_search_tool(inputs["file_path"])
+
+    @before_kickoff
+    def add_budget_analysis(self, inputs):
+        """
+        Compute the budget figures up front, so the agents only write the narrative and market adjustments.
+        """
+        if self.analyze:
+            analysis = self.analyze(inputs["file_path"])
+            inputs["lines_of_business"] = ", ".join(analysis.lines_of_business())
+            inputs["budget_analysis"] = analysis.to_markdown()
+        return inputs
 
     @agent
     def researcher(self) -> Agent:
@@ -31,7 +48,7 @@ class AutomatedBudgetingAgent:
         """
         return Agent(
             config=self.agents_config['researcher'],
-            tools=[self.csv_search_tool],
+            tools=[self.csv_search_tool] if self.csv_search_tool else [],
             verbose=True
         )
 
@@ -64,6 +81,13 @@ class AutomatedBudgetingAgent:
         """
         Task to research market trends for each line of business in the specified region.
         """
+        if self.analyze:
+            return Task(
+                config=self.tasks_config['research_market_task'],
+                agent=self.researcher(),
+                context=[],
+                description="Perform market research for each of these lines of business and generate insights specific to the region: {lines_of_business}."
+            )
         return Task(
             config=self.tasks_config['research_market_task'],
             agent=self.researcher(),
@@ -76,6 +100,17 @@ class AutomatedBudgetingAgent:
         """
         Task to generate a 12-month forecast based on analyzed data and market research.
         """
+        if self.analyze:
+            return Task(
+                config=self.tasks_config['generate_forecast_task'],
+                agent=self.forecaster(),
+                context=[self.research_market()],
+                description=(
+                    "Generate a 12-month forecast from the budget figures below and the regional market trends. "
+                    "Start from the baseline forecast, adjust it for the market research and explain each adjustment; "
+                    "do not recompute the historical figures.\n\n{budget_analysis}"
+                )
+            )
         return Task(
             config=self.tasks_config['generate_forecast_task'],
             agent=self.forecaster(),
@@ -92,7 +127,7 @@ class AutomatedBudgetingAgent:
         """
         return Crew(
             agents=self.agents,
-            tasks=self.tasks,
+            tasks=[self.research_market(), self.generate_forecast()] if self.analyze else self.tasks,
             process=Process.sequential,
             verbose=True
         )
@@ -10,24 +10,21 @@ class ChatCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    # Class-level variable to persist the PDF search tool across queries
-    pdf_search_tool = None
-
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, pdf_search_tool=None):
         """
         Initialize the crew and set up the PDF search tool.
+        A prebuilt (already indexed) search tool for the same PDF can be passed in.
         """
-        if ChatCrew.pdf_search_tool is None or ChatCrew.pdf_search_tool.pdf_path != pdf_path:
-            ChatCrew.pdf_search_tool = PDFSearchTool(
-                pdf=pdf_path,
-                config=dict(
-                    llm=dict(provider="openai"),
-                    embedder=dict(
-                        provider="openai",
-                        config=dict(model="text-embedding-ada-002")
-                    )
+        self.pdf_search_tool = pdf_search_tool or PDFSearchTool(
+            pdf=pdf_path,
+            config=dict(
+                llm=dict(provider="openai"),
+                embedder=dict(
+                    provider="openai",
+                    config=dict(model="text-embedding-ada-002")
                 )
             )
+        )
 
     @agent
     def scraper(self) -> Agent:
@@ -36,7 +33,7 @@ class ChatCrew:
         """
         return Agent(
             config=self.agents_config['scraper'],
-            tools=[ChatCrew.pdf_search_tool],
+            tools=[self.pdf_search_tool],
             verbose=True
         )
 
@@ -48,7 +45,7 @@ class ChatCrew:
         return Agent(
             config=self.agents_config['query_resolver'],
             verbose=True,
-            tools=[ChatCrew.pdf_search_tool],
+            tools=[self.pdf_search_tool],
 
         )
 
@@ -1,13 +1,22 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 from dotenv import load_dotenv
-from docx import Document  # For .docx files
-from PyPDF2 import PdfReader  # For PDF files
-import re
-import os
+from pydantic import BaseModel, Field
+from typing import List, Literal
+from utils.text_extraction import clean_document_text
 
 load_dotenv()
 
+class RuleFinding(BaseModel):
+    """How the claim stands against one rule"""
+    rule: str = Field(..., description="The rule, quoted or briefly restated")
+    status: Literal["compliant", "violated"] = Field(..., description="Whether the claim complies with or violates the rule")
+    reason: str = Field(..., description="Why, citing the claim")
+
+class ClaimAnalysis(BaseModel):
+    """Rule-by-rule analysis of a claim"""
+    findings: List[RuleFinding] = Field(..., description="One finding per rule")
+
 @CrewBase
 class ClaimsProcessor:
     """Claims Processing Agent"""
@@ -15,6 +24,13 @@ class ClaimsProcessor:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self, extract_text=clean_document_text):
+        """
+        extract_text(file_path) returns a document's cleaned text; by default the
+        shared, cached extractor, which cleans each page as it is read.
+        """
+        self.extract_text = extract_text
+
     @before_kickoff
     def preprocess_inputs(self, inputs):
         """
@@ -22,71 +38,35 @@ class ClaimsProcessor:
         """
         rules_path = inputs.get('rules_document')
         claims_path = inputs.get('claims_document')
+        # rules registered ahead of time arrive already extracted and cleaned
+        rules_text = inputs.get('rules_text')
 
-        if not rules_path or not claims_path:
+        if not (rules_path or rules_text) or not claims_path:
             raise ValueError("Both rules_document and claims_document paths must be provided!")
 
-        print(f"Processing rules document: {rules_path}")
+        print(f"Processing rules document: {rules_path or 'precompiled'}")
         print(f"Processing claims document: {claims_path}")
 
         try:
-            # Extract rules from the predefined rules document
-            rules_text = self._extract_text_from_file(rules_path)
-            print("Extracted Rules:")
-            print(rules_text[:500])
+            if rules_text is None:
+                # Extract rules from the predefined rules document
+                rules_text = self.extract_text(rules_path)
+                print("Extracted Rules:")
+                print(rules_text[:500])
 
             # Extract claims content from the claims document
-            claims_text = self._extract_text_from_file(claims_path)
+            claims_text = self.extract_text(claims_path)
             print("Extracted Claims Content:")
             print(claims_text[:500])
 
-            # Clean extracted text
-            inputs['rules_text'] = self._clean_text(rules_text)
-            inputs['claims_text'] = self._clean_text(claims_text)
+            inputs['rules_text'] = rules_text
+            inputs['claims_text'] = claims_text
         except Exception as e:
             print(f"Error during preprocessing: {e}")
             raise ValueError("Failed to preprocess input documents.")
 
         return inputs
 
-    def _extract_text_from_file(self, file_path):
-        """
-        Detect the file type by extension and extract text accordingly.
-        """
-        file_extension = os.path.splitext(file_path)[-1].lower()
-        if file_extension == ".docx":
-            return self._extract_text_from_docx(file_path)
-        elif file_extension == ".pdf":
-            return self._extract_text_from_pdf(file_path)
-        elif file_extension == ".txt":
-            return self._extract_text_from_txt(file_path)
-        else:
-            raise ValueError(f"Unsupported file format: {file_extension}")
-
-    def _extract_text_from_docx(self, file_path):
-        """Extract text from .docx files."""
-        doc = Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-
-    def _extract_text_from_pdf(self, file_path):
-        """Extract text from PDF files."""
-        reader = PdfReader(file_path)
-        return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
-
-    def _extract_text_from_txt(self, file_path):
-        """Extract text from .txt files."""
-        with open(file_path, "r", encoding="utf-8") as file:
-            return file.read()
-
-    def _clean_text(self, text):
-        """
-        Clean the text by removing unnecessary punctuation and fixing spaces.
-        """
-        text = re.sub(r"[^\S\r\n]+", " ", text)  # Replace multiple spaces with a single space
-        text = re.sub(r"\s*\n\s*", "\n", text)  # Normalize newlines
-        text = re.sub(r"[^\w\s.,;:'\"!?()-]", "", text)  # Remove unnecessary punctuation
-        return text.strip()
-
     @after_kickoff
     def log_results(self, output):
         """
@@ -128,6 +108,7 @@ class ClaimsProcessor:
                 "claims_text": inputs["claims_text"]
             },
             async_execution=True,
+            output_pydantic=ClaimAnalysis,
             callback=lambda output: print(f"Analysis Task Output: {output}")
         )
 
@@ -21,6 +21,8 @@ llm = LLM(
 )
 
 
+search_tool = SerperDevTool()
+
 @CrewBase
 class CompetitorAnalysisAgent():
     """Competitor Analysis Agent for the insurance industry"""
@@ -33,7 +35,7 @@ class CompetitorAnalysisAgent():
         """Competitor Data Retrieval Agent"""
         return Agent(
             config=self.agents_config['competitor_data_agent'],
-            tools=[SerperDevTool(),WebsiteSearchTool()],
+            tools=[search_tool,WebsiteSearchTool()],
             verbose=True,
         )
 
@@ -42,7 +44,7 @@ class CompetitorAnalysisAgent():
         """Market Positioning Agent"""
         return Agent(
             config=self.agents_config['market_positioning_agent'],
-            tools=[SerperDevTool()],
+            tools=[search_tool],
             verbose=True,
         )
 
@@ -59,7 +61,7 @@ class CompetitorAnalysisAgent():
         """Competitor Comparison Agent"""
         return Agent(
             config=self.agents_config['competitor_comparison_agent'],
-            tools=[SerperDevTool()],
+            tools=[search_tool],
             verbose=True,
             llm=llm  
         )
@@ -6,6 +6,8 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+search_tool = SerperDevTool()
+
 @CrewBase
 class ContractOptimizationCrew:
     """Configuration for the Contract Optimization Crew."""
@@ -19,7 +21,7 @@ class ContractOptimizationCrew:
         """
         return Agent(
             config=self.agents_config['document_analysis_agent'],
-            tools=[SerperDevTool(),WebsiteSearchTool()],
+            tools=[search_tool,WebsiteSearchTool()],
             verbose=True,
             memory=False
         )
@@ -1,8 +1,8 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader
 import os
+from utils.text_extraction import extract_text as extract_document_text
 
 load_dotenv()
 
@@ -13,6 +13,12 @@ class ContractSummarizer:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self, extract_text=extract_document_text):
+        """
+        extract_text(file_path) returns a document's text; by default the shared, cached extractor.
+        """
+        self.extract_text = extract_text
+
     @before_kickoff
     def preprocess_inputs(self, inputs):
         """
@@ -27,8 +33,7 @@ class ContractSummarizer:
 
         # Extract text from the PDF
         try:
-            reader = PdfReader(file_path)
-            contract_text = "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
+            contract_text = self.extract_text(file_path)
             if not contract_text.strip():
                 raise ValueError("The provided PDF file is empty or unreadable.")
             
@@ -90,6 +90,8 @@ llm = LLM(
     api_key=os.getenv("OPENAI_API_KEY")
 )
 
+search_tool = SerperDevTool()
+
 @CrewBase
 class CustomerResearchCrew:
     """CustomerResearchCrew configuration"""
@@ -100,7 +102,7 @@ class CustomerResearchCrew:
     def data_collection_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['data_collection_agent'],
-            tools=[WebsiteSearchTool(), SerperDevTool()],
+            tools=[WebsiteSearchTool(), search_tool],
             verbose=True,
             llm=llm,
             memory=False
@@ -32,6 +32,9 @@ class SentimentReport(BaseModel):
     actionable_insights: str = Field(default="", description="Actionable insights summary")
 
 
+search_tool = SerperDevTool()
+scrape_tool = ScrapeWebsiteTool()
+
 @CrewBase
 class CustomerSentimentCrew:
     agents_config = "config/agents.yaml"
@@ -39,11 +42,11 @@ class CustomerSentimentCrew:
 
     @agent
     def search_agent(self) -> Agent:
-        return Agent(config=self.agents_config["search_agent"], tools=[SerperDevTool()], llm=llm)
+        return Agent(config=self.agents_config["search_agent"], tools=[search_tool], llm=llm)
 
     @agent
     def scraping_agent(self) -> Agent:
-        return Agent(config=self.agents_config["scraping_agent"], tools=[ScrapeWebsiteTool()], llm=llm)
+        return Agent(config=self.agents_config["scraping_agent"], tools=[scrape_tool], llm=llm)
 
     @agent
     def sentiment_analysis_agent(self) -> Agent:
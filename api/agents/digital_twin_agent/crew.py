@@ -11,7 +11,13 @@ class DigitalTwinAgent:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
 
-
+    def __init__(self, parallel=None):
+        """
+        parallel=True asks every persona at once and merges their feedback in one
+        synthesis task; False keeps the single research task under a manager LLM.
+        Defaults to DIGITAL_TWIN_PARALLEL (on unless set to 0).
+        """
+        self.parallel = os.getenv("DIGITAL_TWIN_PARALLEL", "1") != "0" if parallel is None else parallel
 
     @agent
     def jordan_miller(self) -> Agent:
@@ -97,9 +103,46 @@ class DigitalTwinAgent:
         except KeyError as e:
             raise Exception(f"Agent or config missing: {e}")
 
+    def persona_names(self):
+        """Persona agent names, in the order research_task lists them in tasks.yaml."""
+        return list(self.tasks_config["research_task"]["agents"])
+
+    def persona_task(self, name) -> Task:
+        persona = getattr(self, name)()
+        config = dict(self.tasks_config["persona_feedback_task"])
+        focus = self.agents_config[name].get("evaluation_focus")
+        if focus:
+            config["description"] = f"{config['description']}\nFocus your evaluation on:\n{focus}"
+        # no context: every persona only needs the kickoff inputs, so all of them can run at once
+        return Task(config=config, name=f"{name}_feedback", agent=persona, context=[], async_execution=True)
+
+    def persona_synthesizer(self) -> Agent:
+        return Agent(
+            config=self.agents_config["persona_synthesizer"],
+            verbose=True,
+        )
+
+    def parallel_crew(self) -> Crew:
+        """One task per persona, all independent, then one task merging their reactions."""
+        personas = [self.persona_task(name) for name in self.persona_names()]
+        synthesis = Task(
+            config=self.tasks_config["persona_synthesis_task"],
+            name="persona_synthesis_task",
+            agent=self.persona_synthesizer(),
+            context=personas,
+        )
+        return Crew(
+            agents=[task.agent for task in personas] + [synthesis.agent],
+            tasks=personas + [synthesis],
+            process=Process.sequential,
+            verbose=True,
+        )
+
     @crew
     def crew(self) -> Crew:
         """Creates the DigitalTwinAgent crew."""
+        if self.parallel:
+            return self.parallel_crew()
         return Crew(
             agents=self.agents,  
             tasks=self.tasks,  
@@ -1,9 +1,8 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader
-from docx import Document  # Library to handle .docx files
 import os
+from utils.text_extraction import extract_text as extract_document_text
 
 load_dotenv()
 
@@ -14,6 +13,12 @@ class DocumentProcessor:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
+    def __init__(self, extract_text=extract_document_text):
+        """
+        extract_text(file_path) returns a document's text; by default the shared, cached extractor.
+        """
+        self.extract_text = extract_text
+
     @before_kickoff
     def preprocess_inputs(self, inputs):
         """
@@ -30,20 +35,7 @@ class DocumentProcessor:
         document_text = ""
 
         try:
-            if file_extension == ".pdf":
-                # Extract text from the PDF
-                reader = PdfReader(file_path)
-                document_text = "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
-            elif file_extension == ".docx":
-                # Extract text from a Word document
-                doc = Document(file_path)
-                document_text = "\n".join([paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()])
-            elif file_extension == ".txt":
-                # Extract text from a plain text file
-                with open(file_path, 'r', encoding='utf-8') as txt_file:
-                    document_text = txt_file.read()
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
+            document_text = self.extract_text(file_path)
 
             if not document_text.strip():
                 raise ValueError("The provided file is empty or unreadable.")
@@ -133,6 +133,8 @@ PREDEFINED_RISKS = {
 }
 
 
+search_tool = SerperDevTool()
+
 @CrewBase
 class EmergingRiskAgent:
     """EmergingRiskAgent crew"""
@@ -147,7 +149,7 @@ class EmergingRiskAgent:
     def researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['researcher'],
-            tools=[SerperDevTool()],  
+            tools=[search_tool],  
             verbose=True
         )
 
@@ -47,6 +47,8 @@ class Copy(BaseModel):
     body: str = Field(..., description="Body of the copy")
     message: str = Field(..., description="Message of the copy")
 
+search_tool = SerperDevTool()
+
 @CrewBase
 class MarketingPostsCrew():
     """MarketingPosts crew"""
@@ -57,7 +59,7 @@ class MarketingPostsCrew():
     def lead_market_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['lead_market_analyst'],
-            tools=[SerperDevTool()],
+            tools=[search_tool],
             verbose=True,
             memory=False,
             llm=llm
@@ -67,7 +69,7 @@ class MarketingPostsCrew():
     def chief_marketing_strategist(self) -> Agent:
         return Agent(
             config=self.agents_config['chief_marketing_strategist_ai'],
-            tools=[SerperDevTool()],
+            tools=[search_tool],
             verbose=True,
             llm=llm,
             memory=False,
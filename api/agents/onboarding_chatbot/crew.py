@@ -19,8 +19,8 @@ class OnboardingChatbot():
 		)
 		return pdf_search_tool
 	
-	def __init__(self, inputs):
-		self.pdf_search_tool = self.create_pdf_search_tool(inputs["pdf_path"])
+	def __init__(self, inputs, pdf_search_tool=None):
+		self.pdf_search_tool = pdf_search_tool or self.create_pdf_search_tool(inputs["pdf_path"])
 		
 		
 
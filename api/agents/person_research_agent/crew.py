@@ -76,6 +76,9 @@ class BrowserlessScraper(BaseTool):
 
 
 
+search_tool = SerperDevTool()
+scrape_tool = ScrapeWebsiteTool()
+
 @CrewBase
 class PersonResearchAgent:
     """Configuration for the Person Research Agent."""
@@ -87,7 +90,7 @@ class PersonResearchAgent:
         """Combined agent for search and report generation."""
         return Agent(
             config=self.agents_config['research_agent'],
-            tools=[SerperDevTool(), WebsiteSearchTool(), ScrapeWebsiteTool()],
+            tools=[search_tool, WebsiteSearchTool(), scrape_tool],
             verbose=True,
             memory=False
         )
@@ -23,6 +23,9 @@ llm = LLM(
 
 
 
+search_tool = SerperDevTool()
+scrape_tool = ScrapeWebsiteTool()
+
 @CrewBase
 class SeoAgent():
     """SEO Agent with customer domain and geographical targeting."""
@@ -35,7 +38,7 @@ class SeoAgent():
         """Keyword Insights Agent"""
         return Agent(
             config=self.agents_config['keyword_insights_agent'],
-            tools=[SerperDevTool()],
+            tools=[search_tool],
             llm=llm,
             verbose=True,
         )
@@ -45,7 +48,7 @@ class SeoAgent():
         """Related Keywords Agent"""
         return Agent(
             config=self.agents_config['related_keywords_agent'],
-            tools=[SerperDevTool()],
+            tools=[search_tool],
             llm=llm,
             verbose=True,
         )
@@ -55,7 +58,7 @@ class SeoAgent():
         """SEO Competitor Agent"""
         return Agent(
             config=self.agents_config['seo_competitor_agent'],
-            tools=[ScrapeWebsiteTool(),SerperDevTool(),WebsiteSearchTool()],
+            tools=[scrape_tool,search_tool,WebsiteSearchTool()],
             llm=llm,
             verbose=True,
         )
@@ -65,7 +68,7 @@ class SeoAgent():
         """SEO Recommendation Agent"""
         return Agent(
             config=self.agents_config['seo_recommendation_agent'],
-            tools=[SerperDevTool()],
+            tools=[search_tool],
             llm=llm,
             verbose=True,
         )
@@ -4,11 +4,14 @@ from crewai.project import CrewBase, agent, crew, task
 
 
 
-from typing import Type
+from typing import Callable, List, Optional, Type
+from crewai.crews.crew_output import CrewOutput
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
+from crewai.types.usage_metrics import UsageMetrics
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
 import base64
-from openai import OpenAI
+from PIL import Image
+from openai import BadRequestError, ContentFilterFinishReasonError, LengthFinishReasonError, OpenAI
 import os
 import json
 
@@ -27,54 +30,146 @@ class OCRTool(BaseTool):
     description: str = "Extracts key fields from an image using OpenAI's GPT-4o model."
     args_schema: Type[BaseModel] = OCRToolInput
 
+    ocr: Optional[Callable] = Field(default=None, exclude=True)
+
     def _run(self, image_path: str) -> str:
         """
         Perform OCR on the given image using OpenAI's GPT-4o API.
         """
         try:
-            # Convert the local image to a base64 string
             if not os.path.exists(image_path):
                 return f"Error: File not found at {image_path}. Ensure the file exists."
+            return (self.ocr or ocr_file)(image_path, request_ocr)
+        except FileNotFoundError:
+            return f"Error: File not found at {image_path}. Ensure the file exists."
+        except json.JSONDecodeError:
+            return "Error: Unable to decode JSON from the response. Check the API output."
+        except Exception as e:
+            return f"Error during OCR: {str(e)}"
+
 
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode("utf-8")
-                print("Image successfully converted to base64 string.")
+def read_image(image_path):
+    """
+    MIME type and bytes of an image file, with the type detected from its content.
+    """
+    with Image.open(image_path) as image:
+        mime_type = Image.MIME.get(image.format, "image/png")
+    with open(image_path, "rb") as image_file:
+        return mime_type, image_file.read()
 
-            # Construct the base64 image string
-            base64_img = f"data:image/png;base64,{base64_image}"
 
-            # Make the API call using OpenAI
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
+def request_ocr(mime_type, data):
+    """
+    Send an encoded image to GPT-4o and return the JSON document it reads from it.
+    """
+    base64_img = f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+    response = client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Return JSON document with data. Only return JSON not other text."},
                     {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": "Return JSON document with data. Only return JSON not other text."},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"{base64_img}"}
-                            }
-                        ],
+                        "type": "image_url",
+                        "image_url": {"url": f"{base64_img}"}
                     }
                 ],
-                max_tokens=500,
-                temperature=1,
-                top_p=1,
-                frequency_penalty=0,
-                presence_penalty=0,
-            )
+            }
+        ],
+        max_tokens=500,
+        temperature=1,
+        top_p=1,
+        frequency_penalty=0,
+        presence_penalty=0,
+    )
+    print("API call successful.")
+    return response.choices[0].message.content
 
-            print("API call successful.")
-            return response.choices[0].message.content
 
-        except FileNotFoundError:
-            return f"Error: File not found at {image_path}. Ensure the file exists."
-        except json.JSONDecodeError:
-            return "Error: Unable to decode JSON from the response. Check the API output."
-        except Exception as e:
-            return f"Error during OCR: {str(e)}"
-        
+def ocr_file(image_path, request):
+    """OCR an image file as uploaded."""
+    return request(*read_image(image_path))
+
+
+class IDField(BaseModel):
+    """Any other labelled field printed on the card."""
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    value: str
+
+
+class IDFields(BaseModel):
+    """
+    Fields read from an ID card. Every field is required but nullable, as
+    OpenAI's strict JSON schema mode expects; null means not on the card.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    document_type: Optional[str]
+    full_name: Optional[str]
+    date_of_birth: Optional[str]
+    id_number: Optional[str]
+    nationality: Optional[str]
+    sex: Optional[str]
+    date_of_issue: Optional[str]
+    date_of_expiry: Optional[str]
+    issuing_authority: Optional[str]
+    address: Optional[str]
+    other_fields: List[IDField]
+
+    @model_validator(mode="after")
+    def identifies_holder(self):
+        # without a name or a number the card was not really read, so the full crew gets a go
+        if not (self.full_name or "").strip() and not (self.id_number or "").strip():
+            raise ValueError("Neither a name nor an ID number was read from the image.")
+        return self
+
+    def to_markdown(self) -> str:
+        lines = ["# ID Card Fields", ""]
+        for name, value in self.model_dump(exclude={"other_fields"}).items():
+            if value:
+                lines.append(f"- **{name.replace('_', ' ').title()}**: {value}")
+        for field in self.other_fields:
+            lines.append(f"- **{field.name}**: {field.value}")
+        return "\n".join(lines)
+
+
+def request_id_fields(mime_type, data):
+    """
+    One GPT-4o vision request constrained to the IDFields JSON schema; returns the JSON text.
+    """
+    base64_img = f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+    response = client.chat.completions.parse(
+        model="gpt-4o",
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Read the fields of this ID card. Use null for fields that are not printed on it "
+                                             "and list any other labelled fields under other_fields."},
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": f"{base64_img}"}
+                    }
+                ],
+            }
+        ],
+        response_format=IDFields,
+        max_tokens=500,
+        temperature=0,
+    )
+    return response.choices[0].message.content or ""
+
+
+def request_valid_id_fields(mime_type, data):
+    """
+    request_id_fields, raising ValidationError for an answer that does not
+    validate, so that a cache around it never keeps one.
+    """
+    return IDFields.model_validate_json(request_id_fields(mime_type, data)).model_dump_json()
+
 
 @CrewBase
 class IDReaderCrew:
@@ -83,12 +178,29 @@ class IDReaderCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    def __init__(self, image_path):
+    def __init__(self, image_path, ocr=None):
         """
-        Initialize the crew with the uploaded ID image path.
+        Initialize the crew with the uploaded ID image path. ocr(image_path, request)
+        returns the OCR text, calling request(mime_type, data) for the vision call;
+        the API passes its normalizing, cached reader.
         """
         self.image_path = image_path
-        self.ocr_tool = OCRTool()
+        self.ocr = ocr or ocr_file
+        self.ocr_tool = OCRTool(ocr=ocr)
+
+    def read_fields(self):
+        """
+        Read the card with a single schema-constrained vision call, validated
+        locally. Returns a CrewOutput shaped like the crew's, or None when the
+        answer does not validate, is cut off at the token limit or the image is
+        refused or filtered, and the full crew has to run. Other errors, such as
+        authentication or network failures, reach the caller.
+        """
+        try:
+            fields = IDFields.model_validate_json(self.ocr(self.image_path, request_valid_id_fields))
+        except (ValidationError, BadRequestError, LengthFinishReasonError, ContentFilterFinishReasonError):
+            return None
+        return CrewOutput(raw=fields.to_markdown(), pydantic=fields, json_dict=fields.model_dump(), tasks_output=[], token_usage=UsageMetrics())
 
     @agent
     def image_processor(self) -> Agent:
@@ -9,7 +9,8 @@ def run(image_path):
     inputs = {
         "image_path": image_path,
     }
-    response = id_reader_crew.crew().kickoff(inputs=inputs)
+    # a single structured vision call usually suffices; the full crew runs when its answer does not validate
+    response = id_reader_crew.read_fields() or id_reader_crew.crew().kickoff(inputs=inputs)
     print(response)
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -72,6 +72,19 @@ class OpenAITranscriptionTool(BaseTool):
         raise NotImplementedError("OpenAITranscriptionTool does not support async execution.")
 
 
+def transcribe_each(audio_file_paths):
+    """Transcribe audio files one after another with the transcription tool."""
+    tool = OpenAITranscriptionTool()
+    return [tool._run(path) for path in audio_file_paths]
+
+
+def audio_paths(audio_responses):
+    """Flatten the (possibly nested) list of audio file paths passed as audio_responses."""
+    if isinstance(audio_responses, (str, Path)):
+        return [str(audio_responses)]
+    return [path for item in audio_responses for path in audio_paths(item)]
+
+
 @CrewBase
 class UserStoryCrew:
     """UserStoryCrew generates Agile user stories based on audio responses."""
@@ -79,16 +92,25 @@ class UserStoryCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    @agent
-    def transcription_agent(self) -> Agent:
+    def __init__(self, transcribe=None):
         """
-        Agent to handle transcription of audio responses.
+        transcribe(paths) returns the transcripts of audio files in order; the API
+        passes its concurrent, cached transcriber.
         """
-        return Agent(
-            config=self.agents_config['transcription_agent'],
-            tools=[OpenAITranscriptionTool()],
-            verbose=True
+        self.transcribe = transcribe or transcribe_each
+
+    @before_kickoff
+    def transcribe_inputs(self, inputs):
+        """
+        Transcribe every answer before the crew starts, so the agents only reason over text.
+        """
+        paths = audio_paths(inputs.get("audio_responses") or [])
+        transcripts = self.transcribe(paths)
+        inputs["transcriptions"] = "\n\n".join(
+            f"Response {number} ({Path(path).name}):\n{text}"
+            for number, (path, text) in enumerate(zip(paths, transcripts), start=1)
         )
+        return inputs
 
     @agent
     def story_generator_agent(self) -> Agent:
@@ -100,18 +122,6 @@ class UserStoryCrew:
             verbose=True
         )
 
-    @task
-    def transcription_task(self) -> Task:
-        """
-        Task to transcribe audio responses.
-        """
-        return Task(
-            config=self.tasks_config['transcription_task'],
-            inputs={"audio_responses": "{audio_responses}"},
-            agent=self.transcription_agent(),
-            async_execution=True
-        )
-
     @task
     def story_generation_task(self) -> Task:
         """
@@ -119,7 +129,6 @@ class UserStoryCrew:
         """
         return Task(
             config=self.tasks_config['story_generation_task'],
-            context=[self.transcription_task()],
             agent=self.story_generator_agent(),
 			logic="""
 			Thought: I will analyze the transcriptions to extract user roles, functionality, and benefits.
@@ -137,7 +146,7 @@ class UserStoryCrew:
         """
         return Crew(
             agents=self.agents,
-            tasks=[self.transcription_task(), self.story_generation_task()],
+            tasks=[self.story_generation_task()],
             process=Process.sequential,
             verbose=True
         )
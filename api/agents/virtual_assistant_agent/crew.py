@@ -10,7 +10,12 @@ class ChatCrew:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    def __init__(self, pdf_paths):
+    def __init__(self, pdf_paths, pdf_search_tool=None):
+        # A prebuilt search tool may already cover several PDFs
+        if pdf_search_tool is not None:
+            self.pdf_search_tool = pdf_search_tool
+            return
+
         if len(pdf_paths) != 1:
             raise ValueError("Exactly one merged PDF file must be provided.")
         
@@ -0,0 +1,72 @@
+"""
+What the audio preprocessing in utils.audio saves before a clip reaches
+Whisper: bytes sent, audio duration, local processing time and the upload
+time those bytes cost over an --uplink-mbps connection, for the bundled
+user story question recordings or any --files.
+
+With --transcribe each clip is also sent to the translation endpoint raw
+and preprocessed (needs OPENAI_API_KEY), timing both round trips.
+
+    cd api && python -m benchmarks.audio [--files 'agents/user_stories_agent/audio_questions/*.wav'] [--uplink-mbps 10] [--transcribe]
+"""
+import argparse
+import glob
+import io
+import os
+import statistics
+import time
+from pydub import AudioSegment
+from utils.audio import audio_profile,preprocess_audio
+
+SAMPLES='agents/user_stories_agent/audio_questions/*.wav'
+
+
+def upload_ms(size,mbps):
+    return size*8/(mbps*1000*1000)*1000
+
+def transcribe_ms(client,name,data):
+    started=time.perf_counter()
+    client.audio.translations.create(model='whisper-1',file=(name,data))
+    return (time.perf_counter()-started)*1000
+
+def main():
+    parser=argparse.ArgumentParser()
+    parser.add_argument('--files',default=SAMPLES)
+    parser.add_argument('--uplink-mbps',type=float,default=10)
+    parser.add_argument('--transcribe',action='store_true',help='also time real Whisper requests, raw against preprocessed')
+    args=parser.parse_args()
+    paths=sorted(glob.glob(args.files))
+    if not paths:
+        parser.error(f'no files match {args.files}')
+    client=None
+    if args.transcribe:
+        from openai import OpenAI
+        client=OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    print(f'profile {audio_profile()}, uplink {args.uplink_mbps:g} Mbit/s')
+    header=f"{'file':<20} {'raw KB':>8} {'sent KB':>8} {'ratio':>6} {'raw s':>6} {'sent s':>6} {'prep ms':>8} {'upload ms':>10}"
+    if client:
+        header+=f" {'raw req ms':>11} {'sent req ms':>12}"
+    print(header)
+    totals=[]
+    for path in paths:
+        with open(path,'rb') as f:
+            raw=f.read()
+        started=time.perf_counter()
+        name,sent=preprocess_audio(path)
+        prepMs=(time.perf_counter()-started)*1000
+        rawSeconds=len(AudioSegment.from_file(path))/1000
+        sentSeconds=len(AudioSegment.from_file(io.BytesIO(sent),format=os.path.splitext(name)[1][1:]))/1000
+        row=(len(raw),len(sent),prepMs,upload_ms(len(raw),args.uplink_mbps),upload_ms(len(sent),args.uplink_mbps))
+        line=(f"{os.path.basename(path)[:20]:<20} {len(raw)/1024:>8.1f} {len(sent)/1024:>8.1f} {len(raw)/len(sent):>5.1f}x "
+              f"{rawSeconds:>6.2f} {sentSeconds:>6.2f} {prepMs:>8.1f} {row[3]:>4.0f}->{row[4]:<5.0f}")
+        if client:
+            line+=f" {transcribe_ms(client,os.path.basename(path),raw):>11.0f} {transcribe_ms(client,name,sent):>12.0f}"
+        print(line)
+        totals.append(row)
+    raw,sent,prep,rawUpload,sentUpload=(sum(column) for column in zip(*totals))
+    print(f"total {raw/1024:.1f} KB -> {sent/1024:.1f} KB ({raw/sent:.1f}x), preprocessing {prep:.0f} ms "
+          f"(median {statistics.median(row[2] for row in totals):.1f} ms), upload {rawUpload:.0f} -> {sentUpload:.0f} ms")
+
+
+if __name__=='__main__':
+    main()
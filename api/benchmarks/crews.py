@@ -0,0 +1,219 @@
+"""
+End-to-end latency benchmark of every /agent, /agent/file and chat route,
+run offline against the fake providers (utils.fake_providers), so what is
+measured is our own request handling, scheduling and crew orchestration.
+
+Each scenario runs --requests times one after another, then again from
+--concurrency client threads. "provider sum" is the provider time the fakes
+simulated per request, added up over every call. "provider" is the wall time
+per request during which at least one fake call was in flight, which is what
+parallel crews (agents 3 and 11) actually wait for, and framework overhead is
+the mean latency minus that. Both are only reported for the sequential runs:
+with concurrent requests the calls of different requests overlap and cannot
+be told apart.
+
+    cd api && python -m benchmarks.crews [--requests 5] [--concurrency 4] [--only 0,file/16,policy-chat] [--json out.json]
+
+FAKE_LLM_LATENCY_MS and FAKE_TOOL_LATENCY_MS set the simulated provider latency.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import statistics
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('FAKE_PROVIDERS','1')
+# every request should reach the crews, not the completion cache
+os.environ.setdefault('LLM_CACHE','0')
+os.environ.setdefault('JWT_SECRET','benchmark')
+
+from fastapi.testclient import TestClient
+import server
+from utils.fake_providers import fakeStats
+from utils.index import create_token
+
+ROOT=os.path.join(os.path.dirname(__file__),'..')
+TEST_FILES=os.path.join(ROOT,'..','userTestFiles')
+CLAIMS_FILES=os.path.join(ROOT,'agents','claims_processor','pdf_folder')
+
+AGENT_INPUTS={
+    '0': {"project_description": "Usage-based car insurance for young drivers", "geographical_location": "UAE"},
+    '1': {"customer_domain": "example.com", "project_description": "Usage-based car insurance for young drivers", "geographical_location": "UAE"},
+    '2': {"competitor1": "Acme Insurance", "area": "motor insurance"},
+    '3': {"area": "health insurance", "product_marketing_idea": "Family plans with telemedicine"},
+    '7': {"area": "cyber insurance", "product_lines": "SME cover"},
+    '8': {"person": "Jane Doe"},
+    '9': {"company_name": "Acme Insurance", "geographical_location": "UAE"},
+    '10': {"customer_name": "Jane Doe", "age_group": "30-40", "customer_segment": "retail",
+           "characteristics": {"industry": "technology", "interest": "travel"}},
+    '11': {"company_name": "Acme Insurance"},
+}
+
+FILE_UPLOADS={
+    '4': {"file": 'id-card.png'},
+    '12': {"file": 'contract.txt'},
+    '13': {"file": 'budget.csv', "region": 'UAE'},
+    '15': {"files": None},
+    '16': {"file": 'contract-summ.pdf'},
+    '17': {"file": 'medical-contract.docx'},
+    '18': {"file": os.path.join(CLAIMS_FILES,'old_tests','rules.pdf'), "file2": os.path.join(CLAIMS_FILES,'old_tests','correct.pdf')},
+}
+
+CHAT_DOCUMENT='policy-pdf.pdf'
+
+
+def read(name):
+    with open(os.path.join(TEST_FILES,name),'rb') as f:
+        return f.read()
+
+def noise_wav(seconds=1,rate=16000):
+    # random samples, so no two answers share a content hash and every transcription is a cache miss
+    buffer=io.BytesIO()
+    with wave.open(buffer,'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(os.urandom(2*rate*seconds))
+    return buffer.getvalue()
+
+def file_request(agent_id):
+    files=[]
+    data={}
+    for field,name in FILE_UPLOADS[agent_id].items():
+        if field=='region':
+            data[field]=name
+        elif field=='files':
+            # five recorded answers per functionality, as the user story interview asks
+            files.extend(('files',(f'answer-{number}.wav',noise_wav(),'audio/wav')) for number in range(1,6))
+        else:
+            files.append((field,(os.path.basename(name),read(name))))
+    return files,data
+
+
+class Scenario:
+    """One route; setup runs once outside the timings (e.g. ingesting the chat document)."""
+    def __init__(self, name, request, setup=None):
+        self.name = name
+        self.request = request
+        self.setup = setup
+
+
+def agent_scenario(client,agent_id):
+    def request():
+        return client.post(f'/agent/{agent_id}',json=AGENT_INPUTS[agent_id])
+    return Scenario(agent_id,request)
+
+def file_scenario(client,agent_id):
+    def request():
+        files,data=file_request(agent_id)
+        return client.post(f'/agent/file/{agent_id}',files=files,data=data)
+    return Scenario(f'file/{agent_id}',request)
+
+def chat_scenario(client,route,upload_field='file'):
+    state={}
+    def setup():
+        files=[(upload_field,(CHAT_DOCUMENT,read(CHAT_DOCUMENT),'application/pdf'))]
+        started=client.post(f'/start/{route}',files=files).json()
+        client.get(f'/ingestion/{started["ingestion"]}',params={"wait": 60})
+        state['pdf']=started['result']
+    def request():
+        body={"pdf": state['pdf'], "context": ["Hello"], "query": "What does the policy cover?"}
+        if route=='onboarding-agent':
+            body['context']="Hello"
+        return client.post(f'/{route}/chat',json=body)
+    return Scenario(route,request,setup)
+
+def scenarios(client):
+    return (
+        [agent_scenario(client,agent_id) for agent_id in AGENT_INPUTS]
+        + [file_scenario(client,agent_id) for agent_id in FILE_UPLOADS]
+        + [chat_scenario(client,route) for route in ('policy-chat','chatbot','onboarding-agent')]
+        + [chat_scenario(client,'virtual-chat')]
+    )
+
+
+def percentile(values,p):
+    # nearest rank
+    ordered=sorted(values)
+    return ordered[max(0,math.ceil(p/100*len(ordered))-1)]
+
+def timed(scenario):
+    started=time.perf_counter()
+    response=scenario.request()
+    elapsed=time.perf_counter()-started
+    if response.status_code!=200:
+        raise RuntimeError(f'{scenario.name}: HTTP {response.status_code} {response.text[:200]}')
+    return elapsed
+
+def measure(scenario,requests,concurrency):
+    fakeStats.reset()
+    started=time.perf_counter()
+    if concurrency==1:
+        latencies=[timed(scenario) for _ in range(requests)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies=list(pool.map(lambda _: timed(scenario),range(requests)))
+    wall=time.perf_counter()-started
+    providers=fakeStats.snapshot()
+    busy=providers['busy_seconds']/requests
+    mean=statistics.mean(latencies)
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "p50_ms": percentile(latencies,50)*1000,
+        "p95_ms": percentile(latencies,95)*1000,
+        "p99_ms": percentile(latencies,99)*1000,
+        "throughput_rps": requests/wall,
+        "llm_calls": providers['llm_calls']/requests,
+        "tool_calls": providers['tool_calls']/requests,
+        "provider_sum_ms": providers['simulated_seconds']/requests*1000,
+        "provider_ms": busy*1000 if concurrency==1 else None,
+        "overhead_ms": (mean-busy)*1000 if concurrency==1 else None,
+    }
+
+def ms(value,width):
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.0f}"
+
+def print_row(row):
+    print(f"{row['scenario']:<18} {row['concurrency']:>3} {row['p50_ms']:>9.0f} {row['p95_ms']:>9.0f} {row['p99_ms']:>9.0f} "
+          f"{row['throughput_rps']:>8.2f} {row['llm_calls']:>6.1f} {row['tool_calls']:>6.1f} {row['provider_sum_ms']:>12.0f} {ms(row['provider_ms'],10)} {ms(row['overhead_ms'],10)}")
+
+def main():
+    parser=argparse.ArgumentParser()
+    parser.add_argument('--requests',type=int,default=5)
+    parser.add_argument('--concurrency',type=int,default=4)
+    parser.add_argument('--only',default='',help='comma-separated scenario names, e.g. 0,file/16,policy-chat')
+    parser.add_argument('--json',default=None,help='also write the results to this file')
+    args=parser.parse_args()
+    only=set(filter(None,args.only.split(',')))
+    token=create_token({"email": "benchmark@example.com"},'accessToken')
+    results=[]
+    with TestClient(server.app,headers={"Authorization": f"Bearer {token}"}) as client:
+        print(f"{'scenario':<18} {'c':>3} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'llm':>6} {'tools':>6} {'provider sum':>12} {'provider':>10} {'overhead':>10}")
+        for scenario in scenarios(client):
+            if only and scenario.name not in only:
+                continue
+            try:
+                if scenario.setup:
+                    scenario.setup()
+                # one warm-up request so imports and index opening are not timed
+                timed(scenario)
+                for concurrency in sorted({1,args.concurrency}):
+                    row=measure(scenario,args.requests,concurrency)
+                    results.append(row)
+                    print_row(row)
+            except Exception as e:
+                print(f"{scenario.name:<18} failed: {e}")
+                results.append({"scenario": scenario.name, "error": str(e)})
+    if args.json:
+        with open(args.json,'w') as f:
+            json.dump(results,f,indent=2)
+
+
+if __name__=='__main__':
+    main()
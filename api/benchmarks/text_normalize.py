@@ -0,0 +1,48 @@
+"""
+Micro-benchmark of the claims text cleaner: the original three uncompiled
+re.sub passes against utils.text_normalize.clean_text, on the sample PDFs
+bundled with the claims processor.
+
+    cd api && python -m benchmarks.text_normalize [--repeat 200] [--scale 1]
+"""
+import argparse
+import glob
+import os
+import re
+import timeit
+import fitz
+from utils.text_normalize import clean_text
+
+SAMPLES=os.path.join(os.path.dirname(__file__),'..','agents','claims_processor','pdf_folder')
+
+
+def legacy_clean_text(text):
+    text = re.sub(r"[^\S\r\n]+", " ", text)
+    text = re.sub(r"\s*\n\s*", "\n", text)
+    text = re.sub(r"[^\w\s.,;:'\"!?()-]", "", text)
+    return text.strip()
+
+def pdf_text(path):
+    with fitz.open(path) as doc:
+        return "\n".join(page.get_text() for page in doc)
+
+def main():
+    parser=argparse.ArgumentParser()
+    parser.add_argument('--repeat',type=int,default=200)
+    parser.add_argument('--scale',type=int,default=1,help='concatenate each text with itself this many times')
+    args=parser.parse_args()
+    paths=sorted(glob.glob(os.path.join(SAMPLES,'**','*.pdf'),recursive=True))
+    print(f"{'document':<40} {'chars':>9} {'legacy ms':>10} {'new ms':>8} {'speedup':>8} {'same output':>11}")
+    for path in paths:
+        text=pdf_text(path)*args.scale
+        if not text.strip():
+            continue
+        legacy=min(timeit.repeat(lambda: legacy_clean_text(text),number=args.repeat,repeat=3))/args.repeat
+        new=min(timeit.repeat(lambda: clean_text(text),number=args.repeat,repeat=3))/args.repeat
+        same=legacy_clean_text(text)==clean_text(text)
+        name=os.path.relpath(path,SAMPLES)
+        print(f"{name[:40]:<40} {len(text):>9} {legacy*1000:>10.3f} {new*1000:>8.3f} {legacy/new:>7.2f}x {str(same):>11}")
+
+
+if __name__=='__main__':
+    main()
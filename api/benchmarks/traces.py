@@ -0,0 +1,53 @@
+"""
+Where the wall time of traced requests went: totals per crew, task, tool and
+LLM span name from the JSON-lines file written by utils.tracing, with each
+task's share of its crew's time.
+
+    cd api && python -m benchmarks.traces [--file ./cache/traces.jsonl] [--crew CustomerResearchCrew]
+"""
+import argparse
+import json
+from collections import defaultdict
+from datetime import datetime
+from utils.tracing import TRACE_FILE
+
+
+def seconds(span):
+    started=datetime.fromisoformat(span['start_time'].replace('Z','+00:00'))
+    ended=datetime.fromisoformat(span['end_time'].replace('Z','+00:00'))
+    return (ended-started).total_seconds()
+
+def main():
+    parser=argparse.ArgumentParser()
+    parser.add_argument('--file',default=TRACE_FILE)
+    parser.add_argument('--crew',default=None,help='only spans under crews with this name')
+    args=parser.parse_args()
+    with open(args.file,encoding='utf-8') as f:
+        spans=[json.loads(line) for line in f if line.strip()]
+    byId={span['context']['span_id']: span for span in spans}
+
+    def crew_of(span):
+        while span is not None:
+            if span['name'].startswith('crew '):
+                return span
+            span=byId.get(span['parent_id'])
+        return None
+
+    totals=defaultdict(list)
+    crewSeconds=defaultdict(float)
+    for span in spans:
+        crew=crew_of(span)
+        if crew is None or (args.crew and crew['attributes'].get('crew.name')!=args.crew):
+            continue
+        totals[(crew['name'],span['name'])].append(seconds(span))
+        if span is crew:
+            crewSeconds[crew['name']]+=seconds(span)
+    print(f"{'crew':<32} {'span':<44} {'count':>6} {'mean s':>8} {'total s':>9} {'of crew':>8}")
+    for (crew,name),durations in sorted(totals.items(),key=lambda item: (item[0][0],-sum(item[1]))):
+        total=sum(durations)
+        share=total/crewSeconds[crew] if crewSeconds[crew] else 0
+        print(f"{crew[:32]:<32} {name[:44]:<44} {len(durations):>6} {total/len(durations):>8.3f} {total:>9.3f} {share:>7.0%}")
+
+
+if __name__=='__main__':
+    main()
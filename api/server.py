@@ -1,34 +1,33 @@
-from fastapi import APIRouter, FastAPI,HTTPException,Depends,Request,UploadFile,Form
+from fastapi import APIRouter, FastAPI,HTTPException,Depends,Request,UploadFile,Form,Body
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from dotenv import load_dotenv
-from validations import SEOAgent,CompetitorAgent,CustomerAgent,PersonalizedAgent,UserAgent,MarketingAgent,DigitalTwinAgentModel,ChangePassModel,PolicyChatModel,RefreshTokenModel,EmergingRiskModel,PersonResearchModel,CustomerReachModel,VirtualChatModel,DeleteFiles,OnboardingChatModel
-from agents.seo_agent.crew import SeoAgent
-from agents.competitor_analysis_agent.crew import CompetitorAnalysisAgent
-from agents.customer_sentiment_agent.crew import CustomerSentimentCrew
-from agents.personalized_recommendation_agent.crew import PersonalizedRecommendationCrew
-from agents.digital_twin_agent.crew import DigitalTwinAgent
-from agents.marketing_agent.crew import MarketingPostsCrew
+from validations import UserAgent,ChangePassModel,PolicyChatModel,RefreshTokenModel,VirtualChatModel,DeleteFiles,OnboardingChatModel
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse,JSONResponse,Response
 from passlib.context import CryptContext
-from agents.user_id_agent.crew import IDReaderCrew
-from utils.index import get_password_hash,get_user,create_token,verify_password,create_user,change_password,decode_token,updateRefreshToken,verifyRefreshMatchToken,load_document,retreiveUsers
+from utils.index import get_password_hash,get_user,create_token,verify_password,create_user,change_password,decode_token,updateRefreshToken,verifyRefreshMatchToken,load_document,retreiveUsers,ensure_indexes
 from utils.jwtbearer import JWTBearer
-from agents.policy_word_explainer_agent.crew import PolicyCrew
-from agents.emerging_risk_agent.crew import EmergingRiskAgent
-from agents.person_research_agent.crew import PersonResearchAgent
-from agents.customer_reach_agent.crew import CustomerResearchCrew
-from agents.contract_optimization_agent.crew import ContractOptimizationCrew
-from agents.automated_budget_agent.crew import AutomatedBudgetingAgent
-from agents.user_stories_agent.crew import UserStoryCrew
-from agents.contract_summarizer_agent.crew import ContractSummarizer
-from agents.document_processor.crew import DocumentProcessor
-from agents.claims_processor.crew import ClaimsProcessor
-from agents.onboarding_chatbot.crew import OnboardingChatbot
-from PyPDF2 import PdfMerger
-from agents.virtual_assistant_agent.crew import ChatCrew
+# first of the modules that import crewai, so crewai's telemetry never takes over the tracer provider
+from utils.tracing import instrument_app,install_llm_tracing
+from utils.fake_providers import install_fake_providers
+from utils.llm_cache import install_llm_cache,get_llm_cache
+from utils.metrics import MetricsMiddleware,install_llm_metrics,metrics_response,worker_exited
+from utils.registry import get_agent,preload_agents
+from utils.warmup import LazyClass,agentWarmup
+from utils.jobs import get_job_runner,FINISHED_STATES
+from utils.streaming import stream_crew,sse
+from utils.scheduler import get_scheduler,QueueFull
+from utils.text_extraction import extract_texts
+from utils.text_normalize import clean_text
+from utils.transcription import transcribe_files
+from utils.images import cached_ocr
+from utils.claims_rules import register_rules,get_rules,claim_verdict
+from utils.uploads import AGENT_UPLOAD_DIRS,MAX_UPLOAD_BYTES,MAX_AUDIO_BYTES,UPLOAD_DIR,prepare_upload_dirs,save_upload,extract_archive
+from utils.pdf_index import get_pdf_search_tool,start_ingestion,get_ingestion,ingestion_status
 from pathlib import Path
 import os
 from typing import Annotated,List
-from nanoid import generate
 import asyncio
 import uvicorn
 
@@ -45,192 +44,395 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+instrument_app(app)
+app.add_middleware(MetricsMiddleware)
 agent_router = APIRouter(prefix="/agent",tags=['Agent'])
 auth_router = APIRouter(prefix="/auth",tags=['Auth'])
+job_router = APIRouter(prefix="/jobs",tags=['Jobs'])
+claims_router = APIRouter(prefix="/claims",tags=['Claims'])
+CLAIMS_BATCH_WORKERS=int(os.getenv('CLAIMS_BATCH_WORKERS',4))
+# running claims batches; the event loop only keeps weak references to tasks
+claimsBatches=set()
+# /agent/file/4 first tries one schema-constrained vision call and only runs the two-agent crew if that fails
+ID_READER_FAST=os.getenv('ID_READER_FAST','1')!='0'
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# crews behind the file, claims and chat routes; imported on first use or by the background warm-up
+IDReaderCrew=LazyClass('agents.user_id_agent.crew:IDReaderCrew')
+PolicyCrew=LazyClass('agents.policy_word_explainer_agent.crew:PolicyCrew')
+ContractOptimizationCrew=LazyClass('agents.contract_optimization_agent.crew:ContractOptimizationCrew')
+AutomatedBudgetingAgent=LazyClass('agents.automated_budget_agent.crew:AutomatedBudgetingAgent')
+# pandas takes a third of a second to import, so the budget analytics load with the crews
+analyzeBudgetFile=LazyClass('utils.budget_analytics:analyze_budget_file')
+UserStoryCrew=LazyClass('agents.user_stories_agent.crew:UserStoryCrew')
+ContractSummarizer=LazyClass('agents.contract_summarizer_agent.crew:ContractSummarizer')
+DocumentProcessor=LazyClass('agents.document_processor.crew:DocumentProcessor')
+ClaimsProcessor=LazyClass('agents.claims_processor.crew:ClaimsProcessor')
+OnboardingChatbot=LazyClass('agents.onboarding_chatbot.crew:OnboardingChatbot')
+ChatCrew=LazyClass('agents.virtual_assistant_agent.crew:ChatCrew')
+ChatbotCrew=LazyClass('agents.chatbot_agent.crew:ChatCrew')
+# keep proxies from buffering Server-Sent Events
+SSE_HEADERS={"Cache-Control":"no-cache","X-Accel-Buffering":"no"}
+
+@app.exception_handler(QueueFull)
+async def queueFull(request:Request,e:QueueFull):
+    return JSONResponse(status_code=429,content={"detail":"Too Many Queued Requests"},headers={"Retry-After":str(e.retry_after)})
 
 #agents
+@app.on_event('startup')
+def warmAgents():
+    install_llm_cache()
+    install_fake_providers()
+    install_llm_metrics()
+    install_llm_tracing()
+    prepare_upload_dirs()
+    # crew modules load in the background so the port opens right away
+    agentWarmup.start(after=preload_agents)
+
+async def createUserIndexes():
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        print('could not create user indexes',e)
+
+@app.on_event('startup')
+async def prepareUserStore():
+    # in the background, so an unreachable database does not hold up the port opening
+    app.state.userIndexes=asyncio.create_task(createUserIndexes())
+
+def resolveAgent(agentId,agent):
+    spec=get_agent(agentId)
+    if(not spec):
+        raise HTTPException(status_code=404, detail="Agent Not Found")
+    try:
+        inputs=spec.validate(agent)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    return spec,inputs
+
 @agent_router.post('/{agentId}',dependencies=[Depends(JWTBearer())])
-async def agents(agentId,agent:SEOAgent|CompetitorAgent|CustomerAgent|PersonalizedAgent|MarketingAgent|DigitalTwinAgentModel|EmergingRiskModel|PersonResearchModel|CustomerReachModel):
-    if(agentId=='0'):        
-        result= await asyncio.to_thread(SeoAgent().crew().kickoff,agent.dict())
-        return {"result":result}
-    elif(agentId=='2'):
-        result= await asyncio.to_thread(CompetitorAnalysisAgent().crew().kickoff,agent.dict())
-        return {"result":result}
-    elif(agentId=='9'):
-        result=  await asyncio.to_thread(CustomerSentimentCrew().crew().kickoff,agent.dict())
-        return {"result":result}
-    elif(agentId=='10'):
-        result=  await asyncio.to_thread(PersonalizedRecommendationCrew().crew().kickoff,agent.dict())
-        return {"result":result}
-    elif(agentId=='1'):
-        result =  await asyncio.to_thread(MarketingPostsCrew().crew().kickoff,agent.dict())
-        return {"result":result}
-    elif(agentId=='3'):
-        result= await asyncio.to_thread(DigitalTwinAgent().crew().kickoff,agent.dict())
-        return {'result':result}
-    elif(agentId=='7'):
-        result =  await asyncio.to_thread(EmergingRiskAgent().crew().kickoff,agent.dict())
-        return {"result":result}
-    elif(agentId=='8'):
-        result =  await asyncio.to_thread(PersonResearchAgent().crew().kickoff,agent.dict())
-        return {"result":result}
-    elif(agentId=='11'):
-        result =  await asyncio.to_thread(CustomerResearchCrew().crew().kickoff,agent.dict())
-        return {"result":result}
+async def agents(agentId,agent:dict=Body(...)):
+    spec,inputs=resolveAgent(agentId,agent)
+    result=await get_scheduler().run(agentId,spec.kickoff,inputs)
+    return {"result":result}
 
-@agent_router.post('/file/{agentId}',dependencies=[Depends(JWTBearer())])
-async def agentsFile(agentId,file:UploadFile=None,file2:UploadFile=None,files:List[UploadFile]=None,region:Annotated[str, Form()]=None,functionality:Annotated[str ,Form()]=None):
+def documentExtension(filename):
+    for extension in ('.docx','.pdf','.txt'):
+        if(extension in filename):
+            return extension
+    raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF, DOCX, or TXT file.")
+
+async def saveFileAgentUploads(agentId,file=None,file2=None,files=None):
+    """
+    Stream the uploads an /agent/file crew needs to its upload folder and return their paths.
+    """
+    folder=AGENT_UPLOAD_DIRS.get(agentId)
+    if(not folder):
+        raise HTTPException(status_code=404, detail="Agent Not Found")
     if(agentId=='4'):
-        if(agentId not in os.listdir('uploads')):
-            os.mkdir(f"uploads/{agentId}")
-        file_name=generate(size=10)
-        audio_path = f'./uploads/{agentId}/{file_name}.png'
-        with open(audio_path, "wb") as f:
-            f.write(file.file.read())
-        id_reader_crew = IDReaderCrew(image_path=audio_path)
-        inputs = {
-            "image_path": audio_path,
-        }
-        response = await asyncio.to_thread(id_reader_crew.crew().kickoff,inputs)
-        os.remove(audio_path)
-        return {"result":response}
-    elif(agentId=='12'):
-        if(agentId not in os.listdir('uploads')):
-            os.mkdir(f"uploads/{agentId}")
-        file_name=generate(size=10)
-        if('.docx' in file.filename):
-            audio_path = f'./uploads/{agentId}/{file_name}.docx'
-            with open(audio_path, "wb") as f:
-                f.write(file.file.read())
-        if('.pdf' in file.filename):
-            audio_path = f'./uploads/{agentId}/{file_name}.pdf'
-            with open(audio_path, "wb") as f:
-                f.write(file.file.read())
-        if('.txt' in file.filename):
-            audio_path = f'./uploads/{agentId}/{file_name}.txt'
-            with open(audio_path, "wb") as f:
-                f.write(file.file.read())
-
-        contract_text = load_document(audio_path)
-        # Initialize and run the agent
-        inputs = {"contract_text": contract_text}
-        response = await asyncio.to_thread(ContractOptimizationCrew().crew().kickoff,inputs)
-        os.remove(audio_path)
-        return {"result":response}
+        uploads=[(file,'.png')]
+    elif(agentId in ('12','17')):
+        uploads=[(file,documentExtension(file.filename if file else ''))]
     elif(agentId=='13'):
-        file_name=generate(size=10)
-        if(agentId not in os.listdir('uploads')):
-            os.mkdir(f"uploads/{agentId}")
-        audio_path = f'./uploads/{agentId}/{file_name}.csv'
-        with open(audio_path, "wb") as f:
-            data=await asyncio.to_thread(file.file.read)
-            await asyncio.to_thread(f.write,data)
-        inputs = {
-            "file_path": audio_path,
-            "region": region,
-        }
-        result = await asyncio.to_thread(AutomatedBudgetingAgent(inputs=inputs).crew().kickoff,inputs)
-        os.remove(audio_path)
-        return {"result":result}
+        uploads=[(file,'.csv')]
     elif(agentId=='15'):
-        user_story_crew = UserStoryCrew()
-        response_audio_files = []
-        for i in files:
-            fileName=generate(size=10)
-            audio_path=f'./uploads/audios/{fileName}.wav'
-            response_audio_files.append(audio_path)
-            with open(audio_path,'wb') as f:
-                data=await asyncio.to_thread(i.file.read)
-                await asyncio.to_thread(f.write,data)
-        functionalities = []
-        functionalities.append(response_audio_files)
-
-        response = await asyncio.to_thread(user_story_crew.crew().kickoff,{"audio_responses": functionalities})
-        for i in response_audio_files:
-            await asyncio.to_thread(os.remove,i)
-        return {"result":response}
+        uploads=[(i,'.wav') for i in files or [None]]
     elif(agentId=='16'):
-        file_name= f'./uploads/{agentId}/{generate(size=10)}.pdf'
-        if(agentId not in os.listdir('uploads')):
-            os.mkdir(f"uploads/{agentId}")
-        with open(file_name,'wb') as f:
-            data=await asyncio.to_thread(file.file.read)
-            await asyncio.to_thread(f.write,data)
-        inputs = {
-            'contract_file': file_name  # Use the absolute path here
-        }
-        response=await asyncio.to_thread(ContractSummarizer().crew().kickoff,inputs)
-        await asyncio.to_thread(os.remove,file_name)
-        return {"result":response}
-    elif(agentId=='17'):
-        if(agentId not in os.listdir('uploads')):
-            os.mkdir(f"uploads/{agentId}")
-        file_name=generate(size=10)
-        if('.docx' in file.filename):
-            audio_path = f'./uploads/{agentId}/{file_name}.docx'
-            with open(audio_path, "wb") as f:
-                f.write(file.file.read())
-        if('.pdf' in file.filename):
-            audio_path = f'./uploads/{agentId}/{file_name}.pdf'
-            with open(audio_path, "wb") as f:
-                f.write(file.file.read())
-        if('.txt' in file.filename):
-            audio_path = f'./uploads/{agentId}/{file_name}.txt'
-            with open(audio_path, "wb") as f:
-                f.write(file.file.read())
-        inputs = {
-            'document_file': audio_path  # Replace with the path to your document
-        }
-        response=await asyncio.to_thread(DocumentProcessor().crew().kickoff,inputs)
-        await asyncio.to_thread(os.remove,audio_path)
-        return {"result":response}
+        uploads=[(file,'.pdf')]
     elif(agentId=='18'):
-        print('im hereee')
-        file_name1= f'./uploads/{agentId}/{generate(size=10)}.pdf'
-        file_name2= f'./uploads/{agentId}/{generate(size=10)}.pdf'
-        if(agentId not in os.listdir('uploads')):
-            os.mkdir(f"uploads/{agentId}")
-        with open(file_name1,'wb') as f:
-            data=await asyncio.to_thread(file.file.read)
-            await asyncio.to_thread(f.write,data)
-        with open(file_name2,'wb') as f:
-            data=await asyncio.to_thread(file2.file.read)
-            await asyncio.to_thread(f.write,data)
-
-        inputs = {
-            'rules_document': file_name1,
-            'claims_document': file_name2
-        }
-        response=await asyncio.to_thread(ClaimsProcessor().crew().kickoff,inputs)
-        await asyncio.to_thread(os.remove,file_name1)
-        await asyncio.to_thread(os.remove,file_name2)
-        return {"result":response}
+        uploads=[(file,'.pdf'),(file2,'.pdf')]
+    maxBytes=MAX_AUDIO_BYTES if agentId=='15' else MAX_UPLOAD_BYTES
+    paths=[]
+    try:
+        for upload,extension in uploads:
+            saved=await save_upload(upload,folder,extension,maxBytes)
+            paths.append(saved.path)
+    except BaseException:
+        await asyncio.to_thread(removeFiles,paths)
+        raise
+    return paths
+
+def removeFiles(paths):
+    for path in paths:
+        if(os.path.exists(path)):
+            os.remove(path)
+
+async def admitFileAgent(agentId,paths):
+    """Queue a file crew with the kickoff scheduler, dropping its uploads if it is turned away."""
+    try:
+        return get_scheduler().enqueue(f'file/{agentId}')
+    except QueueFull:
+        await asyncio.to_thread(removeFiles,paths)
+        raise
+
+def runFileAgent(agentId,paths,region=None,on_crew=None):
+    """
+    Build and kick off the crew behind /agent/file/{agentId} on saved uploads,
+    removing the uploads afterwards. on_crew gets the crew before kickoff.
+    """
+    try:
+        if(agentId=='4'):
+            reader=IDReaderCrew(image_path=paths[0],ocr=cached_ocr)
+            fields=reader.read_fields() if ID_READER_FAST else None
+            if(fields is not None):
+                return fields
+            crew=reader.crew()
+            inputs={"image_path": paths[0]}
+        elif(agentId=='12'):
+            inputs={"contract_text": load_document(paths[0])}
+            crew=ContractOptimizationCrew().crew()
+        elif(agentId=='13'):
+            inputs={"file_path": paths[0], "region": region}
+            # figures come from pandas, so the CSV is never embedded for search; they are computed
+            # before the crew is built, so a file that cannot be analyzed is the client's error
+            try:
+                analysis=analyzeBudgetFile(paths[0])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            crew=AutomatedBudgetingAgent(inputs=inputs,analyze=lambda file_path: analysis).crew()
+        elif(agentId=='15'):
+            # every clip is transcribed at once before the crew starts, and clips heard before come from the cache
+            inputs={"audio_responses": [paths]}
+            crew=UserStoryCrew(transcribe=transcribe_files).crew()
+        elif(agentId=='16'):
+            inputs={'contract_file': paths[0]}
+            crew=ContractSummarizer().crew()
+        elif(agentId=='17'):
+            inputs={'document_file': paths[0]}
+            crew=DocumentProcessor().crew()
+        elif(agentId=='18'):
+            # the rules file is matched by content hash, so a known rules document is not parsed again
+            rules=register_rules(paths[0])
+            inputs={'rules_text': rules.text, 'claims_document': paths[1]}
+            crew=ClaimsProcessor().crew()
+        if(on_crew):
+            on_crew(crew)
+        return crew.kickoff(inputs=inputs)
+    finally:
+        removeFiles(paths)
+
+@agent_router.post('/file/{agentId}',dependencies=[Depends(JWTBearer())])
+async def agentsFile(agentId,file:UploadFile=None,file2:UploadFile=None,files:List[UploadFile]=None,region:Annotated[str, Form()]=None,functionality:Annotated[str ,Form()]=None):
+    paths=await saveFileAgentUploads(agentId,file,file2,files)
+    ticket=await admitFileAgent(agentId,paths)
+    response=await get_scheduler().execute(ticket,runFileAgent,agentId,paths,region)
+    return {"result":response}
+
+@agent_router.post('/{agentId}/stream',dependencies=[Depends(JWTBearer())])
+async def streamAgent(agentId,agent:dict=Body(...)):
+    spec,inputs=resolveAgent(agentId,agent)
+    ticket=get_scheduler().enqueue(agentId)
+    events=stream_crew(lambda on_crew: spec.kickoff(inputs,on_crew),lambda *args: get_scheduler().execute(ticket,*args))
+    return StreamingResponse(events,media_type="text/event-stream",headers=SSE_HEADERS)
+
+@agent_router.post('/file/{agentId}/stream',dependencies=[Depends(JWTBearer())])
+async def streamFileAgent(agentId,file:UploadFile=None,file2:UploadFile=None,files:List[UploadFile]=None,region:Annotated[str, Form()]=None):
+    paths=await saveFileAgentUploads(agentId,file,file2,files)
+    ticket=await admitFileAgent(agentId,paths)
+    events=stream_crew(lambda on_crew: runFileAgent(agentId,paths,region,on_crew),lambda *args: get_scheduler().execute(ticket,*args))
+    return StreamingResponse(events,media_type="text/event-stream",headers=SSE_HEADERS)
+
+#claims
+def registerRulesUpload(path,name,summarize):
+    try:
+        return register_rules(path,name,summarize)
+    finally:
+        removeFiles([path])
+
+@claims_router.post('/rules',dependencies=[Depends(JWTBearer())])
+async def registerRules(file:UploadFile,summarize:Annotated[bool, Form()]=False):
+    saved=await save_upload(file,AGENT_UPLOAD_DIRS['18'],documentExtension(file.filename))
+    rules=await asyncio.to_thread(registerRulesUpload,saved.path,file.filename,summarize)
+    return rules.info()
+
+@claims_router.get('/rules/{rulesId}',dependencies=[Depends(JWTBearer())])
+async def getRules(rulesId:str):
+    rules=await asyncio.to_thread(get_rules,rulesId)
+    if(not rules):
+        raise HTTPException(status_code=404, detail="Rules Not Found")
+    return rules.info()
+
+def runClaim(rules,claimPath,useSummary=False,on_crew=None):
+    """Check one claims document against registered rules, removing the upload afterwards."""
+    try:
+        crew=ClaimsProcessor().crew()
+        if(on_crew):
+            on_crew(crew)
+        return crew.kickoff(inputs={'rules_text': rules.prompt_text(useSummary), 'claims_document': claimPath})
+    finally:
+        removeFiles([claimPath])
+
+@claims_router.post('/rules/{rulesId}/claim',dependencies=[Depends(JWTBearer())])
+async def processClaim(rulesId:str,file:UploadFile,useSummary:Annotated[bool, Form()]=False):
+    rules=await asyncio.to_thread(get_rules,rulesId)
+    if(not rules):
+        raise HTTPException(status_code=404, detail="Rules Not Found")
+    saved=await save_upload(file,AGENT_UPLOAD_DIRS['18'],documentExtension(file.filename))
+    ticket=await admitFileAgent('18',[saved.path])
+    result=await get_scheduler().execute(ticket,runClaim,rules,saved.path,useSummary)
+    return {"result":result}
+
+async def runClaimsBatch(rules,claims,useSummary,results):
+    """
+    Process a batch of saved claims documents: extract them all up front in the
+    extraction process pool, then run at most CLAIMS_BATCH_WORKERS claim crews
+    at a time through the scheduler, putting each outcome on results as it lands.
+    """
+    texts=await asyncio.to_thread(extract_texts,[path for path,_ in claims],clean_text)
+    workers=asyncio.Semaphore(CLAIMS_BATCH_WORKERS)
+    async def runOne(path,name):
+        if(isinstance(texts[path],Exception)):
+            await asyncio.to_thread(removeFiles,[path])
+            return {"name":name,"error":str(texts[path])}
+        async with workers:
+            try:
+                # tickets are only taken by claims about to run, so a large batch never fills the shared queue
+                ticket=get_scheduler().enqueue('claims-batch',reject=False)
+                output=await get_scheduler().execute(ticket,runClaim,rules,path,useSummary)
+                return {"name":name,**claim_verdict(output),"report":output.raw}
+            except Exception as e:
+                return {"name":name,"error":str(e)}
+    for outcome in asyncio.as_completed([runOne(path,name) for path,name in claims]):
+        await results.put(await outcome)
+    await results.put(None)
+
+def startClaimsBatch(batch,results):
+    """Run a batch coroutine to the end even if the client stops reading; a batch that dies ends its results."""
+    task=asyncio.ensure_future(batch)
+    claimsBatches.add(task)
+    def finished(task):
+        claimsBatches.discard(task)
+        if(task.cancelled() or task.exception()):
+            results.put_nowait(None)
+    task.add_done_callback(finished)
+    return task
+
+async def claimsBatchEvents(rules,names,batch,results):
+    yield sse('batch_started',{"rules":rules.id,"claims":names})
+    summary={"total":len(names),"passed":0,"failed":0,"unknown":0,"errors":0,"claims":[]}
+    while True:
+        outcome=await results.get()
+        if(outcome is None):
+            break
+        if('error' in outcome):
+            summary['errors']+=1
+            summary['claims'].append({"name":outcome['name'],"verdict":"error"})
+            yield sse('claim_failed',outcome)
+            continue
+        summary[{'pass':'passed','fail':'failed'}.get(outcome['verdict'],'unknown')]+=1
+        summary['claims'].append({"name":outcome['name'],"verdict":outcome['verdict']})
+        yield sse('claim',outcome)
+    if(batch.cancelled()):
+        yield sse('error',{"detail":"The batch was cancelled"})
+    elif(batch.done() and batch.exception()):
+        yield sse('error',{"detail":str(batch.exception())})
+    yield sse('summary',summary)
+
+@claims_router.post('/batch',dependencies=[Depends(JWTBearer())])
+async def processClaimsBatch(claims:List[UploadFile]=None,archive:UploadFile=None,rules:UploadFile=None,rulesId:Annotated[str, Form()]=None,useSummary:Annotated[bool, Form()]=False):
+    """
+    One rules document (uploaded, or registered earlier and referenced by rulesId)
+    checked against many claims documents, uploaded directly or as a zip. Results
+    stream back as Server-Sent Events in completion order, then a compliance summary.
+    """
+    folder=AGENT_UPLOAD_DIRS['18']
+    if(rulesId):
+        rulesDocument=await asyncio.to_thread(get_rules,rulesId)
+        if(not rulesDocument):
+            raise HTTPException(status_code=404, detail="Rules Not Found")
+    elif(rules):
+        saved=await save_upload(rules,folder,documentExtension(rules.filename))
+        rulesDocument=await asyncio.to_thread(registerRulesUpload,saved.path,rules.filename,False)
+    else:
+        raise HTTPException(status_code=400, detail="A rules document or rulesId is required")
+    saved=[]
+    try:
+        for upload in claims or []:
+            claim=await save_upload(upload,folder,documentExtension(upload.filename))
+            saved.append((claim.path,upload.filename))
+        if(archive):
+            upload=await save_upload(archive,folder,'.zip')
+            try:
+                saved+=await asyncio.to_thread(extract_archive,upload.path,folder,('.pdf','.docx','.txt'))
+            finally:
+                await asyncio.to_thread(removeFiles,[upload.path])
+    except BaseException:
+        await asyncio.to_thread(removeFiles,[path for path,_ in saved])
+        raise
+    if(not saved):
+        raise HTTPException(status_code=400, detail="No claims documents were uploaded")
+    results=asyncio.Queue()
+    batch=startClaimsBatch(runClaimsBatch(rulesDocument,saved,useSummary,results),results)
+    events=claimsBatchEvents(rulesDocument,[name for _,name in saved],batch,results)
+    return StreamingResponse(events,media_type="text/event-stream",headers=SSE_HEADERS)
+
+#jobs
+@job_router.post('/agent/{agentId}',dependencies=[Depends(JWTBearer())])
+async def submitAgentJob(agentId,agent:dict=Body(...)):
+    spec,inputs=resolveAgent(agentId,agent)
+    jobId=await asyncio.to_thread(get_job_runner().submit,agentId,lambda on_crew: spec.kickoff(inputs,on_crew))
+    return {"job":jobId,"status":"pending"}
+
+@job_router.post('/agent/file/{agentId}',dependencies=[Depends(JWTBearer())])
+async def submitFileAgentJob(agentId,file:UploadFile=None,file2:UploadFile=None,files:List[UploadFile]=None,region:Annotated[str, Form()]=None):
+    paths=await saveFileAgentUploads(agentId,file,file2,files)
+    jobId=await asyncio.to_thread(get_job_runner().submit,f'file/{agentId}',lambda on_crew: runFileAgent(agentId,paths,region,on_crew))
+    return {"job":jobId,"status":"pending"}
+
+@job_router.get('/{jobId}',dependencies=[Depends(JWTBearer())])
+async def getJob(jobId:str,wait:float=0):
+    runner=get_job_runner()
+    job=await asyncio.to_thread(runner.get,jobId)
+    if(not job):
+        raise HTTPException(status_code=404, detail="Job Not Found")
+    # long-poll until the job finishes or the wait (max 60s) runs out
+    deadline=asyncio.get_running_loop().time()+min(wait,60)
+    while(job['status'] not in FINISHED_STATES and asyncio.get_running_loop().time()<deadline):
+        future=runner.local_future(jobId)
+        remaining=deadline-asyncio.get_running_loop().time()
+        if(future):
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            # owned by another worker: poll the shared store
+            await asyncio.sleep(min(0.5,max(remaining,0)))
+        job=await asyncio.to_thread(runner.get,jobId)
+    return job
+
+@job_router.delete('/{jobId}',dependencies=[Depends(JWTBearer())])
+async def cancelJob(jobId:str):
+    runner=get_job_runner()
+    if(not await asyncio.to_thread(runner.cancel,jobId)):
+        job=await asyncio.to_thread(runner.get,jobId)
+        if(not job):
+            raise HTTPException(status_code=404, detail="Job Not Found")
+        raise HTTPException(status_code=409, detail=f"Job Already {job['status'].capitalize()}")
+    return {"job":jobId,"status":"cancelling"}
 
 @auth_router.post('/login')
 async def login(user:UserAgent):
-    retrieveUser=get_user({"email":user.email})
+    retrieveUser=await get_user({"email":user.email})
     if(retrieveUser):
-        if(verify_password(user.password,retrieveUser['password'])):
+        if(await verify_password(user.password,retrieveUser['password'])):
             accessToken=create_token(user.dict(),'accessToken')
             refreshToken=create_token(user.dict(),'refreshToken')
             newUser={"email":retrieveUser['email'],"tokens":{"access_token":accessToken,"refresh_token":refreshToken}}
-            updateRefreshToken(newUser['email'],refreshToken)
+            await updateRefreshToken(newUser['email'],refreshToken)
             return newUser
         raise HTTPException(status_code=404, detail="Invalid Credentials")
     raise HTTPException(status_code=404, detail="Invalid Credentials")
     
 @auth_router.post('/register')
 async def register(user:UserAgent):
-    retrieveUser=get_user({'email':user.email})
+    retrieveUser=await get_user({'email':user.email})
     if(retrieveUser):
         raise HTTPException(status_code=404, detail="User Already Exist")
     accessToken=create_token(user.dict(),'accessToken')
     refreshToken=create_token(user.dict(),'refreshToken')
-    passwordHash=get_password_hash(user.password)
+    passwordHash=await get_password_hash(user.password)
     newUser={"email":user.email,"password":passwordHash}
-    createdUser=create_user(newUser,refreshToken)
+    createdUser=await create_user(newUser,refreshToken)
     createdUser['tokens']={"accessToken":accessToken,"refreshToken":refreshToken}
     del createdUser['password']
     return createdUser
@@ -238,7 +440,7 @@ async def register(user:UserAgent):
 @auth_router.post('/forgot-password')
 async def forgotPass(email:str):
     user={"email":email}
-    retrieveUser=get_user(user)
+    retrieveUser=await get_user(user)
     if(not retrieveUser):
         raise HTTPException(status_code=404, detail="User Doesnt Exist")
     return user
@@ -247,10 +449,10 @@ async def forgotPass(email:str):
 async def changePass(newPass:ChangePassModel):
     newPassword=newPass.password
     user={"email":newPass.email}
-    retrieveUser=get_user(user)
+    retrieveUser=await get_user(user)
     if(not retrieveUser):
         raise HTTPException(status_code=404, detail="User Doesnt Exist")
-    change_password(user,newPassword)
+    await change_password(user,newPassword)
     return 'done'
 
 @auth_router.post('/tokens')
@@ -259,9 +461,9 @@ async def newTokens(request:RefreshTokenModel):
         refreshToken=request.refreshToken
         print('refresh',refreshToken)
         data=decode_token(refreshToken)
-        if(verifyRefreshMatchToken(data['email'],refreshToken)):
+        if(await verifyRefreshMatchToken(data['email'],refreshToken)):
             newRefreshToken=create_token(data,'refreshToken')
-            updateRefreshToken(data['email'],newRefreshToken)
+            await updateRefreshToken(data['email'],newRefreshToken)
             newTokens={"access_token":create_token(data,'accessToken'),"refresh_token":newRefreshToken}
             return newTokens
         else:
@@ -273,19 +475,17 @@ async def newTokens(request:RefreshTokenModel):
 
 @app.post('/logout', dependencies=[Depends(JWTBearer())])
 async def logout(request:Request):
-    token = request.headers['authorization'].split()[1]
     try:
-        data=decode_token(token)
-        updateRefreshToken(data['email'],'')
+        data=request.state.claims
+        await updateRefreshToken(data['email'],'')
         return 'Success'
     except:
         raise HTTPException(status_code=403, detail="Invalid Access Token")
 
 @app.get('/user',dependencies=[Depends(JWTBearer())])
 async def getUser(request:Request):
-    token = request.headers['authorization'].split()[1]
     try:
-        data=decode_token(token)
+        data=dict(request.state.claims)
         return data
     except:
         raise HTTPException(status_code=403, detail="Invalid Access Token")
@@ -305,54 +505,62 @@ async def deleteFile(file:DeleteFiles):
     print('deleted File Sucessfully')
     return 'Success'
 
+async def saveChatDocument(upload):
+    saved=await save_upload(upload,UPLOAD_DIR,'.pdf')
+    return saved.path
+
 @app.post('/start/policy-chat',dependencies=[Depends(JWTBearer())])
 async def policyStart(file:UploadFile):
-        file_name=generate(size=10)
-        audio_path = f'./uploads/{file_name}.pdf'
-        with open(audio_path, "wb") as f:
-            data=await asyncio.to_thread(file.file.read)
-            await asyncio.to_thread(f.write,data)
-        # response = id_reader_crew.crew().kickoff(inputs=inputs)
-        # os.remove(audio_path)
-        
-        return {"result":f"{file_name}.pdf"}
+        audio_path=await saveChatDocument(file)
+        ingestion=await asyncio.to_thread(start_ingestion,audio_path)
+        return {"result":os.path.basename(audio_path),"ingestion":ingestion}
+
+@app.get('/ingestion/{ingestionId}',dependencies=[Depends(JWTBearer())])
+async def ingestionStatus(ingestionId:str,wait:float=0):
+    job=get_ingestion(ingestionId)
+    if(job and wait>0):
+        # long-poll: hold the request until the index is ready or the wait runs out
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)),timeout=min(wait,60))
+        except Exception:
+            pass
+    status=await asyncio.to_thread(ingestion_status,ingestionId)
+    if(not status):
+        raise HTTPException(status_code=404, detail="Ingestion Not Found")
+    return status
 
 @app.post('/policy-chat/chat',dependencies=[Depends(JWTBearer())])
 async def policyChat(chat:PolicyChatModel):    
     pdf_path=f'./uploads/{chat.pdf}'
-    policy_crew =  PolicyCrew(pdf_path=pdf_path)
+    search_tool=await asyncio.to_thread(get_pdf_search_tool,pdf_path)
+    policy_crew =  PolicyCrew(pdf_path=pdf_path,pdf_search_tool=search_tool)
     context=' | '.join(chat.context)
     inputs={
         "query": chat.query,
         "context": context,
     }
-    result=await asyncio.to_thread(policy_crew.crew().kickoff,inputs)
+    result=await get_scheduler().run('policy-chat',policy_crew.crew().kickoff,inputs)
     result=result.dict()
     result['type']=2
     return {'result':result}
 
 @app.post('/start/chatbot',dependencies=[Depends(JWTBearer())])
 async def chatBotStart(file:UploadFile):
-        file_name=generate(size=10)
-        audio_path = f'./uploads/{file_name}.pdf'
-        with open(audio_path, "wb") as f:
-            data=await asyncio.to_thread(file.file.read)
-            await asyncio.to_thread(f.write,data)
-        # response = id_reader_crew.crew().kickoff(inputs=inputs)
-        # os.remove(audio_path)
-        
-        return {"result":f"{file_name}.pdf"}
+        audio_path=await saveChatDocument(file)
+        ingestion=await asyncio.to_thread(start_ingestion,audio_path)
+        return {"result":os.path.basename(audio_path),"ingestion":ingestion}
 
 @app.post('/chatbot/chat',dependencies=[Depends(JWTBearer())])
 async def chatBotChat(chat:PolicyChatModel):    
     pdf_path=f'./uploads/{chat.pdf}'
-    policy_crew =  ChatCrew(pdf_path=pdf_path)
+    search_tool=await asyncio.to_thread(get_pdf_search_tool,pdf_path)
+    policy_crew =  ChatbotCrew(pdf_path=pdf_path,pdf_search_tool=search_tool)
     context=' | '.join(chat.context)
     inputs={
         "query": chat.query,
         "context": context,
     }
-    result=await asyncio.to_thread(policy_crew.crew().kickoff,inputs)
+    result=await get_scheduler().run('chatbot',policy_crew.crew().kickoff,inputs)
     result=result.dict()
     result['type']=2
     return {'result':result}
@@ -361,72 +569,40 @@ async def chatBotChat(chat:PolicyChatModel):
 async def policyStart(file:List[UploadFile]): 
         fileArray=[]
         for i in file:
-            file_name=generate(size=10)
-            audio_path = f'./uploads/{file_name}.pdf'
-            fileArray.append(f"{file_name}.pdf")
-            with open(audio_path, "wb") as f:
-                data=await asyncio.to_thread(i.file.read)
-                await asyncio.to_thread(f.write,data)
-        return {"result":fileArray}
-
-def merge_pdfs(pdf_paths, output_path="merged.pdf"):
-    """
-    Merge multiple PDFs into one.
-    
-    Args:
-        pdf_paths (list): List of paths to the PDF files.
-        output_path (str): Path to save the merged PDF.
-    
-    Returns:
-        str: Path to the merged PDF.
-    """
-    if len(pdf_paths) == 1:
-        return pdf_paths[0]  # No merging needed if only one PDF is provided
-
-    merger = PdfMerger()
-    for pdf in pdf_paths:
-        merger.append(pdf)
-    merger.write(output_path)
-    merger.close()
-    return output_path
+            audio_path=await saveChatDocument(i)
+            fileArray.append(os.path.basename(audio_path))
+        ingestion=await asyncio.to_thread(start_ingestion,[f'./uploads/{i}' for i in fileArray])
+        return {"result":fileArray,"ingestion":ingestion}
 
 def initialize_virtual_assistant(pdf_paths):
     """
     Initialize the Virtual Assistant with the given PDF(s).
-    If there are two PDFs, they are merged before initializing.
+    All PDFs go into one shared index, so they no longer need to be merged first.
     """
-    # Merge PDFs if more than one is provided
-    merged_pdf_path = merge_pdfs(pdf_paths)
-    print(f"Using merged PDF at: {merged_pdf_path}")
-    return ChatCrew(pdf_paths=[merged_pdf_path])
+    search_tool = get_pdf_search_tool(pdf_paths)
+    return ChatCrew(pdf_paths=pdf_paths, pdf_search_tool=search_tool)
 
 @app.post('/virtual-chat/chat',dependencies=[Depends(JWTBearer())])
 async def policyChat(chat:VirtualChatModel):    
     pdfPaths=[]
     for i in chat.pdf:
         pdfPaths.append(f'./uploads/{i}')
-    assistant_crew = initialize_virtual_assistant(pdfPaths)
+    assistant_crew = await asyncio.to_thread(initialize_virtual_assistant,pdfPaths)
     context=' | '.join(chat.context)
     inputs={
         "query": chat.query,
         "context": context,
     }
-    result=await asyncio.to_thread(assistant_crew.crew().kickoff,inputs)
+    result=await get_scheduler().run('virtual-chat',assistant_crew.crew().kickoff,inputs)
     result=result.dict()
     result['type']=2
     return {'result':result}
 
 @app.post('/start/onboarding-agent',dependencies=[Depends(JWTBearer())])
 async def onboardingStart(file:UploadFile):
-        file_name=generate(size=10)
-        audio_path = f'./uploads/{file_name}.pdf'
-        with open(audio_path, "wb") as f:
-            data=await asyncio.to_thread(file.file.read)
-            await asyncio.to_thread(f.write,data)
-        # response = id_reader_crew.crew().kickoff(inputs=inputs)
-        # os.remove(audio_path)
-        
-        return {"result":file_name}
+        audio_path=await saveChatDocument(file)
+        ingestion=await asyncio.to_thread(start_ingestion,audio_path)
+        return {"result":Path(audio_path).stem,"ingestion":ingestion}
 
 @app.post('/onboarding-agent/chat',dependencies=[Depends(JWTBearer())])
 async def onboardingChat(chat:OnboardingChatModel):    
@@ -436,15 +612,47 @@ async def onboardingChat(chat:OnboardingChatModel):
         "context":chat.context,
         "pdf_path": pdf_path
     }
-    result=await asyncio.to_thread(OnboardingChatbot(inputs=inputs).crew().kickoff,inputs)
+    search_tool=await asyncio.to_thread(get_pdf_search_tool,pdf_path)
+    result=await get_scheduler().run('onboarding-agent',OnboardingChatbot(inputs=inputs,pdf_search_tool=search_tool).crew().kickoff,inputs)
     result=result.dict()
     result['type']=2
     return {'result':result}
 
 
+@app.get('/llm-cache',dependencies=[Depends(JWTBearer())])
+async def llmCacheStats():
+    cache=get_llm_cache()
+    if(not cache):
+        return {"enabled":False}
+    return {"enabled":True,**await asyncio.to_thread(cache.stats)}
+
+@app.get('/scheduler',dependencies=[Depends(JWTBearer())])
+async def schedulerStats():
+    return get_scheduler().snapshot()
+
+@app.get('/health')
+async def health():
+    return {"status":"accepting"}
+
+@app.get('/ready')
+async def ready():
+    status=agentWarmup.status()
+    return JSONResponse(status_code=200 if status['warm'] else 503,content=status)
+
+@app.get('/metrics')
+async def metrics():
+    body,contentType=await asyncio.to_thread(metrics_response)
+    return Response(content=body,media_type=contentType)
+
+@app.on_event('shutdown')
+def dropWorkerMetrics():
+    worker_exited()
+
 @app.get('/users')
-def getUsers():
-    return retreiveUsers()
+async def getUsers():
+    return await retreiveUsers()
 
 app.include_router(agent_router)
-app.include_router(auth_router)
\ No newline at end of file
+app.include_router(auth_router)
+app.include_router(job_router)
+app.include_router(claims_router)
\ No newline at end of file
@@ -0,0 +1,62 @@
+import io
+import os
+from dotenv import load_dotenv
+from pydub import AudioSegment
+from pydub.silence import detect_leading_silence
+from pydub.utils import which
+
+load_dotenv()
+
+# speech models work on 16 kHz mono, so anything above that is bytes on the wire for nothing
+AUDIO_SAMPLE_RATE=int(os.getenv('AUDIO_SAMPLE_RATE',16000))
+AUDIO_FORMAT=os.getenv('AUDIO_FORMAT','mp3')
+AUDIO_BITRATE=os.getenv('AUDIO_BITRATE','32k')
+# quieter than this, relative to full scale, counts as silence; AUDIO_PREPROCESS=0 sends uploads untouched
+SILENCE_THRESHOLD_DB=float(os.getenv('AUDIO_SILENCE_THRESHOLD_DB',-45))
+SILENCE_PADDING_MS=int(os.getenv('AUDIO_SILENCE_PADDING_MS',200))
+AUDIO_PREPROCESS=os.getenv('AUDIO_PREPROCESS','1')!='0'
+
+# pydub reads and writes WAV natively but needs ffmpeg for every compressed codec
+ENCODER_AVAILABLE=bool(which('ffmpeg') or which('avconv'))
+
+
+def output_format():
+    return AUDIO_FORMAT if ENCODER_AVAILABLE else 'wav'
+
+def audio_profile():
+    """Describes what preprocess_audio sends, so caches keyed on it notice a change of settings."""
+    if not AUDIO_PREPROCESS:
+        return 'raw'
+    audio_format=output_format()
+    encoding=audio_format if audio_format=='wav' else f"{audio_format}@{AUDIO_BITRATE}"
+    return f"{AUDIO_SAMPLE_RATE}hz:{encoding}:{SILENCE_THRESHOLD_DB:g}dB"
+
+def trim_silence(clip):
+    start=detect_leading_silence(clip,silence_threshold=SILENCE_THRESHOLD_DB)
+    end=len(clip)-detect_leading_silence(clip.reverse(),silence_threshold=SILENCE_THRESHOLD_DB)
+    if start>=end:
+        # nothing above the threshold: send the clip as it is rather than an empty file
+        return clip
+    return clip[max(0,start-SILENCE_PADDING_MS):min(len(clip),end+SILENCE_PADDING_MS)]
+
+def preprocess_audio(file_path):
+    """
+    (file name, bytes) to upload for an audio file: downmixed to mono,
+    resampled to AUDIO_SAMPLE_RATE, leading and trailing silence trimmed and
+    encoded as AUDIO_FORMAT, or 16-bit WAV when ffmpeg is not installed.
+    Files pydub cannot decode are sent unchanged.
+    """
+    name=os.path.basename(file_path)
+    if AUDIO_PREPROCESS:
+        try:
+            clip=AudioSegment.from_file(file_path)
+        except Exception:
+            clip=None
+        if clip is not None:
+            clip=trim_silence(clip.set_channels(1).set_frame_rate(AUDIO_SAMPLE_RATE).set_sample_width(2))
+            buffer=io.BytesIO()
+            audio_format=output_format()
+            clip.export(buffer,format=audio_format,bitrate=AUDIO_BITRATE if audio_format!='wav' else None)
+            return f"{os.path.splitext(name)[0]}.{audio_format}",buffer.getvalue()
+    with open(file_path,'rb') as f:
+        return name,f.read()
@@ -0,0 +1,147 @@
+import calendar
+import numpy as np
+import pandas as pd
+
+FORECAST_MONTHS=12
+# ratio-to-trend indices only separate seasonality from noise once every calendar month has been seen twice
+SEASONAL_CYCLES=2
+MONTHS={name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+
+
+def to_number(column):
+    # budget exports often carry currency symbols, thousands separators and stray spaces
+    return pd.to_numeric(column.astype(str).str.replace(r"[^\d.\-]", "", regex=True), errors='coerce')
+
+def month_numbers(periods):
+    """Calendar month (1-12) of each period label, or None when the labels are not months or dates."""
+    names=periods.astype(str).str.strip().str.lower()
+    numbers=names.map(MONTHS)
+    if numbers.notna().all():
+        return numbers.astype(int).to_numpy()
+    dates=pd.to_datetime(periods, errors='coerce')
+    if dates.notna().all():
+        return dates.dt.month.to_numpy()
+    return None
+
+
+class BudgetAnalysis:
+    """
+    Figures computed from a monthly budget table: one column per line of
+    business, one row per month in chronological order.
+    """
+    def __init__(self, table, months=None):
+        self.table = table
+        self.months = months
+        self.summary = self.summarize()
+        self.seasonality, self.seasonal = self.seasonal_indices()
+        self.forecast = self.baseline_forecast()
+
+    def lines_of_business(self):
+        return [str(column) for column in self.table.columns]
+
+    def trend(self):
+        """Slope and intercept of a least-squares line through every column at once."""
+        x=np.arange(len(self.table))
+        slope,intercept=np.polyfit(x, self.table.to_numpy(dtype=float), 1)
+        return slope,intercept
+
+    def summarize(self):
+        table=self.table
+        changes=table.pct_change(fill_method=None)
+        periods=len(table)-1
+        slope,_=self.trend()
+        summary=pd.DataFrame({
+            'total': table.sum(),
+            'monthly mean': table.mean(),
+            'first': table.iloc[0],
+            'last': table.iloc[-1],
+            'min month': table.idxmin(),
+            'max month': table.idxmax(),
+            'growth': table.iloc[-1]/table.iloc[0]-1,
+            'monthly growth (compound)': (table.iloc[-1]/table.iloc[0])**(1/max(periods,1))-1,
+            'monthly change volatility': changes.std(),
+            'trend per month': slope,
+        })
+        return summary
+
+    def seasonal_indices(self):
+        """
+        Mean ratio of each calendar month to the fitted trend, scaled to average 1,
+        and whether the history is long enough for the indices to be applied.
+        """
+        if self.months is None:
+            return None,False
+        slope,intercept=self.trend()
+        fitted=intercept+np.outer(np.arange(len(self.table)),slope)
+        ratios=pd.DataFrame(self.table.to_numpy(dtype=float)/fitted, columns=self.table.columns)
+        indices=ratios.groupby(self.months).mean()
+        indices=indices/indices.mean()
+        indices.index=[calendar.month_abbr[number] for number in indices.index]
+        seen=np.bincount(self.months, minlength=13)[1:]
+        return indices,bool(seen.min()>=SEASONAL_CYCLES)
+
+    def forecast_labels(self):
+        if self.months is None:
+            return [f"M+{step}" for step in range(1,FORECAST_MONTHS+1)]
+        last=int(self.months[-1])
+        return [calendar.month_name[(last+step-1)%12+1] for step in range(1,FORECAST_MONTHS+1)]
+
+    def baseline_forecast(self):
+        """Trend extrapolated twelve months ahead, scaled by the seasonal index when there is enough history."""
+        slope,intercept=self.trend()
+        steps=np.arange(len(self.table),len(self.table)+FORECAST_MONTHS)
+        values=intercept+np.outer(steps,slope)
+        if self.seasonal:
+            months=[(int(self.months[-1])+step-1)%12+1 for step in range(1,FORECAST_MONTHS+1)]
+            values=values*self.seasonality.loc[[calendar.month_abbr[month] for month in months]].to_numpy()
+        forecast=pd.DataFrame(np.maximum(values,0).round(0), columns=self.table.columns, index=self.forecast_labels())
+        forecast['All lines']=forecast.sum(axis=1)
+        return forecast
+
+    def to_markdown(self):
+        """Compact Markdown the forecaster gets instead of the raw file."""
+        summary=self.summary.copy()
+        for column in ('growth','monthly growth (compound)','monthly change volatility'):
+            summary[column]=summary[column].map(lambda value: f"{value:.1%}")
+        for column in ('total','monthly mean','first','last','trend per month'):
+            summary[column]=summary[column].map(lambda value: f"{value:,.0f}")
+        parts=[
+            f"Budget history: {len(self.table)} months ({self.table.index[0]} to {self.table.index[-1]}), "
+            f"{len(self.table.columns)} lines of business.",
+            "### Per-line figures", summary.to_markdown(),
+        ]
+        if self.seasonality is not None:
+            note="applied to the forecast" if self.seasonal else f"shown only; fewer than {SEASONAL_CYCLES} years of history, so the forecast uses the trend alone"
+            parts+=[f"### Seasonal index by month ({note})", self.seasonality.round(3).to_markdown()]
+        parts+=["### Baseline 12-month forecast (linear trend, before market adjustment)", self.forecast.to_markdown(floatfmt=',.0f')]
+        return "\n\n".join(parts)
+
+
+def analyze_budget_file(file_path):
+    """
+    BudgetAnalysis of a CSV with a period column (month names or dates) and a
+    numeric column per line of business. Raises ValueError, with a message for
+    the user, for files without numeric columns, with fewer than two months or
+    with a line of business that starts at zero, which leaves no base for growth.
+    """
+    raw=pd.read_csv(file_path)
+    numbers=raw.apply(to_number)
+    lines=[column for column in raw.columns if numbers[column].notna().mean()>=0.8]
+    labels=[column for column in raw.columns if column not in lines]
+    if not lines:
+        raise ValueError("The budget file has no numeric columns to analyze.")
+    table=numbers[lines].interpolate(limit_direction='both')
+    if len(table)<2:
+        raise ValueError("The budget file needs at least two months of figures to show a trend.")
+    zeroBase=[str(column) for column in lines if table[column].iloc[0]==0]
+    if zeroBase:
+        raise ValueError(f"The first month is zero for {', '.join(zeroBase)}, so growth cannot be measured from it.")
+    if labels:
+        periods=raw[labels[0]]
+        table.index=periods.astype(str).str.strip()
+        months=month_numbers(periods)
+    else:
+        table.index=[f"M{number}" for number in range(1,len(table)+1)]
+        months=None
+    return BudgetAnalysis(table,months)
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from crewai import LLM
+from dotenv import load_dotenv
+from utils.digests import file_digest
+from utils.text_extraction import clean_document_text
+
+load_dotenv()
+
+RULES_DIR=os.getenv('CLAIMS_RULES_DIR','./cache/claims_rules')
+SUMMARY_PROMPT=(
+    "Condense the following claims-processing rules into a numbered list. Keep every rule, "
+    "threshold, deadline and required field; drop only boilerplate and repetition.\n\n{rules}"
+)
+
+
+class RulesDocument:
+    """A rules document extracted and cleaned once, stored under its content digest."""
+    def __init__(self, id, name, text, summary=None, created=None):
+        self.id = id
+        self.name = name
+        self.text = text
+        self.summary = summary
+        self.created = created or time.time()
+
+    def prompt_text(self, use_summary=False):
+        return self.summary if use_summary and self.summary else self.text
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "text": self.text, "summary": self.summary, "created": self.created}
+
+    def info(self):
+        return {
+            "id": self.id, "name": self.name, "created": self.created,
+            "characters": len(self.text), "summarized": self.summary is not None,
+        }
+
+
+# rules documents already loaded by this process, keyed by digest
+rulesDocuments={}
+rulesLock=threading.Lock()
+digestLocks={}
+
+
+def rules_path(rules_id):
+    return os.path.join(RULES_DIR,f'{rules_id}.json')
+
+def digest_lock(digest):
+    with rulesLock:
+        return digestLocks.setdefault(digest,threading.Lock())
+
+def save_rules(rules):
+    os.makedirs(RULES_DIR,exist_ok=True)
+    path=rules_path(rules.id)
+    # a temporary name of its own per writer, so other workers only ever see a complete artifact
+    temporary=f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temporary,'w',encoding='utf-8') as f:
+        json.dump(rules.to_dict(),f)
+    os.replace(temporary,path)
+
+def get_rules(rules_id):
+    """Registered rules document by id, or None."""
+    rules=rulesDocuments.get(rules_id)
+    if rules is not None:
+        return rules
+    if not rules_id.isalnum() or not os.path.exists(rules_path(rules_id)):
+        return None
+    with open(rules_path(rules_id),encoding='utf-8') as f:
+        rules=RulesDocument(**json.load(f))
+    rulesDocuments[rules_id]=rules
+    return rules
+
+def summarize_rules(text):
+    llm=LLM(model=os.getenv("MODEL"),temperature=0)
+    return llm.call([{"role": "user", "content": SUMMARY_PROMPT.format(rules=text)}])
+
+def register_rules(file_path,name=None,summarize=False):
+    """
+    Extract and clean a rules document once and keep the result under its
+    content digest. Registering the same document again, by upload or as the
+    rules file of a single claim, returns the stored artifact. Only
+    registrations of the same document wait for each other.
+    """
+    digest=file_digest(file_path)
+    with digest_lock(digest):
+        rules=get_rules(digest)
+        if rules is not None and (rules.summary is not None or not summarize):
+            return rules
+        if rules is None:
+            rules=RulesDocument(digest,name or os.path.basename(file_path),clean_document_text(file_path))
+        else:
+            rules=RulesDocument(**rules.to_dict())
+        if summarize:
+            rules.summary=summarize_rules(rules.text)
+        save_rules(rules)
+        rulesDocuments[digest]=rules
+    return rules
+
+def claim_verdict(output):
+    """
+    Pass/fail of one processed claim, read from the structured findings of the
+    analysis task, which give every rule a "compliant" or "violated" status.
+    Any violated rule fails the claim; without findings the verdict is unknown.
+    """
+    tasks_output=getattr(output,'tasks_output',None) or []
+    analyses=[getattr(task,'pydantic',None) for task in tasks_output]
+    findings=next((analysis.findings for analysis in analyses if getattr(analysis,'findings',None) is not None),[])
+    statuses=[finding.status for finding in findings]
+    violated=statuses.count('violated')
+    compliant=statuses.count('compliant')
+    verdict='fail' if violated else 'pass' if compliant else 'unknown'
+    return {"verdict": verdict, "violated": violated, "compliant": compliant}
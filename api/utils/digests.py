@@ -0,0 +1,41 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+CHUNK_SIZE=1024*1024
+REMEMBERED_DIGESTS=4096
+
+# uploads are immutable once written, so a digest is remembered per (path, size, mtime)
+fileDigests=OrderedDict()
+fileDigestsLock=threading.Lock()
+
+
+def file_key(file_path):
+    stat=os.stat(file_path)
+    return (os.path.realpath(file_path),stat.st_size,stat.st_mtime_ns)
+
+def file_digest(file_path):
+    """SHA-256 of a file's content, read at most once per version of the file."""
+    key=file_key(file_path)
+    with fileDigestsLock:
+        digest=fileDigests.get(key)
+    if digest is not None:
+        return digest
+    sha=hashlib.sha256()
+    with open(file_path,'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    digest=sha.hexdigest()
+    remember(key,digest)
+    return digest
+
+def remember(key,digest):
+    with fileDigestsLock:
+        fileDigests[key]=digest
+        while len(fileDigests)>REMEMBERED_DIGESTS:
+            fileDigests.popitem(last=False)
+
+def remember_file_digest(file_path,digest):
+    """Record a digest computed while the file was being written so later readers don't hash it again."""
+    remember(file_key(file_path),digest)
@@ -0,0 +1,271 @@
+import ast
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import typing
+from crewai import LLM
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.utilities import InternalInstructor
+from dotenv import load_dotenv
+from pydantic import BaseModel
+from utils import llm_cache, transcription
+
+load_dotenv()
+
+# off by default; "1" replays recordings and falls back to synthetic answers, "record" calls the real providers and saves them
+FAKE_PROVIDERS=os.getenv('FAKE_PROVIDERS','0')
+RECORDINGS_DIR=os.getenv('FAKE_RECORDINGS_DIR','./benchmarks/recordings')
+LLM_LATENCY=int(os.getenv('FAKE_LLM_LATENCY_MS',200))/1000
+TOOL_LATENCY=int(os.getenv('FAKE_TOOL_LATENCY_MS',100))/1000
+RESPONSE_WORDS=int(os.getenv('FAKE_RESPONSE_WORDS',120))
+
+TOOL_SPEC=re.compile(r"Tool Name: (.+)\nTool Arguments: (\{.*\})")
+FILE_MENTION=re.compile(r"[\w./-]+\.\w+")
+FILLER=("The analysis covers market context, customer needs, risks and next steps "
+        "with concrete recommendations backed by the available evidence").split()
+
+
+class FakeStats:
+    """
+    What the fake providers stood in for, so benchmarks can subtract it from
+    measured latency. simulated_seconds sums every call; busy_seconds is the
+    wall time during which at least one call was in flight, so calls that
+    overlap, as in crews that run tasks in parallel, count once.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.llm_calls = 0
+            self.tool_calls = 0
+            self.replayed = 0
+            self.simulated_seconds = 0.0
+            self.busy_seconds = 0.0
+            self.busy_since = time.perf_counter()
+
+    def add(self, counter, seconds):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.simulated_seconds += seconds
+
+    def begin(self):
+        with self.lock:
+            if self.in_flight == 0:
+                self.busy_since = time.perf_counter()
+            self.in_flight += 1
+
+    def end(self, counter, seconds):
+        with self.lock:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self.busy_seconds += time.perf_counter() - self.busy_since
+        self.add(counter, seconds)
+
+    def snapshot(self):
+        with self.lock:
+            busy = self.busy_seconds
+            if self.in_flight:
+                busy += time.perf_counter() - self.busy_since
+            return {"llm_calls": self.llm_calls, "tool_calls": self.tool_calls, "replayed": self.replayed,
+                    "simulated_seconds": round(self.simulated_seconds, 3), "busy_seconds": round(busy, 3)}
+
+
+fakeStats = FakeStats()
+
+
+def simulate(counter, seconds):
+    fakeStats.begin()
+    try:
+        time.sleep(seconds)
+    finally:
+        fakeStats.end(counter, seconds)
+
+def text_of(messages):
+    return "\n".join(str(message.get("content") or "") for message in messages)
+
+def synthetic_text(prompt):
+    subject = " ".join(prompt.split()[-12:])
+    words = [FILLER[i % len(FILLER)] for i in range(RESPONSE_WORDS)]
+    return f"Synthetic answer about: {subject}\n\n" + " ".join(words) + "."
+
+def argument_value(name, prompt):
+    # a file argument gets the first existing file the task names, as a real agent would pass it
+    if name.endswith("_path"):
+        for candidate in FILE_MENTION.findall(prompt):
+            if os.path.isfile(candidate):
+                return candidate
+    return "benchmark"
+
+def tool_action(prompt):
+    """First tool the agent was offered, called with placeholder values for each argument."""
+    match = TOOL_SPEC.search(prompt)
+    if not match:
+        return None
+    try:
+        arguments = ast.literal_eval(match.group(2))
+    except (ValueError, SyntaxError):
+        arguments = {}
+    values = {name: argument_value(name, prompt) for name in arguments}
+    return f"Thought: I should look this up first.\nAction: {match.group(1).strip()}\nAction Input: {json.dumps(values)}"
+
+def synthetic_completion(messages):
+    prompt = text_of(messages)
+    if "Final Answer:" not in prompt:
+        # a plain completion outside the agent loop
+        return synthetic_text(prompt)
+    # the agent loop appends each action and its observation as an assistant turn
+    if not any(message.get("role") == "assistant" for message in messages):
+        action = tool_action(prompt)
+        if action:
+            return action
+    return f"Thought: I now know the final answer\nFinal Answer: {synthetic_text(prompt)}"
+
+def synthetic_value(annotation):
+    origin = typing.get_origin(annotation)
+    arguments = [argument for argument in typing.get_args(annotation) if argument is not type(None)]
+    if origin in (list, set, tuple):
+        return [synthetic_value(arguments[0])] if arguments else []
+    if origin is dict:
+        return {}
+    if origin is typing.Literal:
+        return arguments[0]
+    if origin is not None:
+        # Optional / Union: the first concrete alternative
+        return synthetic_value(arguments[0]) if arguments else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return synthetic_model(annotation)
+    return {str: "benchmark", int: 1, float: 1.0, bool: True}.get(annotation, "benchmark")
+
+def synthetic_model(model):
+    return model(**{name: synthetic_value(field.annotation) for name, field in model.model_fields.items()})
+
+def fake_structured_output(self):
+    # output_pydantic / output_json conversion goes straight to litellm through instructor, not through LLM.call
+    simulate('llm_calls', LLM_LATENCY)
+    return synthetic_model(self.model)
+
+def recording_path(key):
+    return os.path.join(RECORDINGS_DIR, f'{key}.json')
+
+def recorded_completion(key):
+    path = recording_path(key)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['response']
+
+def record_completion(key, response):
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    with open(recording_path(key), 'w', encoding='utf-8') as f:
+        json.dump({"response": response}, f)
+
+def emit_chunks(llm, response, from_task, from_agent):
+    for chunk in re.findall(r"\S+\s*", response):
+        crewai_event_bus.emit(llm, event=LLMStreamChunkEvent(chunk=chunk, from_task=from_task, from_agent=from_agent))
+
+realCall = None
+
+def fake_call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    key = llm_cache.cache_key(self._prepare_completion_params(messages, tools))
+    if FAKE_PROVIDERS == 'record':
+        response = realCall(self, messages, tools=tools, callbacks=callbacks, available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+        if isinstance(response, str):
+            record_completion(key, response)
+        return response
+    response = recorded_completion(key)
+    if response is not None:
+        fakeStats.add('replayed', 0)
+    else:
+        response = synthetic_completion(messages)
+    simulate('llm_calls', LLM_LATENCY)
+    if self.stream:
+        emit_chunks(self, response, from_task, from_agent)
+    return response
+
+
+def fake_tool_run(name):
+    def run(self, *args, **kwargs):
+        simulate('tool_calls', TOOL_LATENCY)
+        query = " ".join(str(value) for value in [*args, *kwargs.values()])
+        return f"Synthetic {name} result for '{query}'. " + " ".join(FILLER)
+    return run
+
+async def fake_transcript(client, audio):
+    fakeStats.begin()
+    try:
+        await asyncio.sleep(TOOL_LATENCY)
+    finally:
+        fakeStats.end('tool_calls', TOOL_LATENCY)
+    return f"Synthetic transcript of {audio[0]}. " + " ".join(FILLER)
+
+def fake_ocr(mime_type, data):
+    simulate('tool_calls', TOOL_LATENCY)
+    return json.dumps({"document": "Synthetic ID card", "image_type": mime_type, "image_bytes": len(data)})
+
+def fake_id_fields(mime_type, data):
+    simulate('llm_calls', LLM_LATENCY)
+    from agents.user_id_agent.crew import IDFields
+    return synthetic_model(IDFields).model_dump_json()
+
+def fake_add(self, *args, **kwargs):
+    # nothing is embedded, so RAG tools never reach the embeddings API
+    simulate('tool_calls', TOOL_LATENCY)
+
+def rag_tools(tool_class):
+    for subclass in tool_class.__subclasses__():
+        yield subclass
+        yield from rag_tools(subclass)
+
+def install_fake_tools():
+    from crewai_tools import SerperDevTool, ScrapeWebsiteTool
+    from crewai_tools.tools.rag.rag_tool import RagTool
+    from agents.customer_reach_agent.crew import BrowserlessScraper as CustomerReachScraper
+    from agents.person_research_agent.crew import BrowserlessScraper as PersonResearchScraper
+    from agents.user_id_agent import crew as id_reader
+    from agents.user_stories_agent.crew import OpenAITranscriptionTool
+    tools = {
+        'web search': SerperDevTool,
+        'page scrape': ScrapeWebsiteTool,
+        'browserless scrape': CustomerReachScraper,
+        'person page scrape': PersonResearchScraper,
+        'transcription': OpenAITranscriptionTool,
+    }
+    # PDFSearchTool, WebsiteSearchTool and the other RAG tools each override _run and add
+    for tool_class in [RagTool, *rag_tools(RagTool)]:
+        tools[f'{tool_class.__name__} search'] = tool_class
+        tool_class.add = fake_add
+    for name, tool_class in tools.items():
+        tool_class._run = fake_tool_run(name)
+    InternalInstructor.to_pydantic = fake_structured_output
+    transcription.request_transcript = fake_transcript
+    # OCRTool normalizes and caches images before this vision request, so only the request is faked
+    id_reader.request_ocr = fake_ocr
+    id_reader.request_id_fields = fake_id_fields
+
+def install_fake_providers():
+    """
+    Swap every external provider (OpenAI completions and embeddings, Serper,
+    website scraping, Browserless, Whisper and GPT-4o OCR) for local stand-ins
+    with fixed latency when FAKE_PROVIDERS is set. The LLM stand-in sits
+    under the completion cache, so cache behaviour stays measurable.
+    """
+    global realCall
+    if FAKE_PROVIDERS == '0':
+        return False
+    if realCall is None:
+        realCall = llm_cache.originalCall
+        llm_cache.originalCall = fake_call
+        if LLM.call is not llm_cache.cached_call:
+            LLM.call = fake_call
+        if FAKE_PROVIDERS != 'record':
+            install_fake_tools()
+    return True
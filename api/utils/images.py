@@ -0,0 +1,126 @@
+import hashlib
+import io
+import os
+import diskcache
+from dotenv import load_dotenv
+from opentelemetry import trace
+from PIL import Image, ImageChops, ImageOps
+from utils.digests import file_digest
+
+load_dotenv()
+
+OCR_CACHE_DIR=os.getenv('OCR_CACHE_DIR','./cache/ocr')
+# GPT-4o fits high-detail images into 2048x2048 and then scales the short side down to 768,
+# so pixels beyond that are uploaded and billed for nothing
+IMAGE_MAX_SIDE=int(os.getenv('IMAGE_MAX_SIDE',2048))
+IMAGE_SHORT_SIDE=int(os.getenv('IMAGE_SHORT_SIDE',768))
+IMAGE_QUALITY=int(os.getenv('IMAGE_JPEG_QUALITY',85))
+# how far a pixel may be from the border colour and still count as background when cropping
+CROP_TOLERANCE=int(os.getenv('IMAGE_CROP_TOLERANCE',24))
+CROP_MARGIN=8
+CROP_PROBE_SIDE=512
+# bump when normalize_image output changes so stale OCR results are ignored
+NORMALIZER_VERSION=1
+
+tracer=trace.get_tracer(__name__)
+ocrCache=None
+
+
+def get_ocr_cache():
+    global ocrCache
+    if ocrCache is None:
+        ocrCache=diskcache.Cache(OCR_CACHE_DIR)
+    return ocrCache
+
+def image_profile():
+    return f"v{NORMALIZER_VERSION}:{IMAGE_MAX_SIDE}:{IMAGE_SHORT_SIDE}:q{IMAGE_QUALITY}"
+
+def flatten(image):
+    # transparent areas become white, as the card would look printed
+    if image.mode in ('RGBA','LA') or (image.mode=='P' and 'transparency' in image.info):
+        image=image.convert('RGBA')
+        background=Image.new('RGB',image.size,'white')
+        background.paste(image,mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+def crop_border(image):
+    """Cut away a uniform border (scanner bed, desk) around the card, keeping a small margin."""
+    # the border is found on a small copy; at that size a margin of a few pixels is plenty
+    factor=max(1,max(image.size)//CROP_PROBE_SIDE)
+    probe=image.reduce(factor)
+    background=Image.new('RGB',probe.size,probe.getpixel((0,0)))
+    mask=ImageChops.difference(probe,background).convert('L').point(lambda value: 255 if value>CROP_TOLERANCE else 0)
+    box=mask.getbbox()
+    if box is None:
+        return image
+    left,top,right,bottom=(side*factor for side in box)
+    # a box this small is more likely a speck than the card
+    if (right-left)*(bottom-top)<image.width*image.height//4:
+        return image
+    margin=CROP_MARGIN+factor
+    return image.crop((max(0,left-margin),max(0,top-margin),min(image.width,right+margin),min(image.height,bottom+margin)))
+
+def target_scale(size):
+    return min(1,IMAGE_MAX_SIDE/max(size),IMAGE_SHORT_SIDE/min(size))
+
+def downscale(image):
+    scale=target_scale(image.size)
+    if scale>=1:
+        return image
+    return image.resize((max(1,round(image.width*scale)),max(1,round(image.height*scale))),Image.LANCZOS)
+
+def normalize_image(file_path):
+    """
+    (MIME type, bytes, pixel digest) of an image prepared for the vision model:
+    format detected from the content, EXIF orientation applied, uniform border
+    cropped, downscaled to what the model reads and re-encoded as JPEG or
+    PNG, whichever is smaller. The
+    digest covers the normalized pixels, so the same picture uploaded as
+    another file format or with other metadata maps to the same digest.
+    """
+    with Image.open(file_path) as opened:
+        # JPEGs decode straight at a fraction of their size; half as much again leaves room for the crop
+        scale=min(1,1.5*target_scale(opened.size))
+        opened.draft('RGB',(round(opened.width*scale),round(opened.height*scale)))
+        image=ImageOps.exif_transpose(opened)
+        image=downscale(crop_border(flatten(image)))
+    digest=hashlib.sha256(f"{image.size}".encode()+image.tobytes()).hexdigest()
+    # photos compress best as JPEG; flat cards and screenshots with a handful of colours may do better as PNG
+    formats=[('JPEG',dict(quality=IMAGE_QUALITY,optimize=True))]
+    if image.reduce(max(1,max(image.size)//CROP_PROBE_SIDE)).getcolors(256) is not None:
+        formats.append(('PNG',dict(optimize=True)))
+    encodings=[]
+    for image_format,options in formats:
+        buffer=io.BytesIO()
+        image.save(buffer,format=image_format,**options)
+        encodings.append((len(buffer.getvalue()),Image.MIME[image_format],buffer.getvalue()))
+    _,mime_type,data=min(encodings)
+    return mime_type,data,digest
+
+def cached_ocr(image_path,request):
+    """
+    OCR text of an image. request(mime_type, data) does the vision call on the
+    normalized image; its answers are cached per request function by file
+    digest and by normalized pixel digest, so a repeated submission is
+    answered without decoding it. Failed requests raise and are not cached.
+    """
+    cache=get_ocr_cache()
+    # free-text OCR and schema-constrained extraction of the same image are different answers
+    kind=getattr(request,'__name__','request')
+    fileKey=f"file:{kind}:{file_digest(image_path)}:{image_profile()}"
+    with tracer.start_as_current_span('ocr',attributes={'image.bytes_in': os.path.getsize(image_path)}) as span:
+        text=cache.get(fileKey)
+        if text is None:
+            mime_type,data,digest=normalize_image(image_path)
+            span.set_attribute('image.bytes_sent',len(data))
+            pixelKey=f"pixels:{kind}:{digest}:{image_profile()}"
+            text=cache.get(pixelKey)
+            span.set_attribute('ocr.cache_hit',text is not None)
+            if text is None:
+                text=request(mime_type,data)
+                cache.set(pixelKey,text)
+            cache.set(fileKey,text)
+        else:
+            span.set_attribute('ocr.cache_hit',True)
+    return text
@@ -1,28 +1,32 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 import pymongo
 import jwt
 from dotenv import load_dotenv
 from datetime import datetime,timedelta,timezone
 import os
+import asyncio
 import bcrypt
-import requests
-from langchain_community.document_loaders import PyMuPDFLoader
-from docx import Document
-from langchain_community.document_loaders import CSVLoader
-import mailtrap as mt
-from PyPDF2 import PdfMerger
-from agents.virtual_assistant_agent.crew import ChatCrew
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from utils.text_extraction import extract_text
 
 
 load_dotenv()
 
 uri = os.getenv('MONGO_URI')
 secret_key=os.getenv('JWT_SECRET')
-client = MongoClient(uri, server_api=pymongo.server_api.ServerApi(
-        version="1", strict=True, deprecation_errors=True))
+client = AsyncMongoClient(uri, server_api=pymongo.server_api.ServerApi(
+        version="1", strict=True, deprecation_errors=True),
+        maxPoolSize=int(os.getenv('MONGO_MAX_POOL',50)),
+        minPoolSize=int(os.getenv('MONGO_MIN_POOL',5)),
+        maxIdleTimeMS=int(os.getenv('MONGO_MAX_IDLE_MS',300000)),
+        serverSelectionTimeoutMS=int(os.getenv('MONGO_SELECTION_TIMEOUT_MS',5000)))
 database=client['ai-agents']
 userCollection=database['users']
+# bcrypt releases the GIL while hashing, so a thread per core keeps the event loop free and scales with cores
+hashExecutor=ThreadPoolExecutor(max_workers=int(os.getenv('HASH_WORKERS',os.cpu_count() or 4)),thread_name_prefix='bcrypt')
+
+async def ensure_indexes():
+    await userCollection.create_index('email')
 
 
 def create_token(data,type:str):
@@ -35,14 +39,16 @@ def create_token(data,type:str):
     token=jwt.encode(data,secret_key)
     return token
 
-def verify_password(plain_password, hashed_password):
-    return bcrypt.checkpw(plain_password.encode('utf-8'),hashed_password)
+async def verify_password(plain_password, hashed_password):
+    loop=asyncio.get_running_loop()
+    return await loop.run_in_executor(hashExecutor,bcrypt.checkpw,plain_password.encode('utf-8'),hashed_password)
     
-def get_password_hash(password):
-    hashedPassword=bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+async def get_password_hash(password):
+    loop=asyncio.get_running_loop()
+    hashedPassword=await loop.run_in_executor(hashExecutor,lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()))
     return hashedPassword
 
-def create_user(user,refreshToken):
+async def create_user(user,refreshToken):
     
 
     # mail = mt.Mail(
@@ -55,67 +61,39 @@ def create_user(user,refreshToken):
     # client = mt.MailtrapClient(token=os.getenv("MAIL_TOKEN"))
     # client.send(mail)
 
-    userCollection.insert_one({"email":user['email'],"password":user['password'],"refresh_token":refreshToken})
+    await userCollection.insert_one({"email":user['email'],"password":user['password'],"refresh_token":refreshToken})
     return user
 
 def decode_token(token):
    decodedToken=jwt.decode(token, secret_key, algorithms=["HS256"])
    return decodedToken
 
-def get_user(user):
-    foundUser=userCollection.find_one({"email":user['email']})
+async def get_user(user):
+    foundUser=await userCollection.find_one({"email":user['email']})
     return foundUser
 
-def change_password(user,newPass):
-    password=get_password_hash(newPass)
-    foundUser=userCollection.update_one({"email":user['email']},{"$set":{"password":password}})
+async def change_password(user,newPass):
+    password=await get_password_hash(newPass)
+    foundUser=await userCollection.update_one({"email":user['email']},{"$set":{"password":password}})
     return foundUser
 
-def updateRefreshToken(email,refreshToken):
-    userCollection.update_one({"email":email},{"$set":{"refresh_token":refreshToken}})
+async def updateRefreshToken(email,refreshToken):
+    await userCollection.update_one({"email":email},{"$set":{"refresh_token":refreshToken}})
     return 'updated'
 
-def verifyRefreshMatchToken(email,refreshToken):
-    return userCollection.find_one({"email":email,"refresh_token":refreshToken})
+async def verifyRefreshMatchToken(email,refreshToken):
+    return await userCollection.find_one({"email":email,"refresh_token":refreshToken})
 
 def load_document(file_path: str):
     """
-    Dynamically load a document using the appropriate loader based on the file type.
-    Handles PDFs, DOCX, and TXT files.
+    Load the text of a PDF, DOCX or TXT document through the shared, cached extractor.
     """
-    if file_path.endswith(".pdf"):
-        # Use PyMuPDFLoader for PDFs
-        loader = PyMuPDFLoader(file_path)
-        try:
-            docs = loader.load()
-            return "\n\n".join([doc.page_content for doc in docs if doc.page_content])
-        except Exception as e:
-            raise ValueError(f"Failed to load PDF document: {e}")
-
-    elif file_path.endswith(".docx"):
-        # Use python-docx for DOCX files
-        try:
-            doc = Document(file_path)
-            return "\n\n".join([paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()])
-        except Exception as e:
-            raise ValueError(f"Failed to load DOCX document: {e}")
-
-    elif file_path.endswith(".txt"):
-        # Handle TXT files directly
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        except Exception as e:
-            raise ValueError(f"Failed to load TXT document: {e}")
-
-    else:
-        raise ValueError("Unsupported file type. Please upload a PDF, DOCX, or TXT file.")
+    return extract_text(file_path)
 
 
     
-def retreiveUsers():
+async def retreiveUsers():
     listOfUsers=[]
-    usersFind=userCollection.find()
-    for i in usersFind:
+    async for i in userCollection.find({},{"email":1}):
         listOfUsers.append(i['email'])
     return listOfUsers
\ No newline at end of file
@@ -0,0 +1,219 @@
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.encoders import jsonable_encoder
+from nanoid import generate
+from dotenv import load_dotenv
+from utils.scheduler import get_scheduler
+
+load_dotenv()
+
+JOBS_DB=os.getenv('JOBS_DB','./cache/jobs.sqlite3')
+JOB_WORKERS=int(os.getenv('JOB_WORKERS',4))
+FINISHED_STATES=('succeeded','failed','cancelled')
+
+# the job whose crew the current thread works for; task threads inherit it with the rest of the kickoff context
+currentJob=contextvars.ContextVar('currentJob',default=None)
+
+
+# crewai re-runs an agent's task after any other exception, paying for its LLM calls again;
+# a TimeoutError is passed straight up, which is what a cancelled job needs
+class JobCancelled(TimeoutError):
+    pass
+
+
+def check_current_job():
+    """Raise JobCancelled if the job this thread works for was cancelled; a no-op outside jobs."""
+    job=currentJob.get()
+    if job is not None:
+        job.check_cancelled()
+
+
+class JobStore:
+    """
+    SQLite-backed record of every submitted job: status, the output of each
+    finished task and the final crew output. WAL mode lets several uvicorn
+    workers share one file.
+    """
+    def __init__(self, path=JOBS_DB):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, agent_id TEXT, status TEXT, created REAL, started REAL, finished REAL,"
+                "tasks TEXT DEFAULT '[]', result TEXT, error TEXT)"
+            )
+
+    def create(self, job_id, agent_id):
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO jobs (id, agent_id, status, created) VALUES (?, ?, 'pending', ?)",
+                (job_id, agent_id, time.time()),
+            )
+
+    def start(self, job_id):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET started = ?, status = CASE status WHEN 'pending' THEN 'running' ELSE status END WHERE id = ?",
+                (time.time(), job_id),
+            )
+
+    def finish(self, job_id, status, **fields):
+        """Record how a job ended. A job flagged for cancellation ends as cancelled, even if its crew got to the end."""
+        if 'result' in fields:
+            fields['result'] = json.dumps(jsonable_encoder(fields['result']))
+        fields['finished'] = time.time()
+        columns = ''.join(f", {name} = ?" for name in fields)
+        with self.lock:
+            self.connection.execute(
+                f"UPDATE jobs SET status = CASE WHEN status IN ('cancelling', 'cancelled') THEN 'cancelled' ELSE ? END{columns} WHERE id = ?",
+                (status, *fields.values(), job_id),
+            )
+
+    def add_task_output(self, job_id, output):
+        with self.lock:
+            row = self.connection.execute("SELECT tasks FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            tasks = json.loads(row[0]) if row else []
+            tasks.append(jsonable_encoder(output))
+            self.connection.execute("UPDATE jobs SET tasks = ? WHERE id = ?", (json.dumps(tasks), job_id))
+
+    def status(self, job_id):
+        with self.lock:
+            row = self.connection.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def request_cancel(self, job_id):
+        """Flag an unfinished job; whichever worker runs it stops at its next checkpoint."""
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = 'cancelling' WHERE id = ? AND status IN ('pending', 'running')", (job_id,)
+            )
+        return cursor.rowcount > 0
+
+    def get(self, job_id):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT id, agent_id, status, created, started, finished, tasks, result, error FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "id": row[0], "agent_id": row[1], "status": row[2],
+            "created": row[3], "started": row[4], "finished": row[5],
+            "tasks": json.loads(row[6] or '[]'),
+            "result": json.loads(row[7]) if row[7] else None,
+            "error": row[8],
+        }
+
+
+class Job:
+    """In-process handle of a submitted job; wires its crew's callbacks to the store."""
+    def __init__(self, job_id, agent_id, store):
+        self.id = job_id
+        self.agent_id = agent_id
+        self.store = store
+        self.future = None
+        self.cancelled = threading.Event()
+
+    def check_cancelled(self):
+        # the job thread and the task threads it hands its context to can stop; crewai's own async-task
+        # threads start without that context, and an exception there would leave kickoff waiting forever
+        if currentJob.get() is not self:
+            return
+        if not self.cancelled.is_set() and self.store.status(self.id) == 'cancelling':
+            self.cancelled.set()
+        if self.cancelled.is_set():
+            raise JobCancelled(self.id)
+
+    def task_callback(self, output):
+        self.store.add_task_output(self.id, output)
+        self.check_cancelled()
+
+    def step_callback(self, step):
+        self.check_cancelled()
+
+    def on_crew(self, crew):
+        self.check_cancelled()
+        crew.task_callback = self.task_callback
+        crew.step_callback = self.step_callback
+
+
+class JobRunner:
+    """Bounded worker pool that runs crew kickoffs outside the request that submitted them."""
+    def __init__(self, store=None, workers=JOB_WORKERS):
+        self.store = store or JobStore()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crew-job')
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, agent_id, run):
+        """
+        Queue run(on_crew) and return the job id immediately. run must build the
+        crew, pass it to on_crew before kickoff and return the CrewOutput.
+        """
+        job = Job(generate(size=16), agent_id, self.store)
+        self.store.create(job.id, agent_id)
+        with self.lock:
+            self.jobs[job.id] = job
+        job.future = self.executor.submit(self.execute, job, run)
+        return job.id
+
+    def start(self, job, run):
+        self.store.start(job.id)
+        return run(job.on_crew)
+
+    def execute(self, job, run):
+        scheduler = get_scheduler()
+        token = currentJob.set(job)
+        try:
+            # stays pending until the kickoff scheduler has a slot; accepted jobs are never rejected
+            result = scheduler.call(scheduler.enqueue(job.agent_id, reject=False), self.start, job, run)
+            self.store.finish(job.id, 'succeeded', result=result)
+        except JobCancelled:
+            self.store.finish(job.id, 'cancelled')
+        except Exception as e:
+            self.store.finish(job.id, 'failed', error=str(e))
+        finally:
+            # pool threads keep their context from one job to the next
+            currentJob.reset(token)
+            with self.lock:
+                self.jobs.pop(job.id, None)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def local_future(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+        return job.future if job else None
+
+    def cancel(self, job_id):
+        """
+        Works for jobs owned by any worker. Pending jobs stop before kickoff and
+        running ones at the next agent step or task boundary, since crewai has
+        no way to abort an in-flight LLM call.
+        """
+        if not self.store.request_cancel(job_id):
+            return False
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is not None:
+            job.cancelled.set()
+        return True
+
+
+jobRunner = None
+
+def get_job_runner():
+    global jobRunner
+    if jobRunner is None:
+        jobRunner = JobRunner()
+    return jobRunner
@@ -1,7 +1,32 @@
 from fastapi.security import HTTPBearer,HTTPAuthorizationCredentials
 from fastapi import APIRouter, FastAPI,HTTPException,Header,Depends,Request
+from collections import OrderedDict
+import hashlib
+import os
+import time
 from utils.index import decode_token
 
+TOKEN_CACHE_SIZE=int(os.getenv('TOKEN_CACHE_SIZE',4096))
+
+# claims of recently verified tokens, keyed by token digest; entries expire with the token
+verifiedTokens=OrderedDict()
+
+
+def cached_claims(token):
+    key=hashlib.sha256(token.encode('utf-8')).digest()
+    entry=verifiedTokens.get(key)
+    if entry is not None:
+        if entry.get('exp',0)>time.time():
+            verifiedTokens.move_to_end(key)
+            return entry
+        del verifiedTokens[key]
+    claims=decode_token(token)
+    if 'exp' in claims:
+        verifiedTokens[key]=claims
+        while len(verifiedTokens)>TOKEN_CACHE_SIZE:
+            verifiedTokens.popitem(last=False)
+    return claims
+
 
 class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True):
@@ -12,20 +37,18 @@ class JWTBearer(HTTPBearer):
         if credentials:
             if not credentials.scheme == "Bearer":
                 raise HTTPException(status_code=403, detail="Unauthorized")
-            if not self.verify_jwt(credentials.credentials):
+            claims = self.verify_jwt(credentials.credentials)
+            if not claims:
                 raise HTTPException(status_code=403, detail="Unauthorized")
+            # handlers read the verified claims from here instead of decoding the header again
+            request.state.claims = claims
             return credentials.credentials
         else:
             raise HTTPException(status_code=403, detail="Unauthorized")
 
-    def verify_jwt(self, jwtoken: str) -> bool:
-        isTokenValid: bool = False
-
+    def verify_jwt(self, jwtoken: str):
         try:
-            payload = decode_token(jwtoken)
+            payload = cached_claims(jwtoken)
         except:
             payload = None
-        if payload:
-            isTokenValid = True
-
-        return isTokenValid
\ No newline at end of file
+        return payload
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import diskcache
+from crewai import LLM
+from dotenv import load_dotenv
+from opentelemetry import trace
+from utils.metrics import llmCacheLookups
+
+load_dotenv()
+
+CACHE_DIR=os.getenv('LLM_CACHE_DIR','./cache/llm')
+DEFAULT_TTL=int(os.getenv('LLM_CACHE_TTL',24*60*60))
+MEMORY_ENTRIES=int(os.getenv('LLM_CACHE_MEMORY_ENTRIES',512))
+
+# completion params that change the answer; credentials, timeouts and transport flags are left out of the key
+KEY_PARAMS=('model','messages','tools','temperature','top_p','n','stop','max_tokens','presence_penalty','frequency_penalty','logit_bias','response_format','seed','logprobs','top_logprobs','reasoning_effort')
+
+
+class MemoryCache:
+    """Thread-safe LRU with a per-entry expiry time."""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires):
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class CompletionCache:
+    """
+    Two-tier completion cache: an in-process LRU in front of a diskcache store
+    that survives restarts and is shared by every worker on the host.
+    """
+    def __init__(self, directory=CACHE_DIR, maxsize=MEMORY_ENTRIES, default_ttl=DEFAULT_TTL):
+        self.memory = MemoryCache(maxsize)
+        self.disk = diskcache.Cache(directory)
+        self.default_ttl = default_ttl
+        self.ttls = {}
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+        self.lock = threading.Lock()
+
+    def set_ttl(self, crew_name, ttl):
+        """Override the TTL (seconds) for completions made by one crew; 0 disables caching for it."""
+        self.ttls[crew_name] = ttl
+
+    def ttl_for(self, crew_name):
+        return self.ttls.get(crew_name, self.default_ttl)
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.count('memory_hits')
+            return value
+        value, expires = self.disk.get(key, expire_time=True)
+        if value is not None:
+            self.memory.set(key, value, expires)
+            self.count('disk_hits')
+            return value
+        self.count('misses')
+        return None
+
+    def set(self, key, value, ttl):
+        self.memory.set(key, value, time.time() + ttl)
+        self.disk.set(key, value, expire=ttl)
+        self.count('stores')
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['disk_entries'] = len(self.disk)
+        return stats
+
+
+def normalize_message(message):
+    # only surrounding whitespace of text content is noise; multimodal parts, tool calls,
+    # tool_call_id and name all change the answer and stay in the key as they are
+    message = dict(message)
+    content = message.get("content")
+    if content is None or isinstance(content, str):
+        message["content"] = (content or "").strip()
+    return message
+
+def normalize_messages(messages):
+    return [normalize_message(message) for message in messages]
+
+def cache_key(params):
+    """Content address of a completion request."""
+    keyed = {name: params[name] for name in KEY_PARAMS if params.get(name) is not None}
+    keyed['messages'] = normalize_messages(keyed.get('messages', []))
+    payload = json.dumps(keyed, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def crew_name(agent):
+    crew = getattr(agent, 'crew', None)
+    return getattr(crew, 'name', None) or 'crew'
+
+
+completionCache = None
+originalCall = LLM.call
+
+def cached_call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+    cache = completionCache
+    # native function calling executes tools inside call(), so only plain text completions are cached
+    if cache is None or available_functions:
+        return originalCall(self, messages, tools=tools, callbacks=callbacks, available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+    ttl = cache.ttl_for(crew_name(from_agent))
+    if ttl <= 0:
+        return originalCall(self, messages, tools=tools, callbacks=callbacks, available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    key = cache_key(self._prepare_completion_params(messages, tools))
+    response = cache.get(key)
+    # lands on the completion's span when tracing is on
+    trace.get_current_span().set_attribute('llm.cache_hit', response is not None)
+    llmCacheLookups.labels('hit' if response is not None else 'miss').inc()
+    if response is not None:
+        return response
+    response = originalCall(self, messages, tools=tools, callbacks=callbacks, available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+    if isinstance(response, str) and response:
+        cache.set(key, response, ttl)
+    return response
+
+def install_llm_cache(cache=None):
+    """
+    Route every crewai LLM.call (module-level LLM objects and crewai's default
+    LLM alike) through the completion cache. Pass a CompletionCache-compatible
+    object to plug in another backend. Disabled with LLM_CACHE=0.
+    """
+    global completionCache
+    if os.getenv('LLM_CACHE','1')=='0':
+        return None
+    completionCache = cache or completionCache or CompletionCache()
+    LLM.call = cached_call
+    return completionCache
+
+def get_llm_cache():
+    return completionCache
@@ -0,0 +1,193 @@
+import contextvars
+import os
+import threading
+import time
+from crewai import LLM
+from crewai.events import crewai_event_bus
+from crewai.events.types.crew_events import CrewKickoffStartedEvent,CrewKickoffCompletedEvent,CrewKickoffFailedEvent
+from crewai.events.types.task_events import TaskStartedEvent,TaskCompletedEvent,TaskFailedEvent
+from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent,ToolUsageErrorEvent
+from dotenv import load_dotenv
+from prometheus_client import CONTENT_TYPE_LATEST,REGISTRY,CollectorRegistry,Counter,Gauge,Histogram,generate_latest,multiprocess
+
+load_dotenv()
+
+# with several uvicorn workers, point PROMETHEUS_MULTIPROC_DIR at an empty directory shared by all of them
+# (before they start); every worker then writes its samples there and /metrics on any worker reports the sum
+MULTIPROC_DIR=os.getenv('PROMETHEUS_MULTIPROC_DIR')
+METRICS_ENABLED=os.getenv('METRICS','1')!='0'
+
+# crew runs take seconds to minutes, HTTP and tool calls milliseconds to minutes
+KICKOFF_BUCKETS=(0.5,1,2.5,5,10,20,30,60,120,300,600,1200)
+REQUEST_BUCKETS=(0.01,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60,120,300,600)
+SIZE_BUCKETS=(16*1024,256*1024,1024*1024,5*1024*1024,20*1024*1024,50*1024*1024,100*1024*1024)
+
+requestDuration=Histogram('http_request_duration_seconds','HTTP request latency, until the last body byte is sent',
+                          ['method','route','agent','status'],buckets=REQUEST_BUCKETS)
+kickoffDuration=Histogram('crew_kickoff_duration_seconds','Crew kickoff wall time',['agent','crew','outcome'],buckets=KICKOFF_BUCKETS)
+taskDuration=Histogram('crew_task_duration_seconds','Task wall time inside a crew',['agent','task','outcome'],buckets=KICKOFF_BUCKETS)
+llmRequests=Counter('llm_requests_total','LLM completions, cache hits included',['model'])
+llmCacheLookups=Counter('llm_cache_lookups_total','Completion cache lookups',['result'])
+llmTokens=Counter('llm_tokens_total','LLM tokens used',['model','direction'])
+toolCalls=Counter('tool_calls_total','Tool calls',['tool','outcome'])
+toolDuration=Histogram('tool_call_duration_seconds','Tool call latency',['tool'],buckets=REQUEST_BUCKETS)
+uploadBytes=Counter('upload_bytes_total','Bytes written to disk by uploads',['folder'])
+uploadSize=Histogram('upload_size_bytes','Size of each saved upload',['folder'],buckets=SIZE_BUCKETS)
+queuedKickoffs=Gauge('scheduler_queued_kickoffs','Kickoffs waiting for a slot',['agent'],multiprocess_mode='livesum')
+runningKickoffs=Gauge('scheduler_running_kickoffs','Kickoffs holding a slot',['agent'],multiprocess_mode='livesum')
+queueWait=Histogram('scheduler_queue_wait_seconds','Time from admission to a kickoff slot',['agent'],buckets=REQUEST_BUCKETS)
+
+# agent key of the kickoff running in this context; set by the scheduler, read when crews report their events
+kickoffAgent=contextvars.ContextVar('kickoffAgent',default='')
+
+# start times and agent labels of running crews and tasks, keyed by their ids
+started={}
+startedLock=threading.Lock()
+
+
+def metrics_response():
+    """Exposition text and content type for /metrics."""
+    if MULTIPROC_DIR:
+        registry=CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry=REGISTRY
+    return generate_latest(registry),CONTENT_TYPE_LATEST
+
+def worker_exited():
+    # drops this worker's live gauges from the aggregate
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template and agent id,
+    so streamed responses are measured to their last byte.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+        begin = time.perf_counter()
+        status = [500]
+
+        async def send_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            route = scope.get('route')
+            agent = (scope.get('path_params') or {}).get('agentId', '')
+            requestDuration.labels(scope['method'], getattr(route, 'path', 'unmatched'), agent, str(status[0])).observe(time.perf_counter() - begin)
+
+
+def crew_label(crew):
+    return crew.name or 'crew'
+
+@crewai_event_bus.on(CrewKickoffStartedEvent)
+def on_crew_started(source,event):
+    with startedLock:
+        started[('crew',str(source.id))]=(time.perf_counter(),kickoffAgent.get())
+
+def end_crew(crew,outcome):
+    with startedLock:
+        begin,agent=started.pop(('crew',str(crew.id)),(None,''))
+    if begin is not None:
+        kickoffDuration.labels(agent,crew_label(crew),outcome).observe(time.perf_counter()-begin)
+
+@crewai_event_bus.on(CrewKickoffCompletedEvent)
+def on_crew_completed(source,event):
+    end_crew(source,'completed')
+
+@crewai_event_bus.on(CrewKickoffFailedEvent)
+def on_crew_failed(source,event):
+    end_crew(source,'failed')
+
+@crewai_event_bus.on(TaskStartedEvent)
+def on_task_started(source,event):
+    task=event.task
+    if task is None:
+        return
+    # async tasks run on threads of their own, so the agent comes from the crew rather than the context
+    crew=getattr(task.agent,'crew',None) if task.agent else None
+    with startedLock:
+        agent=started.get(('crew',str(crew.id)),(None,kickoffAgent.get()))[1] if crew is not None else kickoffAgent.get()
+        started[('task',str(task.id))]=(time.perf_counter(),agent)
+
+def end_task(task,outcome):
+    if task is None:
+        return
+    with startedLock:
+        begin,agent=started.pop(('task',str(task.id)),(None,''))
+    if begin is not None:
+        taskDuration.labels(agent,task.name or '',outcome).observe(time.perf_counter()-begin)
+
+@crewai_event_bus.on(TaskCompletedEvent)
+def on_task_completed(source,event):
+    end_task(event.task,'completed')
+
+@crewai_event_bus.on(TaskFailedEvent)
+def on_task_failed(source,event):
+    end_task(event.task,'failed')
+
+@crewai_event_bus.on(ToolUsageFinishedEvent)
+def on_tool_finished(source,event):
+    toolCalls.labels(event.tool_name,'cached' if event.from_cache else 'completed').inc()
+    toolDuration.labels(event.tool_name).observe((event.finished_at-event.started_at).total_seconds())
+
+@crewai_event_bus.on(ToolUsageErrorEvent)
+def on_tool_failed(source,event):
+    toolCalls.labels(event.tool_name,'failed').inc()
+
+def record_upload(folder,size):
+    folder=os.path.basename(os.path.normpath(folder))
+    uploadBytes.labels(folder).inc(size)
+    uploadSize.labels(folder).observe(size)
+
+
+# token counter of the LLM call running in this context
+currentCounter=contextvars.ContextVar('currentCounter',default=None)
+
+class TokenCounter:
+    """
+    litellm-style success callback that counts the tokens of one completion;
+    like tracing's UsageRecorder, it only counts in the context of its own call.
+    """
+    def __init__(self, model):
+        self.model = model
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        if currentCounter.get() is not self:
+            return
+        usage=response_obj.get("usage")
+        if usage is None:
+            return
+        llmTokens.labels(self.model,'in').inc(getattr(usage,'prompt_tokens',0) or 0)
+        llmTokens.labels(self.model,'out').inc(getattr(usage,'completion_tokens',0) or 0)
+
+innerCall=None
+
+def counted_call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+    llmRequests.labels(self.model).inc()
+    # a completion served by the cache never reaches the provider, so it adds no tokens
+    counter=TokenCounter(self.model)
+    token=currentCounter.set(counter)
+    try:
+        return innerCall(self, messages, tools=tools, callbacks=[*(callbacks or []),counter], available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+    finally:
+        currentCounter.reset(token)
+
+def install_llm_metrics():
+    """Count completions and tokens per model around LLM.call. Call after install_llm_cache."""
+    global innerCall
+    if not METRICS_ENABLED or innerCall is not None:
+        return False
+    innerCall=LLM.call
+    LLM.call=counted_call
+    return True
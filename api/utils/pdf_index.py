@@ -0,0 +1,157 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import portalocker
+from dotenv import load_dotenv
+from utils.digests import file_digest
+
+load_dotenv()
+
+INDEX_DIR=os.getenv('PDF_INDEX_DIR','./cache/pdf_index')
+OPEN_INDEXES=int(os.getenv('PDF_INDEX_OPEN',32))
+INGEST_WORKERS=int(os.getenv('PDF_INGEST_WORKERS',2))
+TRACKED_JOBS=1024
+EMBEDDING_MODEL='text-embedding-ada-002'
+
+# search tools for recently used documents, keyed by content digest
+openTools=OrderedDict()
+openToolsLock=threading.Lock()
+digestLocks={}
+
+
+def documents_digest(pdf_paths):
+    """Content digest of a set of PDFs; a single PDF keeps its own file digest."""
+    digests=[file_digest(path) for path in pdf_paths]
+    if len(digests)==1:
+        return digests[0]
+    return hashlib.sha256(''.join(sorted(digests)).encode()).hexdigest()
+
+def index_config(digest):
+    return dict(
+        app=dict(config=dict(id=digest,collect_metrics=False)),
+        llm=dict(provider="openai"),
+        embedder=dict(provider="openai",config=dict(model=EMBEDDING_MODEL)),
+        vectordb=dict(provider="chroma",config=dict(
+            collection_name=f"pdf-{digest[:40]}",
+            dir=os.path.join(INDEX_DIR,digest),
+        )),
+    )
+
+def digest_lock(digest):
+    with openToolsLock:
+        return digestLocks.setdefault(digest,threading.Lock())
+
+def is_indexed(digest):
+    return os.path.exists(os.path.join(INDEX_DIR,digest,'.indexed'))
+
+def open_index(digest,pdf_paths):
+    """
+    Open the persistent index for a digest, embedding the PDFs only if no
+    complete index exists yet. The file lock keeps other workers from
+    embedding the same document at the same time.
+    """
+    # crewai_tools pulls in embedchain and chromadb, so it is only imported once a document is opened
+    from crewai_tools import PDFSearchTool
+    from crewai_tools.tools.pdf_search_tool.pdf_search_tool import FixedPDFSearchToolSchema
+    index_path=os.path.join(INDEX_DIR,digest)
+    os.makedirs(index_path,exist_ok=True)
+    with portalocker.Lock(os.path.join(index_path,'.lock'),timeout=600):
+        tool=PDFSearchTool(config=index_config(digest))
+        if not is_indexed(digest):
+            for pdf_path in pdf_paths:
+                tool.add(pdf_path)
+            with open(os.path.join(index_path,'.indexed'),'w') as f:
+                f.write('\n'.join(os.path.basename(path) for path in pdf_paths))
+    tool.description="A tool that can be used to semantic search a query the uploaded PDF's content."
+    tool.args_schema=FixedPDFSearchToolSchema
+    tool._generate_description()
+    return tool
+
+def get_pdf_search_tool(pdf_paths,digest=None):
+    """
+    PDFSearchTool over one or more PDFs, backed by an index that is built once
+    per distinct content and reused by every later chat turn.
+    """
+    if isinstance(pdf_paths,str):
+        pdf_paths=[pdf_paths]
+    digest=digest or documents_digest(pdf_paths)
+    with openToolsLock:
+        tool=openTools.get(digest)
+        if tool is not None:
+            openTools.move_to_end(digest)
+            return tool
+    with digest_lock(digest):
+        with openToolsLock:
+            tool=openTools.get(digest)
+        if tool is None:
+            tool=open_index(digest,pdf_paths)
+        with openToolsLock:
+            openTools[digest]=tool
+            openTools.move_to_end(digest)
+            while len(openTools)>OPEN_INDEXES:
+                openTools.popitem(last=False)
+    return tool
+
+
+class IngestionJob:
+    """Background build of one document index; the digest doubles as the client-facing handle."""
+    def __init__(self, digest, future):
+        self.digest = digest
+        self.future = future
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    def status(self):
+        if self.future.done():
+            if self.future.exception() is not None:
+                return {"id": self.digest, "status": "failed", "error": str(self.future.exception())}
+            return {"id": self.digest, "status": "ready", "seconds": round(self.finished - self.submitted, 3)}
+        return {"id": self.digest, "status": "running" if self.started else "pending"}
+
+
+ingestExecutor=ThreadPoolExecutor(max_workers=INGEST_WORKERS,thread_name_prefix='pdf-ingest')
+ingestJobs=OrderedDict()
+ingestJobsLock=threading.Lock()
+
+def ingest(job,pdf_paths):
+    job.started=time.time()
+    try:
+        get_pdf_search_tool(pdf_paths,digest=job.digest)
+    finally:
+        job.finished=time.time()
+
+def start_ingestion(pdf_paths):
+    """
+    Queue text extraction, chunking and embedding of freshly uploaded PDFs so
+    the first chat turn finds a ready index. Returns the job handle.
+    """
+    if isinstance(pdf_paths,str):
+        pdf_paths=[pdf_paths]
+    digest=documents_digest(pdf_paths)
+    with ingestJobsLock:
+        job=ingestJobs.get(digest)
+        if job is not None and not (job.future.done() and job.future.exception() is not None):
+            return digest
+        job=IngestionJob(digest,None)
+        job.future=ingestExecutor.submit(ingest,job,pdf_paths)
+        ingestJobs[digest]=job
+        while len(ingestJobs)>TRACKED_JOBS:
+            ingestJobs.popitem(last=False)
+    return digest
+
+def get_ingestion(digest):
+    with ingestJobsLock:
+        return ingestJobs.get(digest)
+
+def ingestion_status(digest):
+    job=get_ingestion(digest)
+    if job is not None:
+        return job.status()
+    # built by an earlier process or another worker
+    if is_indexed(digest):
+        return {"id": digest, "status": "ready"}
+    return None
@@ -0,0 +1,111 @@
+import copy
+import yaml
+from validations import SEOAgent,CompetitorAgent,CustomerAgent,PersonalizedAgent,MarketingAgent,DigitalTwinAgentModel,EmergingRiskModel,PersonResearchModel,CustomerReachModel
+from utils.llm_cache import get_llm_cache
+from utils.task_graph import run_task_graph
+from utils.warmup import LazyClass
+
+
+# parsed config/*.yaml files, keyed by absolute path
+configCache={}
+
+def load_yaml_cached(config_path):
+    """
+    Drop-in replacement for CrewBase.load_yaml that parses each config file once.
+    CrewBase writes agents, tools and llms back into the loaded dict, so every
+    crew instance gets its own copy of the cached config.
+    """
+    key=str(config_path)
+    config=configCache.get(key)
+    if config is None:
+        with open(config_path, "r", encoding="utf-8") as file:
+            config=yaml.safe_load(file)
+        configCache[key]=config
+    return copy.deepcopy(config)
+
+def default_kickoff(crew,inputs):
+    return crew.kickoff(inputs=inputs.dict())
+
+def task_graph_kickoff(crew,inputs):
+    # tasks that only share upstream context run side by side instead of one after another
+    return run_task_graph(crew,inputs.dict())
+
+def fan_out_kickoff(crew,inputs):
+    # every independent task gets a thread of its own, e.g. one per persona before their synthesis
+    return run_task_graph(crew,inputs.dict(),max_parallel=len(crew.tasks))
+
+
+class AgentSpec:
+    """
+    Everything /agent/{agentId} needs to serve one crew: the crew class
+    ('module:Class', imported on first use), the request model its inputs
+    are validated against, the kickoff adapter and how long its LLM
+    completions may be served from the cache. Crew modules create their
+    stateless tools (search, scrape, ...) once at import, so every crew
+    built here shares them instead of constructing new ones per request.
+    """
+    def __init__(self, crew_path, input_model, kickoff=default_kickoff, cache_ttl=None):
+        self.lazy_class = LazyClass(crew_path, on_load=self.loaded)
+        self.input_model = input_model
+        self.kickoff_adapter = kickoff
+        self.cache_ttl = cache_ttl
+
+    def loaded(self, crew_class):
+        crew_class.load_yaml = staticmethod(load_yaml_cached)
+        cache = get_llm_cache()
+        if cache is not None and self.cache_ttl is not None:
+            cache.set_ttl(crew_class._crew_name, self.cache_ttl)
+
+    @property
+    def crew_class(self):
+        return self.lazy_class.load()
+
+    @property
+    def name(self):
+        return self.crew_class._crew_name
+
+    def preload(self):
+        """Import the crew and parse its YAML configs ahead of the first request."""
+        for config_path in (self.crew_class.original_agents_config_path, self.crew_class.original_tasks_config_path):
+            if isinstance(config_path, str):
+                load_yaml_cached(self.crew_class.base_directory / config_path)
+
+    def validate(self, payload):
+        return self.input_model.model_validate(payload)
+
+    def build(self):
+        """Fresh crew for a single request; configs come from the cache."""
+        crew = self.crew_class().crew()
+        # the LLM cache looks up per-crew TTLs by crew name
+        crew.name = self.name
+        return crew
+
+    def kickoff(self, inputs, on_crew=None):
+        """Run the crew; on_crew gets the built crew first so callers can attach callbacks."""
+        crew = self.build()
+        if on_crew:
+            on_crew(crew)
+        return self.kickoff_adapter(crew, inputs)
+
+
+HOUR=60*60
+
+# crews that search the live web get shorter TTLs than the ones that only reason over their inputs
+AGENTS = {
+    '0': AgentSpec('agents.seo_agent.crew:SeoAgent', SEOAgent, cache_ttl=6*HOUR),
+    '1': AgentSpec('agents.marketing_agent.crew:MarketingPostsCrew', MarketingAgent, cache_ttl=6*HOUR),
+    '2': AgentSpec('agents.competitor_analysis_agent.crew:CompetitorAnalysisAgent', CompetitorAgent, cache_ttl=6*HOUR),
+    '3': AgentSpec('agents.digital_twin_agent.crew:DigitalTwinAgent', DigitalTwinAgentModel, kickoff=fan_out_kickoff, cache_ttl=24*HOUR),
+    '7': AgentSpec('agents.emerging_risk_agent.crew:EmergingRiskAgent', EmergingRiskModel, cache_ttl=24*HOUR),
+    '8': AgentSpec('agents.person_research_agent.crew:PersonResearchAgent', PersonResearchModel, cache_ttl=6*HOUR),
+    '9': AgentSpec('agents.customer_sentiment_agent.crew:CustomerSentimentCrew', CustomerAgent, cache_ttl=6*HOUR),
+    '10': AgentSpec('agents.personalized_recommendation_agent.crew:PersonalizedRecommendationCrew', PersonalizedAgent, cache_ttl=24*HOUR),
+    '11': AgentSpec('agents.customer_reach_agent.crew:CustomerResearchCrew', CustomerReachModel, kickoff=task_graph_kickoff, cache_ttl=24*HOUR),
+}
+
+def get_agent(agentId):
+    return AGENTS.get(agentId)
+
+def preload_agents():
+    for spec in AGENTS.values():
+        spec.preload()
@@ -0,0 +1,261 @@
+import asyncio
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dotenv import load_dotenv
+from opentelemetry import trace
+from utils.metrics import kickoffAgent,queuedKickoffs,runningKickoffs,queueWait
+
+load_dotenv()
+
+# lower runs first
+INTERACTIVE, NORMAL, BATCH = 0, 1, 2
+
+GLOBAL_CONCURRENCY=int(os.getenv('KICKOFF_CONCURRENCY',8))
+AGENT_CONCURRENCY=int(os.getenv('AGENT_CONCURRENCY',4))
+MAX_QUEUE=int(os.getenv('KICKOFF_QUEUE_DEPTH',32))
+MAX_AGENT_QUEUE=int(os.getenv('AGENT_QUEUE_DEPTH',8))
+
+tracer = trace.get_tracer(__name__)
+
+# per-agent overrides, keyed like the jobs API: '3' for /agent/3, 'file/15' for /agent/file/15,
+# and the chat endpoint name for the document chats
+AGENT_LIMITS = {
+    '3': dict(concurrency=2, priority=BATCH),        # DigitalTwinAgent, eight persona calls in parallel per run
+    '11': dict(concurrency=2, priority=BATCH),       # CustomerResearchCrew, five chained research tasks
+    'file/15': dict(concurrency=2, priority=BATCH),  # UserStoryCrew, up to TRANSCRIBE_CONCURRENCY Whisper calls per run
+    'claims-batch': dict(concurrency=4, priority=BATCH),
+    'policy-chat': dict(priority=INTERACTIVE),
+    'chatbot': dict(priority=INTERACTIVE),
+    'virtual-chat': dict(priority=INTERACTIVE),
+    'onboarding-agent': dict(priority=INTERACTIVE),
+}
+
+
+def parse_limits(value):
+    """KICKOFF_LIMITS="3=1,file/15=2" overrides per-agent concurrency without a code change."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        key, _, concurrency = item.partition('=')
+        limits[key.strip()] = int(concurrency)
+    return limits
+
+
+class QueueFull(Exception):
+    """Raised at admission when a request would wait behind too many others."""
+    def __init__(self, key, retry_after):
+        super().__init__(f"Too many queued requests for {key}")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """One admitted request: waits in its agent's queue until it is granted a slot."""
+    def __init__(self, key, priority):
+        self.key = key
+        self.priority = priority
+        self.granted = Future()
+        self.enqueued = time.monotonic()
+        self.started = None
+
+
+class AgentStats:
+    def __init__(self):
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def average_run(self):
+        return self.run_seconds / self.completed if self.completed else None
+
+    def as_dict(self):
+        started = self.completed + self.running
+        return {
+            "running": self.running, "queued": self.queued,
+            "admitted": self.admitted, "rejected": self.rejected, "completed": self.completed,
+            "avg_wait_seconds": round(self.wait_seconds / started, 3) if started else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "avg_run_seconds": round(self.average_run() or 0.0, 3),
+            "max_run_seconds": round(self.max_run_seconds, 3),
+        }
+
+
+class KickoffScheduler:
+    """
+    Admission control for crew kickoffs. Requests wait in per-agent FIFO queues
+    and are granted slots by priority, round-robin across agents of the same
+    priority, while both the global and the per-agent cap allow it. When the
+    queues are already deep, requests are rejected up front instead.
+    """
+    def __init__(self, concurrency=GLOBAL_CONCURRENCY, agent_concurrency=AGENT_CONCURRENCY,
+                 max_queue=MAX_QUEUE, max_agent_queue=MAX_AGENT_QUEUE, limits=None):
+        self.concurrency = concurrency
+        self.agent_concurrency = agent_concurrency
+        self.max_queue = max_queue
+        self.max_agent_queue = max_agent_queue
+        self.limits = {key: dict(value) for key, value in AGENT_LIMITS.items()}
+        for key, concurrency in parse_limits(os.getenv('KICKOFF_LIMITS')).items():
+            self.limits.setdefault(key, {})['concurrency'] = concurrency
+        for key, value in (limits or {}).items():
+            self.limits.setdefault(key, {}).update(value)
+        self.queues = {priority: OrderedDict() for priority in (INTERACTIVE, NORMAL, BATCH)}
+        self.stats = {}
+        self.running = 0
+        self.lock = threading.Lock()
+        # kickoffs get their own threads so they never crowd the default executor used for I/O
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='crew-kickoff')
+
+    def agent_limit(self, key):
+        return self.limits.get(key, {}).get('concurrency', self.agent_concurrency)
+
+    def agent_priority(self, key):
+        return self.limits.get(key, {}).get('priority', NORMAL)
+
+    def agent_stats(self, key):
+        return self.stats.setdefault(key, AgentStats())
+
+    def queued(self):
+        return sum(len(queue) for agents in self.queues.values() for queue in agents.values())
+
+    def retry_after(self, key):
+        """Seconds until the agent's queue has likely drained, from its average run time."""
+        stats = self.agent_stats(key)
+        average = stats.average_run() or 30.0
+        return max(1, math.ceil(average * (stats.queued + 1) / self.agent_limit(key)))
+
+    def enqueue(self, key, priority=None, reject=True):
+        """
+        Admit a request for agent key. Raises QueueFull when reject is set and
+        the request would have to wait behind too many others.
+        """
+        priority = self.agent_priority(key) if priority is None else priority
+        ticket = Ticket(key, priority)
+        with self.lock:
+            stats = self.agent_stats(key)
+            if reject and (self.queued() >= self.max_queue or stats.queued >= self.max_agent_queue):
+                stats.rejected += 1
+                raise QueueFull(key, self.retry_after(key))
+            stats.admitted += 1
+            stats.queued += 1
+            queuedKickoffs.labels(key).inc()
+            self.queues[priority].setdefault(key, deque()).append(ticket)
+            self.dispatch()
+        return ticket
+
+    def dispatch(self):
+        # called with the lock held
+        for agents in self.queues.values():
+            progress = True
+            while progress and self.running < self.concurrency:
+                progress = False
+                for key in list(agents):
+                    stats = self.agent_stats(key)
+                    if stats.running >= self.agent_limit(key):
+                        continue
+                    queue = agents.pop(key)
+                    ticket = queue.popleft()
+                    if queue:
+                        # the agent goes to the back of the line for its next request
+                        agents[key] = queue
+                    self.grant(ticket, stats)
+                    progress = True
+                    break
+
+    def grant(self, ticket, stats):
+        stats.queued -= 1
+        queuedKickoffs.labels(ticket.key).dec()
+        if not ticket.granted.set_running_or_notify_cancel():
+            # the caller stopped waiting
+            return
+        ticket.started = time.monotonic()
+        wait = ticket.started - ticket.enqueued
+        stats.running += 1
+        stats.wait_seconds += wait
+        stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+        runningKickoffs.labels(ticket.key).inc()
+        queueWait.labels(ticket.key).observe(wait)
+        self.running += 1
+        ticket.granted.set_result(True)
+
+    def release(self, ticket):
+        with self.lock:
+            stats = self.agent_stats(ticket.key)
+            if ticket.started is None:
+                # gave up while still queued
+                queue = self.queues[ticket.priority].get(ticket.key)
+                if queue and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self.queues[ticket.priority][ticket.key]
+                    stats.queued -= 1
+                    queuedKickoffs.labels(ticket.key).dec()
+                return
+            elapsed = time.monotonic() - ticket.started
+            stats.running -= 1
+            runningKickoffs.labels(ticket.key).dec()
+            stats.completed += 1
+            stats.run_seconds += elapsed
+            stats.max_run_seconds = max(stats.max_run_seconds, elapsed)
+            self.running -= 1
+            self.dispatch()
+
+    def run_granted(self, ticket, fn, *args):
+        # the crew's kickoff span nests under this one, which records how long the request queued
+        with tracer.start_as_current_span(f'kickoff {ticket.key}', attributes={
+            "scheduler.agent": ticket.key,
+            "scheduler.priority": ticket.priority,
+            "scheduler.queue_wait_ms": round((ticket.started - ticket.enqueued) * 1000, 3),
+        }):
+            kickoffAgent.set(ticket.key)
+            return fn(*args)
+
+    def call(self, ticket, fn, *args):
+        """Block the calling thread until the ticket is granted, then run fn on it."""
+        try:
+            ticket.granted.result()
+            return self.run_granted(ticket, fn, *args)
+        finally:
+            self.release(ticket)
+
+    async def execute(self, ticket, fn, *args):
+        """Wait for the ticket without blocking the event loop, then run fn on a kickoff thread."""
+        try:
+            await asyncio.wrap_future(ticket.granted)
+        except BaseException:
+            self.release(ticket)
+            raise
+        context = contextvars.copy_context()
+        future = self.executor.submit(context.run, self.run_granted, ticket, fn, *args)
+        # the slot stays taken until the kickoff thread is done, even if the request goes away first
+        future.add_done_callback(lambda _: self.release(ticket))
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def run(self, key, fn, *args, priority=None):
+        return await self.execute(self.enqueue(key, priority), fn, *args)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "running": self.running, "queued": self.queued(),
+                "concurrency": self.concurrency, "max_queue": self.max_queue,
+                "agents": {key: {"limit": self.agent_limit(key), **stats.as_dict()} for key, stats in self.stats.items()},
+            }
+
+
+kickoffScheduler = None
+
+def get_scheduler():
+    global kickoffScheduler
+    if kickoffScheduler is None:
+        kickoffScheduler = KickoffScheduler()
+    return kickoffScheduler
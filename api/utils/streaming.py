@@ -0,0 +1,111 @@
+import asyncio
+import copy
+import json
+import threading
+from fastapi.encoders import jsonable_encoder
+from crewai import LLM
+from crewai.events import crewai_event_bus
+from crewai.events.types.task_events import TaskStartedEvent,TaskCompletedEvent,TaskFailedEvent
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+
+# task and agent ids of every crew being streamed, mapped to the stream that wants their events
+streams={}
+streamsLock=threading.Lock()
+
+
+def sse(event,data):
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def stream_for(*ids):
+    with streamsLock:
+        for id in ids:
+            stream=streams.get(str(id))
+            if stream:
+                return stream
+    return None
+
+
+class CrewEventStream:
+    """Forwards crewai events of one crew run from its worker threads to an asyncio queue."""
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.ids = []
+
+    def put(self, event, data):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (event, data))
+
+    def on_crew(self, crew):
+        self.ids = [str(task.id) for task in crew.tasks] + [str(agent.id) for agent in crew.agents]
+        with streamsLock:
+            for id in self.ids:
+                streams[id] = self
+        for agent in crew.agents:
+            # token events only exist on the streaming code path; the final text is the same either way.
+            # Crews share module-level LLM objects, so this kickoff streams through a copy of its own.
+            if isinstance(agent.llm, LLM):
+                agent.llm = copy.copy(agent.llm)
+                agent.llm.stream = True
+
+    def close(self):
+        with streamsLock:
+            for id in self.ids:
+                streams.pop(id, None)
+
+    async def events(self, kickoff):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                break
+            yield sse(*item)
+        if kickoff.exception():
+            # an HTTPException raised before kickoff (e.g. a file the crew cannot use) keeps its own message
+            error = kickoff.exception()
+            yield sse('error', {"detail": getattr(error, 'detail', None) or str(error)})
+        else:
+            yield sse('result', {"result": kickoff.result()})
+
+    def finish(self, kickoff):
+        self.close()
+        self.queue.put_nowait(None)
+
+
+@crewai_event_bus.on(TaskStartedEvent)
+def on_task_started(source, event):
+    task = event.task
+    stream = stream_for(task.id) if task else None
+    if stream:
+        stream.put('task_started', {"task": task.name, "agent": task.agent.role if task.agent else None})
+
+@crewai_event_bus.on(TaskCompletedEvent)
+def on_task_completed(source, event):
+    task = event.task
+    stream = stream_for(task.id) if task else None
+    if stream:
+        stream.put('task_completed', {"task": task.name, "agent": event.output.agent, "output": event.output.raw})
+
+@crewai_event_bus.on(TaskFailedEvent)
+def on_task_failed(source, event):
+    task = event.task
+    stream = stream_for(task.id) if task else None
+    if stream:
+        stream.put('task_failed', {"task": task.name, "error": event.error})
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def on_llm_chunk(source, event):
+    stream = stream_for(event.task_id, event.agent_id)
+    if stream:
+        stream.put('token', {"task": event.task_name, "agent": event.agent_role, "chunk": event.chunk})
+
+
+def stream_crew(run, execute=asyncio.to_thread):
+    """
+    Start run(on_crew) through execute and return its Server-Sent Events:
+    task_started / task_completed / task_failed per task, token per streamed
+    LLM chunk, then a final result (or error) event. The kickoff starts right
+    away and runs to the end whether or not the client keeps reading.
+    """
+    stream = CrewEventStream(asyncio.get_running_loop())
+    kickoff = asyncio.ensure_future(execute(run, stream.on_crew))
+    kickoff.add_done_callback(stream.finish)
+    return stream.events(kickoff)
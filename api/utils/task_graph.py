@@ -0,0 +1,91 @@
+import contextvars
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from crewai import Crew, Process
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.utilities.constants import NOT_SPECIFIED
+from dotenv import load_dotenv
+from pydantic import PrivateAttr
+from utils.jobs import check_current_job
+
+load_dotenv()
+
+# tasks of one kickoff that may run at the same time
+MAX_PARALLEL_TASKS=int(os.getenv('CREW_MAX_PARALLEL_TASKS',4))
+
+
+def task_dependencies(tasks):
+    """
+    {task index: set of indexes it waits for}. A task with context=[...] waits
+    for exactly those tasks; a task without a context gets every earlier
+    output under Process.sequential, so it keeps waiting for all of them.
+    """
+    index={id(task): position for position, task in enumerate(tasks)}
+    dependencies={}
+    for position, task in enumerate(tasks):
+        if task.context is NOT_SPECIFIED:
+            dependencies[position]=set(range(position))
+        else:
+            dependencies[position]={index[id(context)] for context in task.context or [] if id(context) in index}
+    return dependencies
+
+
+class TaskGraphCrew(Crew):
+    """
+    Crew whose sequential process runs tasks as a dependency graph: a task
+    starts as soon as the tasks in its context are done, at most
+    max_parallel at a time, and two tasks of the same agent never overlap.
+    Outputs, logs and the final result keep the declared task order. A
+    cancelled job starts no further tasks.
+    """
+    _max_parallel: int = PrivateAttr(default=MAX_PARALLEL_TASKS)
+
+    def _execute_tasks(self, tasks, start_index=0, was_replayed=False):
+        if start_index or self.process != Process.sequential or any(isinstance(task, ConditionalTask) for task in tasks):
+            # replays, manager-led crews and conditional tasks keep crewai's own ordering rules
+            return super()._execute_tasks(tasks, start_index, was_replayed)
+        max_parallel = self._max_parallel
+        dependencies = task_dependencies(tasks)
+        outputs = {}
+        running = {}
+        started = set()
+        busyAgents = set()
+        with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='crew-task') as pool:
+            while len(outputs) < len(tasks):
+                for position, task in enumerate(tasks):
+                    if len(running) >= max_parallel:
+                        break
+                    if position in outputs or position in started or not dependencies[position] <= outputs.keys():
+                        continue
+                    agent = self._get_agent_to_use(task)
+                    if agent is None:
+                        raise ValueError(f"No agent available for task: {task.description}. Ensure that either the task has an assigned agent or a manager agent is provided.")
+                    if id(agent) in busyAgents:
+                        continue
+                    check_current_job()
+                    tools = self._prepare_tools(agent, task, task.tools or agent.tools or [])
+                    self._log_task_start(task, agent.role)
+                    context = self._get_context(task, [outputs[dependency] for dependency in sorted(dependencies[position])])
+                    # each task thread inherits the kickoff's tracing and metrics context
+                    future = pool.submit(contextvars.copy_context().run, task.execute_sync, agent=agent, context=context, tools=tools)
+                    running[future] = (position, id(agent))
+                    started.add(position)
+                    busyAgents.add(id(agent))
+                if not running:
+                    raise ValueError("Task context dependencies form a cycle.")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position, agentId = running.pop(future)
+                    task = tasks[position]
+                    busyAgents.discard(agentId)
+                    outputs[position] = future.result()
+                    self._process_task_result(task, outputs[position])
+                    self._store_execution_log(task, outputs[position], position, was_replayed)
+        return self._create_crew_output([outputs[position] for position in range(len(tasks))])
+
+
+def run_task_graph(crew, inputs=None, max_parallel=MAX_PARALLEL_TASKS):
+    """Kick off an already built crew with its independent tasks running in parallel."""
+    crew.__class__ = TaskGraphCrew
+    crew._max_parallel = max_parallel
+    return crew.kickoff(inputs=inputs)
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import diskcache
+import fitz
+from docx import Document
+from dotenv import load_dotenv
+from utils.digests import file_digest
+from utils.text_normalize import normalize_whitespace,clean_text,normalize_pages
+
+load_dotenv()
+
+TEXT_CACHE_DIR=os.getenv('TEXT_CACHE_DIR','./cache/text')
+# PDFs with at least this many pages are split across worker processes
+PARALLEL_PAGES=int(os.getenv('TEXT_EXTRACT_PARALLEL_PAGES',40))
+EXTRACT_WORKERS=int(os.getenv('TEXT_EXTRACT_WORKERS',min(4,os.cpu_count() or 1)))
+# bump when the extracted text changes shape so stale cache entries are ignored
+EXTRACTOR_VERSION=2
+PAGE_SEPARATOR="\n\n"
+
+textCache=None
+extractPool=None
+poolLock=threading.Lock()
+
+
+def get_text_cache():
+    global textCache
+    if textCache is None:
+        textCache=diskcache.Cache(TEXT_CACHE_DIR)
+    return textCache
+
+def get_extract_pool():
+    # PyMuPDF holds the GIL while it parses, so large PDFs are split across processes rather than threads
+    global extractPool
+    with poolLock:
+        if extractPool is None:
+            extractPool=ProcessPoolExecutor(max_workers=EXTRACT_WORKERS,mp_context=multiprocessing.get_context('spawn'))
+        return extractPool
+
+def pdf_pages_text(file_path,start,stop,normalize):
+    with fitz.open(file_path) as doc:
+        return list(normalize_pages((doc[number].get_text() for number in range(start,stop)),normalize))
+
+def extract_pdf(file_path,normalize,parallel=True):
+    parallel=parallel and EXTRACT_WORKERS>=2
+    with fitz.open(file_path) as doc:
+        page_count=doc.page_count
+        if page_count<PARALLEL_PAGES or not parallel:
+            # each page is normalized as soon as it is read, so the raw text of the whole document is never held
+            pages=list(normalize_pages((page.get_text() for page in doc),normalize))
+    if page_count>=PARALLEL_PAGES and parallel:
+        step=-(-page_count//EXTRACT_WORKERS)
+        ranges=[(start,min(start+step,page_count)) for start in range(0,page_count,step)]
+        pool=get_extract_pool()
+        futures=[pool.submit(pdf_pages_text,file_path,start,stop,normalize) for start,stop in ranges]
+        pages=[text for future in futures for text in future.result()]
+    return PAGE_SEPARATOR.join(pages)
+
+def extract_docx(file_path,normalize,parallel=True):
+    doc=Document(file_path)
+    return "\n".join(normalize_pages((paragraph.text for paragraph in doc.paragraphs),normalize))
+
+def extract_txt(file_path,normalize,parallel=True):
+    with open(file_path,'r',encoding='utf-8') as file:
+        return "\n".join(normalize_pages(file,normalize))
+
+EXTRACTORS={
+    '.pdf': extract_pdf,
+    '.docx': extract_docx,
+    '.txt': extract_txt,
+}
+
+def extract_text(file_path,parallel=True,normalize=normalize_whitespace):
+    """
+    Text of a PDF, DOCX or TXT file, normalized page by page (or line by line)
+    with normalize. Results are cached by content digest and normalizer, so a
+    document that was uploaded before is never parsed again.
+    """
+    extension=os.path.splitext(file_path)[1].lower()
+    extractor=EXTRACTORS.get(extension)
+    if extractor is None:
+        raise ValueError("Unsupported file type. Please upload a PDF, DOCX, or TXT file.")
+    key=f"{file_digest(file_path)}:{EXTRACTOR_VERSION}:{normalize.__name__}"
+    cache=get_text_cache()
+    text=cache.get(key)
+    if text is not None:
+        return text
+    try:
+        text=extractor(file_path,normalize,parallel)
+    except Exception as e:
+        raise ValueError(f"Failed to load {extension[1:].upper()} document: {e}")
+    cache.set(key,text)
+    return text
+
+def clean_document_text(file_path):
+    """Text with the claims cleaner applied to each page as it is extracted."""
+    return extract_text(file_path,normalize=clean_text)
+
+def extract_in_worker(file_path,normalize):
+    # runs inside the pool, which must not fan out into a pool of its own
+    return extract_text(file_path,parallel=False,normalize=normalize)
+
+def extract_texts(file_paths,normalize=normalize_whitespace):
+    """
+    Extract many documents at once, one per worker process, filling the text
+    cache so later extract_text calls on the same files are cache hits.
+    Returns {path: text or the exception raised for it}.
+    """
+    if EXTRACT_WORKERS<2 or len(file_paths)<2:
+        futures=None
+    else:
+        pool=get_extract_pool()
+        futures={path: pool.submit(extract_in_worker,path,normalize) for path in file_paths}
+    texts={}
+    for path in file_paths:
+        try:
+            texts[path]=futures[path].result() if futures else extract_text(path,normalize=normalize)
+        except Exception as e:
+            texts[path]=e
+    return texts
@@ -0,0 +1,226 @@
+import contextvars
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# file (JSON lines in TRACE_FILE), console, otlp (OTEL_EXPORTER_OTLP_* settings) or none
+TRACE_EXPORTER=os.getenv('TRACE_EXPORTER','file')
+if TRACE_EXPORTER!='none':
+    # crewai's anonymous telemetry installs the process-wide tracer provider as soon as crewai
+    # is imported; there can only be one, and our spans must not go to crewai's collector
+    os.environ['CREWAI_DISABLE_TELEMETRY']='true'
+
+from crewai import LLM
+from crewai.events import crewai_event_bus
+from crewai.events.types.crew_events import CrewKickoffStartedEvent,CrewKickoffCompletedEvent,CrewKickoffFailedEvent
+from crewai.events.types.task_events import TaskStartedEvent,TaskCompletedEvent,TaskFailedEvent
+from crewai.events.types.tool_usage_events import ToolUsageStartedEvent,ToolUsageFinishedEvent,ToolUsageErrorEvent
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor,ConsoleSpanExporter
+from opentelemetry.trace import Status,StatusCode
+
+TRACE_FILE=os.getenv('TRACE_FILE','./cache/traces.jsonl')
+SERVICE_NAME=os.getenv('OTEL_SERVICE_NAME','crewai-api')
+
+tracer=trace.get_tracer('crewai-api')
+
+# open crew, task and tool spans, keyed by crew id, task id and (thread, tool name);
+# crewai reports their start and end as separate events, possibly from other threads
+openSpans={}
+spansLock=threading.Lock()
+# usage recorder of the LLM call running in this context
+currentRecorder=contextvars.ContextVar('currentRecorder',default=None)
+
+
+def span_exporter():
+    if TRACE_EXPORTER=='console':
+        return ConsoleSpanExporter()
+    if TRACE_EXPORTER=='otlp':
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    os.makedirs(os.path.dirname(TRACE_FILE) or '.',exist_ok=True)
+    return ConsoleSpanExporter(out=open(TRACE_FILE,'a',encoding='utf-8'),formatter=lambda span: span.to_json(indent=None)+"\n")
+
+def install_tracer_provider():
+    """
+    Tracer provider that exports to TRACE_EXPORTER. When another provider is
+    already installed, e.g. by opentelemetry-instrument, the exporter is added
+    to that one instead, since a second provider would be ignored.
+    """
+    processor=BatchSpanProcessor(span_exporter())
+    current=trace.get_tracer_provider()
+    if isinstance(current,TracerProvider):
+        from crewai.telemetry import Telemetry
+        if current is getattr(Telemetry._instance,'provider',None):
+            raise RuntimeError("crewai telemetry installed the tracer provider first; import utils.tracing before crewai")
+        current.add_span_processor(processor)
+        return current
+    provider=TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    provider.add_span_processor(processor)
+    trace.set_tracer_provider(provider)
+    return provider
+
+def instrument_app(app):
+    """
+    Install the tracer provider and the HTTP server spans. Called at import
+    time, because the ASGI middleware has to be in place before the app starts.
+    """
+    if TRACE_EXPORTER=='none':
+        return False
+    FastAPIInstrumentor.instrument_app(app,tracer_provider=install_tracer_provider())
+    return True
+
+
+def start_span(key,name,parent=None,attributes=None):
+    context=trace.set_span_in_context(parent) if parent is not None else None
+    span=tracer.start_span(name,context=context,attributes=attributes)
+    with spansLock:
+        openSpans[key]=span
+    return span
+
+def open_span(key):
+    with spansLock:
+        return openSpans.get(key)
+
+def end_span(key,error=None,attributes=None):
+    with spansLock:
+        span=openSpans.pop(key,None)
+    if span is None:
+        return
+    if attributes:
+        span.set_attributes(attributes)
+    if error is not None:
+        span.set_status(Status(StatusCode.ERROR,str(error)))
+    span.end()
+
+def task_span(task_id):
+    return open_span(('task',str(task_id))) if task_id else None
+
+
+@crewai_event_bus.on(CrewKickoffStartedEvent)
+def on_crew_started(source,event):
+    # parented to whatever is current on the kickoff thread: the scheduler span, and through it the HTTP span
+    start_span(('crew',str(source.id)),f'crew {event.crew_name or "crew"}',attributes={
+        "crew.name": event.crew_name or "crew",
+        "crew.tasks": len(source.tasks),
+        "crew.agents": len(source.agents),
+        "crew.process": str(source.process.value),
+    })
+
+def crew_usage(crew):
+    usage=getattr(crew,'usage_metrics',None)
+    if usage is None:
+        return {}
+    return {
+        "gen_ai.usage.input_tokens": usage.prompt_tokens,
+        "gen_ai.usage.output_tokens": usage.completion_tokens,
+        "crew.llm_requests": usage.successful_requests,
+    }
+
+@crewai_event_bus.on(CrewKickoffCompletedEvent)
+def on_crew_completed(source,event):
+    end_span(('crew',str(source.id)),attributes=crew_usage(source))
+
+@crewai_event_bus.on(CrewKickoffFailedEvent)
+def on_crew_failed(source,event):
+    end_span(('crew',str(source.id)),error=event.error)
+
+@crewai_event_bus.on(TaskStartedEvent)
+def on_task_started(source,event):
+    task=event.task
+    if task is None:
+        return
+    crew=getattr(task.agent,'crew',None) if task.agent else None
+    parent=open_span(('crew',str(crew.id))) if crew is not None else None
+    start_span(('task',str(task.id)),f'task {task.name}',parent,{
+        "task.name": task.name or "",
+        "task.agent": task.agent.role if task.agent else "",
+        "task.async_execution": bool(task.async_execution),
+    })
+
+@crewai_event_bus.on(TaskCompletedEvent)
+def on_task_completed(source,event):
+    if event.task is not None:
+        end_span(('task',str(event.task.id)))
+
+@crewai_event_bus.on(TaskFailedEvent)
+def on_task_failed(source,event):
+    if event.task is not None:
+        end_span(('task',str(event.task.id)),error=event.error)
+
+def tool_key(event):
+    return ('tool',threading.get_ident(),event.tool_name)
+
+@crewai_event_bus.on(ToolUsageStartedEvent)
+def on_tool_started(source,event):
+    start_span(tool_key(event),f'tool {event.tool_name}',task_span(event.task_id),{
+        "tool.name": event.tool_name,
+        "tool.class": event.tool_class or "",
+        "tool.agent": event.agent_role or "",
+    })
+
+@crewai_event_bus.on(ToolUsageFinishedEvent)
+def on_tool_finished(source,event):
+    end_span(tool_key(event),attributes={"tool.cache_hit": event.from_cache})
+
+@crewai_event_bus.on(ToolUsageErrorEvent)
+def on_tool_failed(source,event):
+    end_span(tool_key(event),error=event.error)
+
+
+class UsageRecorder:
+    """
+    litellm-style success callback that copies token usage onto an LLM span.
+    crewai also puts it in litellm's process-wide callback list, where the
+    next call replaces it, so it only records in the context of its own call.
+    """
+    def __init__(self, span):
+        self.span = span
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        if currentRecorder.get() is not self:
+            return
+        usage=response_obj.get("usage")
+        if usage is None:
+            return
+        self.span.set_attribute("gen_ai.usage.input_tokens",getattr(usage,'prompt_tokens',0) or 0)
+        self.span.set_attribute("gen_ai.usage.output_tokens",getattr(usage,'completion_tokens',0) or 0)
+        details=getattr(usage,'prompt_tokens_details',None)
+        cached=getattr(details,'cached_tokens',None) if details else None
+        if cached is not None:
+            # prompt tokens the provider served from its own prompt cache
+            self.span.set_attribute("gen_ai.usage.cached_input_tokens",cached)
+
+innerCall=None
+
+def traced_call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+    parent=task_span(getattr(from_task,'id',None))
+    context=trace.set_span_in_context(parent) if parent is not None else None
+    with tracer.start_as_current_span(f'llm {self.model}',context=context,attributes={
+        "gen_ai.request.model": self.model,
+        "llm.stream": bool(self.stream),
+        "llm.messages": 1 if isinstance(messages,str) else len(messages),
+    }) as span:
+        recorder=UsageRecorder(span)
+        token=currentRecorder.set(recorder)
+        try:
+            return innerCall(self, messages, tools=tools, callbacks=[*(callbacks or []),recorder], available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+        finally:
+            currentRecorder.reset(token)
+
+def install_llm_tracing():
+    """
+    Wrap LLM.call in a span per completion, outside the completion cache so
+    cache hits are traced too. Call after install_llm_cache.
+    """
+    global innerCall
+    if TRACE_EXPORTER=='none' or innerCall is not None:
+        return False
+    innerCall=LLM.call
+    LLM.call=traced_call
+    return True
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import diskcache
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+from opentelemetry import trace
+from utils.audio import audio_profile,preprocess_audio
+from utils.digests import file_digest
+
+load_dotenv()
+
+TRANSCRIPT_CACHE_DIR=os.getenv('TRANSCRIPT_CACHE_DIR','./cache/transcripts')
+# Whisper requests in flight at once for one upload batch
+TRANSCRIBE_CONCURRENCY=int(os.getenv('TRANSCRIBE_CONCURRENCY',4))
+TRANSCRIBE_MODEL=os.getenv('TRANSCRIBE_MODEL','whisper-1')
+
+tracer=trace.get_tracer(__name__)
+transcriptCache=None
+
+
+def get_transcript_cache():
+    global transcriptCache
+    if transcriptCache is None:
+        transcriptCache=diskcache.Cache(TRANSCRIPT_CACHE_DIR)
+    return transcriptCache
+
+def transcript_key(file_path):
+    # answers are translated into English text, as the transcription tool always did
+    return f"{file_digest(file_path)}:{TRANSCRIBE_MODEL}:translation:{audio_profile()}"
+
+async def request_transcript(client,audio):
+    response=await client.audio.translations.create(model=TRANSCRIBE_MODEL,file=audio)
+    return response.text
+
+async def transcribe_missing(file_paths):
+    semaphore=asyncio.Semaphore(TRANSCRIBE_CONCURRENCY)
+    async with AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")) as client:
+        async def transcribe(file_path):
+            with tracer.start_as_current_span('transcribe file') as span:
+                # resampling and encoding run on threads while earlier clips are uploading
+                audio=await asyncio.to_thread(preprocess_audio,file_path)
+                span.set_attribute('audio.bytes_in',os.path.getsize(file_path))
+                span.set_attribute('audio.bytes_sent',len(audio[1]))
+                async with semaphore:
+                    return await request_transcript(client,audio)
+        return await asyncio.gather(*(transcribe(path) for path in file_paths),return_exceptions=True)
+
+def transcribe_files(file_paths):
+    """
+    English transcripts of audio files, in order. Clips heard before are served
+    from the cache by content digest; the rest go to Whisper concurrently, at
+    most TRANSCRIBE_CONCURRENCY at a time. A clip that fails comes back as an
+    error message in place of its transcript and is not cached.
+    """
+    cache=get_transcript_cache()
+    keys=[transcript_key(path) for path in file_paths]
+    texts=[cache.get(key) for key in keys]
+    missing=[position for position,text in enumerate(texts) if text is None]
+    with tracer.start_as_current_span('transcribe',attributes={
+        'transcribe.files': len(file_paths),
+        'transcribe.cached': len(file_paths)-len(missing),
+    }):
+        if missing:
+            # called from a kickoff worker thread, which has no event loop of its own
+            results=asyncio.run(transcribe_missing([file_paths[position] for position in missing]))
+            for position,result in zip(missing,results):
+                if isinstance(result,Exception):
+                    texts[position]=f"An error occurred during transcription: {result}"
+                else:
+                    texts[position]=result
+                    cache.set(keys[position],result)
+    return texts
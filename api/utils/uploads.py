@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import os
+import zipfile
+from fastapi import HTTPException
+from nanoid import generate
+from dotenv import load_dotenv
+from utils.digests import CHUNK_SIZE,remember_file_digest
+from utils.metrics import record_upload
+
+load_dotenv()
+
+UPLOAD_DIR='./uploads'
+MAX_UPLOAD_BYTES=int(os.getenv('MAX_UPLOAD_MB',50))*1024*1024
+MAX_AUDIO_BYTES=int(os.getenv('MAX_AUDIO_UPLOAD_MB',100))*1024*1024
+MAX_ARCHIVE_FILES=int(os.getenv('MAX_ARCHIVE_FILES',500))
+
+# where each /agent/file crew keeps its uploads
+AGENT_UPLOAD_DIRS = {
+    '4': f'{UPLOAD_DIR}/4',
+    '12': f'{UPLOAD_DIR}/12',
+    '13': f'{UPLOAD_DIR}/13',
+    '15': f'{UPLOAD_DIR}/audios',
+    '16': f'{UPLOAD_DIR}/16',
+    '17': f'{UPLOAD_DIR}/17',
+    '18': f'{UPLOAD_DIR}/18',
+}
+
+
+class SavedUpload:
+    def __init__(self, path, size, digest):
+        self.path = path
+        self.size = size
+        self.digest = digest
+
+
+def prepare_upload_dirs():
+    """Create the upload folders once at startup instead of checking on every request."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    for folder in AGENT_UPLOAD_DIRS.values():
+        os.makedirs(folder, exist_ok=True)
+
+def too_large(max_bytes):
+    return HTTPException(status_code=413, detail=f"File too large. The limit is {max_bytes // (1024*1024)} MB.")
+
+def copy_upload(source, path, max_bytes):
+    source.seek(0)
+    return copy_stream(source, path, max_bytes)
+
+def copy_stream(source, path, max_bytes):
+    """Copy a file object to path in fixed-size chunks, hashing as it goes; nothing is held in memory."""
+    sha = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, 'wb') as f:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise too_large(max_bytes)
+                sha.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    digest = sha.hexdigest()
+    remember_file_digest(path, digest)
+    record_upload(os.path.dirname(path), size)
+    return SavedUpload(path, size, digest)
+
+async def save_upload(upload, folder, extension, max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Stream an UploadFile to folder under a fresh name in one worker-thread hop.
+    Uploads whose declared size is already over max_bytes are refused before
+    anything is written.
+    """
+    if upload is None:
+        raise HTTPException(status_code=400, detail="File is required")
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large(max_bytes)
+    path = f'{folder}/{generate(size=10)}{extension}'
+    return await asyncio.to_thread(copy_upload, upload.file, path, max_bytes)
+
+def extract_archive(archive_path, folder, extensions, max_bytes=MAX_UPLOAD_BYTES, max_files=MAX_ARCHIVE_FILES):
+    """
+    Unpack the files of a zip upload whose extension is in extensions into
+    folder under fresh names, streaming each member with the same size limit
+    as a direct upload. Returns [(path, name inside the archive)].
+    """
+    saved = []
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            members = [member for member in archive.infolist()
+                       if not member.is_dir() and os.path.splitext(member.filename)[1].lower() in extensions]
+            if len(members) > max_files:
+                raise HTTPException(status_code=413, detail=f"Archive holds more than {max_files} documents.")
+            for member in members:
+                # member names are never used as paths, which rules out zip-slip
+                extension = os.path.splitext(member.filename)[1].lower()
+                with archive.open(member) as source:
+                    upload = copy_stream(source, f'{folder}/{generate(size=10)}{extension}', max_bytes)
+                saved.append((upload.path, os.path.basename(member.filename)))
+    except zipfile.BadZipFile:
+        remove_saved(saved)
+        raise HTTPException(status_code=400, detail="Invalid zip archive.")
+    except BaseException:
+        remove_saved(saved)
+        raise
+    return saved
+
+def remove_saved(saved):
+    for path, _ in saved:
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,96 @@
+import importlib
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# import every agent module in the background once the server is up; with 0 they load on first use only
+AGENT_WARMUP=os.getenv('AGENT_WARMUP','1')!='0'
+
+# seconds each agent module took to import the first time, in load order; a module's share of
+# shared dependencies (crewai_tools, chromadb, langchain, ...) lands on whichever loaded them first
+moduleTimes={}
+importLock=threading.Lock()
+lazyClasses=[]
+
+
+def import_timed(module_name):
+    with importLock:
+        if module_name in moduleTimes:
+            return importlib.import_module(module_name)
+        started=time.perf_counter()
+        module=importlib.import_module(module_name)
+        moduleTimes[module_name]=round(time.perf_counter()-started,3)
+        return module
+
+
+class LazyClass:
+    """
+    Stand-in for a crew class named 'package.module:Class' that imports the
+    module on first use. Calling it builds an instance of the real class.
+    """
+    def __init__(self, path, on_load=None):
+        self.module_name, _, self.class_name = path.partition(':')
+        self.on_load = on_load
+        self.loaded = None
+        lazyClasses.append(self)
+
+    def load(self):
+        if self.loaded is None:
+            loaded = getattr(import_timed(self.module_name), self.class_name)
+            if self.on_load:
+                self.on_load(loaded)
+            self.loaded = loaded
+        return self.loaded
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+
+class Warmup:
+    """Background import of every lazily loaded crew after the port opens, for the readiness probe."""
+    def __init__(self):
+        self.started = None
+        self.finished = None
+        self.errors = {}
+        self.thread = None
+
+    def start(self, after=None):
+        if self.thread is not None:
+            return
+        self.started = time.perf_counter()
+        if not AGENT_WARMUP:
+            return
+        self.thread = threading.Thread(target=self.run, args=(after,), name='agent-warmup', daemon=True)
+        self.thread.start()
+
+    def run(self, after):
+        for lazy in list(lazyClasses):
+            try:
+                lazy.load()
+            except Exception as e:
+                self.errors[lazy.module_name] = str(e)
+        if after:
+            after()
+        self.finished = time.perf_counter()
+        slowest = sorted(moduleTimes.items(), key=lambda item: -item[1])[:5]
+        print(f'agents warm in {self.finished - self.started:.2f}s; slowest imports:', ', '.join(f'{name} {seconds}s' for name, seconds in slowest))
+
+    def warm(self):
+        return all(lazy.loaded is not None for lazy in lazyClasses)
+
+    def status(self):
+        return {
+            "accepting": True,
+            "warm": self.warm(),
+            "loaded": sum(1 for lazy in lazyClasses if lazy.loaded is not None),
+            "agents": len(lazyClasses),
+            "warmup_seconds": round(self.finished - self.started, 3) if self.finished else None,
+            "modules": dict(moduleTimes),
+            "errors": dict(self.errors),
+        }
+
+
+agentWarmup = Warmup()
@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+API_DIR=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),'api')
+sys.path.insert(0,API_DIR)
+
+# nothing under test may reach a real provider, exporter or the repository's cache directories
+os.environ.setdefault('OPENAI_API_KEY','sk-test')
+# crews build their LLM from MODEL when the crew class is constructed
+os.environ.setdefault('MODEL','gpt-4o-mini')
+os.environ.setdefault('JWT_SECRET','test-secret')
+os.environ.setdefault('CREWAI_DISABLE_TELEMETRY','true')
+os.environ.setdefault('OTEL_SDK_DISABLED','true')
+os.environ.setdefault('TRACE_EXPORTER','none')
+os.environ.setdefault('FAKE_PROVIDERS','0')
+os.chdir(tempfile.mkdtemp(prefix='api-tests-'))
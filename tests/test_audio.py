@@ -0,0 +1,53 @@
+import io
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+from utils import audio
+
+
+def recording(path, lead_ms=1000, tone_ms=500, tail_ms=1000):
+    clip = AudioSegment.silent(lead_ms, frame_rate=44100) + Sine(440).to_audio_segment(tone_ms).set_frame_rate(44100) + AudioSegment.silent(tail_ms, frame_rate=44100)
+    clip.set_channels(2).export(str(path), format='wav')
+    return str(path)
+
+
+@pytest.fixture
+def wav_only(monkeypatch):
+    # the same output whether or not ffmpeg is installed here
+    monkeypatch.setattr(audio, 'ENCODER_AVAILABLE', False)
+
+
+def test_clips_are_downmixed_resampled_and_trimmed(tmp_path, wav_only):
+    name, data = audio.preprocess_audio(recording(tmp_path / 'answer.wav'))
+    clip = AudioSegment.from_file(io.BytesIO(data), format='wav')
+    assert name == 'answer.wav'
+    assert clip.channels == 1 and clip.frame_rate == audio.AUDIO_SAMPLE_RATE and clip.sample_width == 2
+    assert 500 <= len(clip) <= 500 + 2*audio.SILENCE_PADDING_MS + 20
+
+
+def test_a_silent_clip_is_sent_whole(tmp_path, wav_only):
+    path = tmp_path / 'silence.wav'
+    AudioSegment.silent(800, frame_rate=16000).export(str(path), format='wav')
+    _, data = audio.preprocess_audio(str(path))
+    assert len(AudioSegment.from_file(io.BytesIO(data), format='wav')) == 800
+
+
+def test_files_that_cannot_be_decoded_are_sent_unchanged(tmp_path):
+    path = tmp_path / 'answer.m4a'
+    path.write_bytes(b'not audio')
+    assert audio.preprocess_audio(str(path)) == ('answer.m4a', b'not audio')
+
+
+def test_preprocessing_can_be_turned_off(tmp_path, monkeypatch):
+    path = recording(tmp_path / 'answer.wav')
+    monkeypatch.setattr(audio, 'AUDIO_PREPROCESS', False)
+    with open(path, 'rb') as f:
+        assert audio.preprocess_audio(path) == ('answer.wav', f.read())
+    assert audio.audio_profile() == 'raw'
+
+
+def test_the_profile_names_what_is_sent(monkeypatch):
+    monkeypatch.setattr(audio, 'ENCODER_AVAILABLE', True)
+    assert audio.audio_profile() == f"{audio.AUDIO_SAMPLE_RATE}hz:{audio.AUDIO_FORMAT}@{audio.AUDIO_BITRATE}:{audio.SILENCE_THRESHOLD_DB:g}dB"
+    monkeypatch.setattr(audio, 'ENCODER_AVAILABLE', False)
+    assert audio.audio_profile().split(':')[1] == 'wav'
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+import pytest
+from utils import index
+
+
+class FakeUsers:
+    """The few AsyncCollection calls the auth helpers make, over a list of documents."""
+    def __init__(self):
+        self.documents = []
+
+    def matching(self, query):
+        return [document for document in self.documents if all(document.get(key) == value for key, value in query.items())]
+
+    async def insert_one(self, document):
+        self.documents.append(dict(document))
+
+    async def find_one(self, query):
+        found = self.matching(query)
+        return dict(found[0]) if found else None
+
+    async def update_one(self, query, update):
+        for document in self.matching(query)[:1]:
+            document.update(update["$set"])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+    monkeypatch.setattr(index, 'userCollection', FakeUsers())
+    return TestClient(server.app)
+
+
+def test_passwords_are_hashed_on_the_bcrypt_pool_while_the_loop_keeps_running(monkeypatch):
+    threads = []
+    real = index.bcrypt.hashpw
+
+    def hashpw(password, salt):
+        threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return real(password, salt)
+
+    monkeypatch.setattr(index.bcrypt, 'hashpw', hashpw)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(ticker())
+        hashed = await asyncio.gather(*(index.get_password_hash(f"secret{n}") for n in range(3)))
+        beat.cancel()
+        assert await index.verify_password("secret1", hashed[1])
+        assert not await index.verify_password("secret1", hashed[0])
+        return ticks
+
+    ticks = asyncio.run(scenario())
+    assert all(name.startswith('bcrypt') for name in threads)
+    # the loop went on scheduling other work through the hashing
+    assert ticks >= 10
+
+
+def test_register_login_refresh_and_change_password(client):
+    credentials = {"email": "user@example.com", "password": "first"}
+    registered = client.post('/auth/register', json=credentials).json()
+    assert registered["email"] == credentials["email"] and "password" not in registered
+    assert client.post('/auth/register', json=credentials).status_code == 404
+    stored = index.userCollection.documents[0]
+    assert stored["password"] != b"first" and stored["refresh_token"] == registered["tokens"]["refreshToken"]
+
+    tokens = client.post('/auth/login', json=credentials).json()["tokens"]
+    assert index.userCollection.documents[0]["refresh_token"] == tokens["refresh_token"]
+    refreshed = client.post('/auth/tokens', json={"refreshToken": tokens["refresh_token"]})
+    assert refreshed.status_code == 200
+    assert client.post('/auth/tokens', json={"refreshToken": "not-a-token"}).status_code == 404
+
+    assert client.post('/auth/change-password', json={"email": credentials["email"], "password": "second"}).status_code == 200
+    assert client.post('/auth/login', json=credentials).status_code == 404
+    assert client.post('/auth/login', json={**credentials, "password": "second"}).status_code == 200
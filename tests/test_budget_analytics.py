@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from utils.budget_analytics import analyze_budget_file, month_numbers, to_number
+import pandas as pd
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+
+
+def write_csv(tmp_path, text, name='budget.csv'):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def monthly(values, years=1, growth=0.0):
+    rows = ["Month,Motor,Health"]
+    for year in range(years):
+        for number, month in enumerate(MONTHS):
+            base = 1000*(1+growth)**(year*12+number)
+            rows.append(f'{month},"${base*values[number]:,.0f}",{500+10*(year*12+number)}')
+    return "\n".join(rows)
+
+
+def test_currency_symbols_and_separators_are_numbers():
+    assert to_number(pd.Series(["$1,200", " 3 400 ", "n/a"])).tolist()[:2] == [1200, 3400]
+    assert np.isnan(to_number(pd.Series(["n/a"]))[0])
+
+
+def test_month_labels_and_dates_map_to_calendar_months():
+    assert month_numbers(pd.Series(["Jan", "february", " MAR "])).tolist() == [1, 2, 3]
+    assert month_numbers(pd.Series(["2024-11-01", "2024-12-01"])).tolist() == [11, 12]
+    assert month_numbers(pd.Series(["Q1", "Q2"])) is None
+
+
+def test_figures_per_line_of_business(tmp_path):
+    analysis = analyze_budget_file(write_csv(tmp_path, monthly([1]*12)))
+    assert analysis.lines_of_business() == ["Motor", "Health"]
+    health = analysis.summary.loc["Health"]
+    assert health["first"] == 500 and health["last"] == 610 and health["total"] == sum(500+10*n for n in range(12))
+    assert health["trend per month"] == pytest.approx(10)
+    assert health["growth"] == pytest.approx(0.22)
+    assert list(analysis.forecast.index[:2]) == ["January", "February"]
+    assert analysis.forecast.loc["January", "Health"] == 620
+    assert (analysis.forecast["All lines"] == analysis.forecast["Motor"] + analysis.forecast["Health"]).all()
+
+
+def test_seasonality_is_applied_only_after_two_years(tmp_path):
+    season = [1.0]*11 + [2.0]
+    oneYear = analyze_budget_file(write_csv(tmp_path, monthly(season), 'one.csv'))
+    twoYears = analyze_budget_file(write_csv(tmp_path, monthly(season, years=2), 'two.csv'))
+    assert not oneYear.seasonal and twoYears.seasonal
+    assert twoYears.seasonality.loc["Dec", "Motor"] > 1.5
+    forecast = twoYears.forecast["Motor"]
+    assert forecast["December"] > 1.5*forecast["November"]
+    assert "Seasonal index by month (applied to the forecast)" in twoYears.to_markdown()
+
+
+def test_rows_without_a_period_column_get_their_own_labels(tmp_path):
+    analysis = analyze_budget_file(write_csv(tmp_path, "Motor\n100\n120\n140"))
+    assert list(analysis.table.index) == ["M1", "M2", "M3"] and list(analysis.forecast.index[:1]) == ["M+1"]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("Month,Region\nJanuary,North\nFebruary,South", "no numeric columns"),
+    ("Month,Motor\nJanuary,100", "at least two months"),
+    ("Month,Motor,Health\nJanuary,0,50\nFebruary,100,60", "first month is zero for Motor"),
+])
+def test_files_that_cannot_be_analyzed_raise_a_message_for_the_user(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        analyze_budget_file(write_csv(tmp_path, text))
+
+
+def test_the_budget_route_answers_400_before_any_crew_runs(monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+    from utils.index import create_token
+    built = []
+    monkeypatch.setattr(server, 'AutomatedBudgetingAgent', lambda **options: built.append(options))
+    token = create_token({"email": "tests@example.com"}, 'accessToken')
+    with TestClient(server.app, headers={"Authorization": f"Bearer {token}"}) as client:
+        response = client.post('/agent/file/13', files={"file": ("budget.csv", b"Month,Motor\nJanuary,100")}, data={"region": "UAE"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "The budget file needs at least two months of figures to show a trend."}
+    assert built == []
@@ -0,0 +1,143 @@
+import asyncio
+import gc
+import io
+import json
+import threading
+import time
+import zipfile
+from types import SimpleNamespace
+import pytest
+from utils import claims_rules
+from utils.uploads import prepare_upload_dirs
+
+
+@pytest.fixture
+def batch(tmp_path, monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+    from utils.index import create_token
+    from agents.claims_processor.crew import ClaimAnalysis
+    monkeypatch.setattr(claims_rules, 'RULES_DIR', str(tmp_path / 'rules'))
+    monkeypatch.setattr(claims_rules, 'rulesDocuments', {})
+    monkeypatch.setattr(claims_rules, 'digestLocks', {})
+    monkeypatch.setattr(claims_rules, 'clean_document_text', lambda path: open(path).read())
+    monkeypatch.setattr(server, 'CLAIMS_BATCH_WORKERS', 2)
+    prepare_upload_dirs()
+
+    def extract_texts(paths, normalize):
+        return {path: ValueError("unreadable") if open(path).read() == 'broken' else open(path).read() for path in paths}
+
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def run_claim(rules, path, use_summary=False, on_crew=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        # the claim text stands in for the analysis task's rule-by-rule findings, one "rule: status" per line
+        lines = [line.split(": ") for line in open(path).read().splitlines()]
+        findings = [{"rule": rule, "status": status, "reason": "as filed"} for rule, status in (line for line in lines if len(line) == 2)]
+        analysis = SimpleNamespace(raw="", pydantic=ClaimAnalysis(findings=findings))
+        return SimpleNamespace(raw=f"report on {path}", tasks_output=[analysis])
+
+    monkeypatch.setattr(server, 'extract_texts', extract_texts)
+    monkeypatch.setattr(server, 'runClaim', run_claim)
+    token = create_token({"email": "tests@example.com"}, 'accessToken')
+    client = TestClient(server.app, headers={"Authorization": f"Bearer {token}"})
+    return SimpleNamespace(client=client, peak=peak)
+
+
+def events(response):
+    parsed = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n")
+        parsed.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return parsed
+
+
+CLAIMS = {
+    "ok.txt": "Rule 1: compliant\nRule 2: compliant",
+    "bad.txt": "Rule 1: compliant\nRule 2: violated",
+    "vague.txt": "Nothing conclusive",
+    "broken.txt": "broken",
+}
+
+
+def test_every_claim_is_checked_and_summarized(batch):
+    files = [("claims", (name, text.encode())) for name, text in CLAIMS.items()]
+    files.append(("rules", ("rules.txt", b"Rule 1. Rule 2.")))
+    response = batch.client.post('/claims/batch', files=files)
+    assert response.status_code == 200
+    parsed = events(response)
+    event, started = parsed[0]
+    assert event == 'batch_started' and started["claims"] == list(CLAIMS)
+    assert claims_rules.get_rules(started["rules"]) is not None
+    verdicts = {data["name"]: data["verdict"] for event, data in parsed if event == 'claim'}
+    assert verdicts == {"ok.txt": 'pass', "bad.txt": 'fail', "vague.txt": 'unknown'}
+    assert [data for event, data in parsed if event == 'claim_failed'] == [{"name": "broken.txt", "error": "unreadable"}]
+    event, summary = parsed[-1]
+    assert event == 'summary'
+    assert (summary["total"], summary["passed"], summary["failed"], summary["unknown"], summary["errors"]) == (4, 1, 1, 1, 1)
+    assert batch.peak[0] <= 2
+
+
+def test_claims_can_come_as_a_zip_against_registered_rules(batch):
+    rules = batch.client.post('/claims/rules', files={"file": ("rules.txt", b"Rule 1.")}).json()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zipped:
+        zipped.writestr("claims/ok.txt", CLAIMS["ok.txt"])
+        zipped.writestr("claims/bad.txt", CLAIMS["bad.txt"])
+    response = batch.client.post('/claims/batch', files={"archive": ("claims.zip", archive.getvalue())}, data={"rulesId": rules["id"]})
+    summary = events(response)[-1][1]
+    assert (summary["total"], summary["passed"], summary["failed"]) == (2, 1, 1)
+
+
+def test_a_batch_needs_rules_and_claims(batch):
+    claim = [("claims", ("ok.txt", b"Rule 1: compliant"))]
+    assert batch.client.post('/claims/batch', files=claim).status_code == 400
+    assert batch.client.post('/claims/batch', files=claim, data={"rulesId": "missing"}).status_code == 404
+    assert batch.client.post('/claims/batch', files={"rules": ("rules.txt", b"Rule 1.")}).status_code == 400
+
+
+def test_a_cancelled_batch_ends_its_stream_with_an_error():
+    import server
+
+    async def scenario():
+        results = asyncio.Queue()
+        batch = server.startClaimsBatch(asyncio.sleep(10), results)
+        await asyncio.sleep(0)
+        batch.cancel()
+        return [event async for event in server.claimsBatchEvents(SimpleNamespace(id='rules'), ['a.txt'], batch, results)]
+
+    sent = asyncio.run(scenario())
+    assert sent[-2].startswith('event: error') and 'cancelled' in sent[-2]
+    assert sent[-1].startswith('event: summary')
+    assert not server.claimsBatches
+
+
+def test_a_running_batch_is_held_by_the_server_until_it_finishes():
+    import server
+    finished = []
+
+    async def batch(results):
+        await asyncio.sleep(0.05)
+        gc.collect()
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        await results.put(None)
+
+    async def scenario():
+        results = asyncio.Queue()
+        # the caller drops the task at once, as a disconnected client's stream does
+        server.startClaimsBatch(batch(results), results)
+        assert len(server.claimsBatches) == 1
+        gc.collect()
+        await asyncio.wait_for(results.get(), 5)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert finished == [True]
+    assert not server.claimsBatches
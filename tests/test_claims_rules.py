@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+from types import SimpleNamespace
+import pytest
+from utils import claims_rules
+
+
+@pytest.fixture
+def rules_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(claims_rules, 'RULES_DIR', str(tmp_path / 'rules'))
+    monkeypatch.setattr(claims_rules, 'rulesDocuments', {})
+    monkeypatch.setattr(claims_rules, 'digestLocks', {})
+    monkeypatch.setattr(claims_rules, 'clean_document_text', lambda path: open(path).read().upper())
+    return tmp_path
+
+
+def document(folder, name, text):
+    path = folder / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_a_document_is_extracted_once_and_stored_under_its_digest(rules_dir, monkeypatch):
+    extracted = []
+    monkeypatch.setattr(claims_rules, 'clean_document_text', lambda path: extracted.append(path) or 'rules text')
+    first = claims_rules.register_rules(document(rules_dir, 'a.txt', 'same'))
+    second = claims_rules.register_rules(document(rules_dir, 'b.txt', 'same'))
+    assert first.id == second.id and len(extracted) == 1
+    monkeypatch.setattr(claims_rules, 'rulesDocuments', {})
+    assert claims_rules.get_rules(first.id).text == 'rules text'
+    assert os.listdir(claims_rules.RULES_DIR) == [f'{first.id}.json']
+
+
+def test_a_summary_is_added_to_the_stored_artifact(rules_dir, monkeypatch):
+    monkeypatch.setattr(claims_rules, 'summarize_rules', lambda text: f'short {text}')
+    path = document(rules_dir, 'a.txt', 'rules')
+    plain = claims_rules.register_rules(path)
+    summarized = claims_rules.register_rules(path, summarize=True)
+    assert plain.summary is None and summarized.summary == 'short RULES'
+    with open(claims_rules.rules_path(plain.id), encoding='utf-8') as f:
+        assert json.load(f)['summary'] == 'short RULES'
+
+
+def test_other_documents_do_not_wait_for_a_slow_summary(rules_dir, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_summary(text):
+        started.set()
+        release.wait(5)
+        return 'summary'
+
+    monkeypatch.setattr(claims_rules, 'summarize_rules', slow_summary)
+    slow = threading.Thread(target=claims_rules.register_rules, args=(document(rules_dir, 'slow.txt', 'slow'),), kwargs={'summarize': True})
+    slow.start()
+    try:
+        assert started.wait(5)
+        done = []
+        other = threading.Thread(target=lambda: done.append(claims_rules.register_rules(document(rules_dir, 'other.txt', 'other'))))
+        other.start()
+        other.join(2)
+        assert done and done[0].text == 'OTHER'
+        # nothing is written for the slow document until its summary is in
+        assert len(os.listdir(claims_rules.RULES_DIR)) == 1
+    finally:
+        release.set()
+        slow.join()
+    assert len(os.listdir(claims_rules.RULES_DIR)) == 2
+
+
+def analysis(*findings):
+    from agents.claims_processor.crew import ClaimAnalysis
+    return SimpleNamespace(raw="", pydantic=ClaimAnalysis(findings=[
+        {"rule": rule, "status": status, "reason": reason} for rule, status, reason in findings
+    ]))
+
+
+def test_verdicts_follow_the_structured_findings():
+    failed = SimpleNamespace(tasks_output=[analysis(("Deadline", "compliant", "filed in time"), ("Receipt", "violated", "missing"))])
+    assert claims_rules.claim_verdict(failed) == {"verdict": "fail", "violated": 1, "compliant": 1}
+    # negated wording in the reasons does not turn a compliant finding into a violation
+    passed = SimpleNamespace(tasks_output=[analysis(("Deadline", "compliant", "No rules were violated."), ("Form", "compliant", "not non-compliant"))])
+    assert claims_rules.claim_verdict(passed) == {"verdict": "pass", "violated": 0, "compliant": 2}
+    assert claims_rules.claim_verdict(SimpleNamespace(tasks_output=[analysis()]))["verdict"] == 'unknown'
+
+
+def test_free_text_without_findings_is_never_a_verdict():
+    prose = SimpleNamespace(raw="All claims are compliant. No rules were violated.", pydantic=None)
+    assert claims_rules.claim_verdict(SimpleNamespace(tasks_output=[prose])) == {"verdict": "unknown", "violated": 0, "compliant": 0}
+    assert claims_rules.claim_verdict("No rules found")["verdict"] == 'unknown'
+
+
+def test_the_fake_provider_fills_the_analysis_model():
+    from agents.claims_processor.crew import ClaimAnalysis
+    from utils.fake_providers import synthetic_model
+    assert synthetic_model(ClaimAnalysis).findings[0].status == 'compliant'
@@ -0,0 +1,52 @@
+import threading
+import pytest
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from utils import jobs
+from utils.registry import get_agent
+
+
+@pytest.fixture
+def spec():
+    return get_agent('3')
+
+
+def inputs(spec):
+    return spec.validate({"area": "health insurance", "product_marketing_idea": "Family plans with telemedicine"})
+
+
+def test_every_persona_feeds_one_synthesis_task(spec):
+    crew = spec.build()
+    personas, synthesis = crew.tasks[:-1], crew.tasks[-1]
+    assert len(personas) == 8 and synthesis.name == "persona_synthesis_task"
+    assert all(task.context == [] for task in personas)
+    assert synthesis.context == personas
+
+
+def test_cancelling_a_job_stops_the_personas_and_skips_the_synthesis(spec, tmp_path, monkeypatch):
+    store = jobs.JobStore(str(tmp_path / 'jobs.sqlite3'))
+    job = jobs.Job('job', '3', store)
+    store.create(job.id, job.agent_id)
+    ran = []
+    lock = threading.Lock()
+    everyPersonaStarted = threading.Barrier(8, timeout=10)
+
+    def execute_sync(task, agent=None, context=None, tools=None):
+        with lock:
+            ran.append(task.name)
+        everyPersonaStarted.wait()
+        if task.name == "jordan_miller_feedback":
+            store.request_cancel(job.id)
+        # the agent's next step after the cancel request, on the persona's own thread
+        job.step_callback(None)
+        task.output = TaskOutput(description=task.description, name=task.name, raw="feedback", agent=agent.role)
+        return task.output
+
+    monkeypatch.setattr(Task, 'execute_sync', execute_sync)
+    token = jobs.currentJob.set(job)
+    try:
+        with pytest.raises(jobs.JobCancelled):
+            spec.kickoff(inputs(spec), on_crew=job.on_crew)
+    finally:
+        jobs.currentJob.reset(token)
+    assert len(ran) == 8 and "persona_synthesis_task" not in ran
@@ -0,0 +1,37 @@
+import threading
+import pytest
+from utils.fake_providers import FakeStats
+from utils import fake_providers
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = FakeStats()
+    monkeypatch.setattr(fake_providers, 'fakeStats', stats)
+    return stats
+
+
+def test_overlapping_calls_count_once_towards_busy_time(stats):
+    calls = [threading.Thread(target=fake_providers.simulate, args=('llm_calls', 0.2)) for _ in range(4)]
+    for call in calls:
+        call.start()
+    for call in calls:
+        call.join()
+    snapshot = stats.snapshot()
+    assert snapshot['llm_calls'] == 4
+    assert snapshot['simulated_seconds'] == pytest.approx(0.8)
+    assert 0.19 <= snapshot['busy_seconds'] < 0.4
+
+
+def test_sequential_calls_add_up(stats):
+    fake_providers.simulate('tool_calls', 0.05)
+    fake_providers.simulate('tool_calls', 0.05)
+    snapshot = stats.snapshot()
+    assert snapshot['tool_calls'] == 2
+    assert snapshot['busy_seconds'] == pytest.approx(snapshot['simulated_seconds'], abs=0.02)
+
+
+def test_reset_clears_every_figure(stats):
+    fake_providers.simulate('llm_calls', 0.01)
+    stats.reset()
+    assert stats.snapshot() == {"llm_calls": 0, "tool_calls": 0, "replayed": 0, "simulated_seconds": 0, "busy_seconds": 0}
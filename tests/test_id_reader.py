@@ -0,0 +1,85 @@
+import json
+import httpx
+import openai
+from openai.types.chat import ChatCompletion
+import pytest
+from PIL import Image
+from agents.user_id_agent import crew as id_reader
+from utils import images
+
+FIELDS = {
+    "document_type": "National ID", "full_name": "Jane Doe", "date_of_birth": "1990-01-01", "id_number": "784-1990-1234567-1",
+    "nationality": None, "sex": "F", "date_of_issue": None, "date_of_expiry": None, "issuing_authority": None,
+    "address": None, "other_fields": [{"name": "Card number", "value": "123"}],
+}
+UNREADABLE = dict(FIELDS, full_name=None, id_number=" ")
+
+
+@pytest.fixture
+def image(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, 'OCR_CACHE_DIR', str(tmp_path / 'ocr'))
+    monkeypatch.setattr(images, 'ocrCache', None)
+    path = tmp_path / 'id.png'
+    Image.new('RGB', (320, 200), (20, 80, 160)).save(path)
+    return str(path)
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    state = {"calls": 0, "answers": []}
+
+    def request_id_fields(mime_type, data):
+        state["calls"] += 1
+        answer = state["answers"].pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return json.dumps(answer)
+
+    monkeypatch.setattr(id_reader, 'request_id_fields', request_id_fields)
+    return state
+
+
+def reader(image):
+    return id_reader.IDReaderCrew(image_path=image, ocr=images.cached_ocr)
+
+
+def api_error(error_class, status):
+    response = httpx.Response(status, request=httpx.Request('POST', 'https://api.openai.com/v1/chat/completions'))
+    return error_class("rejected", response=response, body=None)
+
+
+def test_a_valid_answer_is_returned_and_cached(image, answers):
+    answers["answers"] = [FIELDS]
+    output = reader(image).read_fields()
+    assert output.pydantic.full_name == "Jane Doe" and "**Card number**: 123" in output.raw
+    assert reader(image).read_fields().json_dict == output.json_dict
+    assert answers["calls"] == 1
+
+
+def test_an_answer_that_does_not_identify_the_holder_is_not_cached(image, answers):
+    answers["answers"] = [UNREADABLE, FIELDS]
+    assert reader(image).read_fields() is None
+    assert reader(image).read_fields().pydantic.id_number == FIELDS["id_number"]
+    assert answers["calls"] == 2
+
+
+def test_a_refused_image_falls_back_to_the_crew(image, answers):
+    answers["answers"] = [api_error(openai.BadRequestError, 400)]
+    assert reader(image).read_fields() is None
+
+
+def test_a_truncated_or_filtered_answer_falls_back_to_the_crew_and_is_not_cached(image, answers):
+    truncated = openai.LengthFinishReasonError(completion=ChatCompletion.model_construct(usage=None))
+    answers["answers"] = [truncated, openai.ContentFilterFinishReasonError(), FIELDS]
+    assert reader(image).read_fields() is None
+    assert reader(image).read_fields() is None
+    assert reader(image).read_fields().pydantic.full_name == "Jane Doe"
+    assert answers["calls"] == 3
+
+
+def test_authentication_and_network_errors_reach_the_caller(image, answers):
+    answers["answers"] = [api_error(openai.AuthenticationError, 401), openai.APIConnectionError(request=httpx.Request('POST', 'https://api.openai.com'))]
+    with pytest.raises(openai.AuthenticationError):
+        reader(image).read_fields()
+    with pytest.raises(openai.APIConnectionError):
+        reader(image).read_fields()
@@ -0,0 +1,123 @@
+import io
+import pytest
+from PIL import Image, ImageDraw
+from PIL.PngImagePlugin import PngInfo
+from utils import images
+
+
+def card(size=(600, 380), border=0, background='white'):
+    """A dark card with some text-like detail, optionally on a plain background."""
+    canvas = Image.new('RGB', (size[0]+2*border, size[1]+2*border), background)
+    draw = ImageDraw.Draw(canvas)
+    draw.rectangle((border, border, border+size[0]-1, border+size[1]-1), fill=(30, 60, 120))
+    for row in range(5):
+        draw.rectangle((border+40, border+40+row*60, border+40+(row+3)*80, border+60+row*60), fill=(240, 240, 240))
+    return canvas
+
+
+def save(image, path, **options):
+    image.save(str(path), **options)
+    return str(path)
+
+
+def tagged():
+    info = PngInfo()
+    info.add_text('Software', 'scanner 2.0')
+    return info
+
+
+def decoded(data):
+    return Image.open(io.BytesIO(data))
+
+
+def test_a_uniform_border_is_cropped_with_a_margin(tmp_path):
+    _, data, _ = images.normalize_image(save(card(border=100), tmp_path / 'scan.png'))
+    width, height = decoded(data).size
+    assert 600 <= width <= 600 + 2*(images.CROP_MARGIN+4) and 380 <= height <= 380 + 2*(images.CROP_MARGIN+4)
+
+
+def test_large_photos_are_scaled_to_what_the_model_reads(tmp_path):
+    _, data, _ = images.normalize_image(save(card(size=(4000, 3000)), tmp_path / 'photo.jpg', quality=95))
+    width, height = decoded(data).size
+    assert min(width, height) == images.IMAGE_SHORT_SIDE and max(width, height) <= images.IMAGE_MAX_SIDE
+
+
+def test_exif_orientation_is_applied(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees clockwise
+    _, data, _ = images.normalize_image(save(card(), tmp_path / 'rotated.jpg', exif=exif, quality=95))
+    width, height = decoded(data).size
+    assert height > width
+
+
+def test_transparency_becomes_white(tmp_path):
+    image = Image.new('RGBA', (400, 300), (0, 0, 0, 0))
+    ImageDraw.Draw(image).rectangle((100, 100, 300, 200), fill=(200, 0, 0, 255))
+    _, data, _ = images.normalize_image(save(image, tmp_path / 'logo.png'))
+    result = decoded(data).convert('RGB')
+    assert result.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_the_same_pixels_in_another_format_share_a_digest(tmp_path):
+    picture = card()
+    _, _, fromPng = images.normalize_image(save(picture, tmp_path / 'card.png'))
+    _, _, fromBmp = images.normalize_image(save(picture, tmp_path / 'card.bmp'))
+    _, _, fromTagged = images.normalize_image(save(picture, tmp_path / 'tagged.png', pnginfo=tagged()))
+    _, _, other = images.normalize_image(save(card(size=(620, 380)), tmp_path / 'other.png'))
+    assert fromPng == fromBmp == fromTagged != other
+
+
+def test_the_smaller_encoding_is_sent(tmp_path):
+    mime_type, data, _ = images.normalize_image(save(card(), tmp_path / 'flat.png'))
+    assert mime_type in ('image/png', 'image/jpeg')
+    picture = decoded(data)
+    assert picture.format == {'image/png': 'PNG', 'image/jpeg': 'JPEG'}[mime_type]
+
+
+@pytest.fixture
+def ocr_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, 'OCR_CACHE_DIR', str(tmp_path / 'ocr'))
+    monkeypatch.setattr(images, 'ocrCache', None)
+
+
+def test_ocr_answers_are_cached_by_file_and_by_pixels(tmp_path, ocr_cache):
+    calls = []
+
+    def request_ocr(mime_type, data):
+        calls.append(len(data))
+        return "text"
+
+    picture = card()
+    png, bmp = save(picture, tmp_path / 'card.png'), save(picture, tmp_path / 'card.bmp')
+    assert images.cached_ocr(png, request_ocr) == "text"
+    assert images.cached_ocr(png, request_ocr) == "text"
+    assert images.cached_ocr(bmp, request_ocr) == "text"
+    assert len(calls) == 1
+
+
+def test_each_request_kind_has_its_own_answers(tmp_path, ocr_cache):
+    path = save(card(), tmp_path / 'card.png')
+
+    def request_ocr(mime_type, data):
+        return "free text"
+
+    def request_id_fields(mime_type, data):
+        return '{"name": "Jane"}'
+
+    assert images.cached_ocr(path, request_ocr) == "free text"
+    assert images.cached_ocr(path, request_id_fields) == '{"name": "Jane"}'
+
+
+def test_failed_requests_are_not_cached(tmp_path, ocr_cache):
+    path = save(card(), tmp_path / 'card.png')
+    answers = iter([RuntimeError("timeout"), "text"])
+
+    def request_ocr(mime_type, data):
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    with pytest.raises(RuntimeError):
+        images.cached_ocr(path, request_ocr)
+    assert images.cached_ocr(path, request_ocr) == "text"
@@ -0,0 +1,178 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+from utils import jobs
+
+
+@pytest.fixture
+def runner(tmp_path):
+    runner = jobs.JobRunner(jobs.JobStore(str(tmp_path / 'jobs.sqlite3')), workers=2)
+    yield runner
+    runner.executor.shutdown(wait=True)
+
+
+def finished(runner, job_id):
+    runner.local_future(job_id) and runner.local_future(job_id).result(timeout=10)
+    return runner.get(job_id)
+
+
+def test_a_finished_crew_records_its_result_and_task_outputs(runner):
+    def run(on_crew):
+        crew = SimpleNamespace()
+        on_crew(crew)
+        crew.task_callback({"raw": "first task"})
+        return {"raw": "done"}
+    job = finished(runner, runner.submit('0', run))
+    assert job["status"] == 'succeeded' and job["result"] == {"raw": "done"}
+    assert job["tasks"] == [{"raw": "first task"}]
+
+
+def test_a_failing_crew_records_the_error(runner):
+    def run(on_crew):
+        raise RuntimeError("provider down")
+    job = finished(runner, runner.submit('0', run))
+    assert job["status"] == 'failed' and job["error"] == "provider down"
+
+
+def test_task_threads_that_inherit_the_job_context_stop_on_cancel(runner):
+    started, released = threading.Event(), threading.Event()
+
+    def run(on_crew):
+        crew = SimpleNamespace()
+        on_crew(crew)
+        started.set()
+        released.wait(5)
+        # as TaskGraphCrew does: each task thread runs in a copy of the kickoff context
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(contextvars.copy_context().run, crew.step_callback, None).result()
+
+    job_id = runner.submit('11', run)
+    assert started.wait(5) and runner.cancel(job_id)
+    released.set()
+    assert finished(runner, job_id)["status"] == 'cancelled'
+
+
+def test_threads_without_the_job_context_are_never_interrupted(runner):
+    started, released = threading.Event(), threading.Event()
+    outcomes = []
+
+    def run(on_crew):
+        crew = SimpleNamespace()
+        on_crew(crew)
+        started.set()
+        released.wait(5)
+        # crewai's own async-task threads: raising there would leave kickoff waiting forever
+        thread = threading.Thread(target=lambda: outcomes.append(crew.step_callback(None)))
+        thread.start()
+        thread.join()
+        return {"raw": "done"}
+
+    job_id = runner.submit('3', run)
+    assert started.wait(5) and runner.cancel(job_id)
+    released.set()
+    job = finished(runner, job_id)
+    assert outcomes == [None]
+    # the crew got to the end, but a job flagged for cancellation never becomes succeeded
+    assert job["status"] == 'cancelled'
+
+
+def test_a_finished_job_cannot_be_cancelled(runner):
+    job_id = runner.submit('0', lambda on_crew: {"raw": "done"})
+    finished(runner, job_id)
+    assert not runner.cancel(job_id)
+    assert runner.get(job_id)["status"] == 'succeeded'
+
+
+def test_the_job_context_does_not_leak_into_the_next_job(runner):
+    seen = []
+    for _ in range(3):
+        finished(runner, runner.submit('0', lambda on_crew: seen.append(jobs.currentJob.get().id) or {"raw": "done"}))
+    assert len(set(seen)) == 3
+    assert jobs.currentJob.get() is None
+
+
+@pytest.fixture
+def api(runner, monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+    from utils.index import create_token
+    monkeypatch.setattr(jobs, 'jobRunner', runner)
+    token = create_token({"email": "tests@example.com"}, 'accessToken')
+    return TestClient(server.app, headers={"Authorization": f"Bearer {token}"})
+
+
+SEO_INPUTS = {"project_description": "Car insurance", "geographical_location": "UAE"}
+
+
+def test_a_submitted_job_returns_at_once_and_can_be_waited_for(api, monkeypatch):
+    from utils.registry import AGENTS
+    released = threading.Event()
+
+    def kickoff(inputs, on_crew=None):
+        crew = SimpleNamespace()
+        on_crew(crew)
+        released.wait(5)
+        crew.task_callback({"raw": "keywords"})
+        return {"raw": f"plan for {inputs.geographical_location}"}
+
+    monkeypatch.setattr(AGENTS['0'], 'kickoff', kickoff)
+    submitted = api.post('/jobs/agent/0', json=SEO_INPUTS).json()
+    assert submitted["status"] == 'pending'
+    assert api.get(f"/jobs/{submitted['job']}").json()["status"] in ('pending', 'running')
+    released.set()
+    job = api.get(f"/jobs/{submitted['job']}", params={"wait": 10}).json()
+    assert job["status"] == 'succeeded'
+    assert job["result"] == {"raw": "plan for UAE"} and job["tasks"] == [{"raw": "keywords"}]
+    assert api.delete(f"/jobs/{submitted['job']}").status_code == 409
+
+
+def test_a_running_job_can_be_cancelled_through_the_api(api, monkeypatch):
+    from utils.registry import AGENTS
+    started, released = threading.Event(), threading.Event()
+
+    def kickoff(inputs, on_crew=None):
+        crew = SimpleNamespace()
+        on_crew(crew)
+        started.set()
+        released.wait(5)
+        crew.step_callback(None)
+        return {"raw": "never reached"}
+
+    monkeypatch.setattr(AGENTS['0'], 'kickoff', kickoff)
+    job_id = api.post('/jobs/agent/0', json=SEO_INPUTS).json()["job"]
+    assert started.wait(5)
+    assert api.delete(f"/jobs/{job_id}").json() == {"job": job_id, "status": "cancelling"}
+    released.set()
+    job = api.get(f"/jobs/{job_id}", params={"wait": 10}).json()
+    assert job["status"] == 'cancelled' and job["result"] is None
+
+
+def test_unknown_agents_and_jobs_are_not_found(api):
+    assert api.post('/jobs/agent/99', json={}).status_code == 404
+    assert api.get('/jobs/missing').status_code == 404
+    assert api.delete('/jobs/missing').status_code == 404
+
+
+def test_a_cancelled_agent_makes_no_further_llm_calls(runner, monkeypatch):
+    from crewai import LLM, Agent, Crew, Task
+    calls = []
+
+    def call(self, messages, *args, **kwargs):
+        calls.append(messages)
+        # the cancel lands while the first completion is in flight
+        runner.cancel(jobs.currentJob.get().id)
+        return "Thought: I now know the final answer\nFinal Answer: done"
+
+    monkeypatch.setattr(LLM, 'call', call)
+
+    def run(on_crew):
+        agent = Agent(role="Writer", goal="Write", backstory="Writes", llm=LLM(model='gpt-4o-mini'), max_retry_limit=2)
+        crew = Crew(agents=[agent], tasks=[Task(description="Write", expected_output="Text", agent=agent)])
+        on_crew(crew)
+        return crew.kickoff()
+
+    job = finished(runner, runner.submit('0', run))
+    assert job["status"] == 'cancelled'
+    assert len(calls) == 1
@@ -0,0 +1,64 @@
+import time
+from types import SimpleNamespace
+import jwt
+import pytest
+from utils import jwtbearer
+from utils.index import create_token,secret_key
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    jwtbearer.verifiedTokens.clear()
+    yield
+    jwtbearer.verifiedTokens.clear()
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    calls = []
+    real = jwtbearer.decode_token
+
+    def counting(token):
+        calls.append(token)
+        return real(token)
+
+    monkeypatch.setattr(jwtbearer, 'decode_token', counting)
+    return calls
+
+
+def test_a_verified_token_is_not_decoded_again(decodes):
+    token = create_token({"email": "a@example.com"}, 'accessToken')
+    first = jwtbearer.JWTBearer().verify_jwt(token)
+    second = jwtbearer.JWTBearer().verify_jwt(token)
+    assert first == second and first["email"] == "a@example.com"
+    assert len(decodes) == 1
+
+
+def test_cached_claims_expire_with_the_token(decodes, monkeypatch):
+    token = create_token({"email": "a@example.com"}, 'accessToken')
+    claims = jwtbearer.cached_claims(token)
+    monkeypatch.setattr(jwtbearer, 'time', SimpleNamespace(time=lambda: claims['exp'] + 1))
+    jwtbearer.cached_claims(token)
+    assert len(decodes) == 2
+
+
+def test_invalid_and_expired_tokens_are_rejected_and_not_cached():
+    expired = jwt.encode({"email": "a@example.com", "exp": int(time.time()) - 10}, secret_key)
+    assert jwtbearer.JWTBearer().verify_jwt(expired) is None
+    assert jwtbearer.JWTBearer().verify_jwt("not-a-token") is None
+    assert len(jwtbearer.verifiedTokens) == 0
+
+
+def test_tokens_without_expiry_are_never_cached(decodes):
+    token = jwt.encode({"email": "a@example.com"}, secret_key)
+    jwtbearer.cached_claims(token)
+    jwtbearer.cached_claims(token)
+    assert len(decodes) == 2 and len(jwtbearer.verifiedTokens) == 0
+
+
+def test_cache_keeps_only_the_most_recent_tokens(monkeypatch):
+    monkeypatch.setattr(jwtbearer, 'TOKEN_CACHE_SIZE', 2)
+    tokens = [create_token({"email": f"{number}@example.com"}, 'accessToken') for number in range(3)]
+    for token in tokens:
+        jwtbearer.cached_claims(token)
+    assert len(jwtbearer.verifiedTokens) == 2
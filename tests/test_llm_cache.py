@@ -0,0 +1,48 @@
+from utils.llm_cache import cache_key, normalize_messages
+
+
+def params(*messages, **extra):
+    return {"model": "gpt-4o-mini", "messages": list(messages), **extra}
+
+
+def test_whitespace_around_text_content_does_not_change_the_key():
+    assert cache_key(params({"role": "user", "content": "  hello\n"})) == cache_key(params({"role": "user", "content": "hello"}))
+
+
+def test_transport_params_are_not_part_of_the_key():
+    message = {"role": "user", "content": "hello"}
+    assert cache_key(params(message, api_key="a", timeout=5)) == cache_key(params(message, api_key="b", timeout=30))
+
+
+def test_answer_changing_params_are_part_of_the_key():
+    message = {"role": "user", "content": "hello"}
+    assert cache_key(params(message, temperature=0)) != cache_key(params(message, temperature=1))
+
+
+def test_multimodal_content_is_keyed_as_is():
+    image = {"role": "user", "content": [
+        {"type": "text", "text": "Return JSON"},
+        {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+    ]}
+    other = {"role": "user", "content": [
+        {"type": "text", "text": "Return JSON"},
+        {"type": "image_url", "image_url": {"url": "data:image/png;base64,BBBB"}},
+    ]}
+    assert normalize_messages([image]) == [image]
+    assert cache_key(params(image)) != cache_key(params(other))
+
+
+def test_tool_turns_with_different_ids_get_different_keys():
+    first = {"role": "tool", "tool_call_id": "call_1", "name": "search", "content": "result"}
+    second = {"role": "tool", "tool_call_id": "call_2", "name": "search", "content": "result"}
+    assert cache_key(params(first)) != cache_key(params(second))
+
+
+def test_assistant_tool_calls_are_part_of_the_key():
+    call = lambda name: {"role": "assistant", "content": None, "tool_calls": [
+        {"id": "call_1", "type": "function", "function": {"name": name, "arguments": "{}"}}]}
+    assert cache_key(params(call("search"))) != cache_key(params(call("scrape")))
+
+
+def test_missing_content_counts_as_empty_text():
+    assert normalize_messages([{"role": "assistant", "content": None}]) == [{"role": "assistant", "content": ""}]
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from utils import metrics
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_timed_by_route_template_and_agent():
+    app = FastAPI()
+
+    @app.post('/agent/{agentId}')
+    def run(agentId: str):
+        return {"result": agentId}
+
+    app.add_middleware(metrics.MetricsMiddleware)
+    labels = dict(method='POST', route='/agent/{agentId}', agent='7', status='200')
+    before = sample('http_request_duration_seconds_count', **labels)
+    with TestClient(app) as client:
+        client.post('/agent/7')
+        client.post('/agent/7')
+        client.get('/nowhere')
+    assert sample('http_request_duration_seconds_count', **labels) == before + 2
+    assert sample('http_request_duration_seconds_count', method='GET', route='unmatched', agent='', status='404') >= 1
+
+
+def test_uploads_are_counted_per_agent_folder():
+    before = sample('upload_bytes_total', folder='13')
+    metrics.record_upload('./uploads/13/', 2048)
+    assert sample('upload_bytes_total', folder='13') == before + 2048
+    assert sample('upload_size_bytes_count', folder='13') >= 1
+
+
+def test_completions_and_their_tokens_are_counted_per_model(monkeypatch):
+    def inner(llm, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        for callback in callbacks:
+            callback.log_success_event({}, {"usage": usage}, None, None)
+        return "answer"
+
+    monkeypatch.setattr(metrics, 'innerCall', inner)
+    llm = SimpleNamespace(model='metrics-test-model')
+    assert metrics.counted_call(llm, "hello") == "answer"
+    assert sample('llm_requests_total', model='metrics-test-model') == 1
+    assert sample('llm_tokens_total', model='metrics-test-model', direction='in') == 120
+    assert sample('llm_tokens_total', model='metrics-test-model', direction='out') == 30
+
+
+def test_the_exposition_lists_every_family():
+    body, content_type = metrics.metrics_response()
+    assert content_type.startswith('text/plain')
+    for name in (b'crew_kickoff_duration_seconds', b'scheduler_queued_kickoffs', b'llm_cache_lookups_total', b'tool_calls_total'):
+        assert name in body
+
+
+def test_overlapping_completions_count_only_their_own_tokens(monkeypatch):
+    import threading
+    from tests.test_tracing import overlapping_calls
+    inner, call = overlapping_calls(metrics.counted_call, {'model-a': (100, 10), 'model-b': (7, 3)})
+    monkeypatch.setattr(metrics, 'innerCall', inner)
+    before = {(model, direction): sample('llm_tokens_total', model=model, direction=direction)
+              for model in ('model-a', 'model-b') for direction in ('in', 'out')}
+    first = threading.Thread(target=call, args=('model-a',))
+    first.start()
+    call('model-b')
+    first.join(5)
+    added = {key: sample('llm_tokens_total', model=key[0], direction=key[1]) - value for key, value in before.items()}
+    assert added == {('model-a', 'in'): 100, ('model-a', 'out'): 10, ('model-b', 'in'): 7, ('model-b', 'out'): 3}
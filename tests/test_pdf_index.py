@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from utils import pdf_index
+from utils.digests import file_digest
+
+
+@pytest.fixture
+def documents(tmp_path):
+    paths = []
+    for name in ('policy.pdf', 'annex.pdf'):
+        path = tmp_path / name
+        path.write_bytes(f'%PDF-1.4 {name}'.encode())
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def opened(tmp_path, monkeypatch):
+    calls = []
+
+    def open_index(digest, pdf_paths):
+        calls.append(digest)
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(pdf_index, 'INDEX_DIR', str(tmp_path / 'pdf_index'))
+    monkeypatch.setattr(pdf_index, 'openTools', type(pdf_index.openTools)())
+    monkeypatch.setattr(pdf_index, 'digestLocks', {})
+    monkeypatch.setattr(pdf_index, 'open_index', open_index)
+    return calls
+
+
+def test_a_single_document_keeps_its_file_digest(documents):
+    assert pdf_index.documents_digest(documents[:1]) == file_digest(documents[0])
+
+
+def test_a_document_set_digest_ignores_order_and_renames(documents, tmp_path):
+    copy = tmp_path / 'renamed.pdf'
+    copy.write_bytes(open(documents[0], 'rb').read())
+    digest = pdf_index.documents_digest(documents)
+    assert digest == pdf_index.documents_digest(documents[::-1]) == pdf_index.documents_digest([str(copy), documents[1]])
+    assert digest not in (file_digest(documents[0]), file_digest(documents[1]))
+
+
+def test_an_index_is_opened_once_per_content_even_under_concurrency(documents, opened):
+    tools = []
+    threads = [threading.Thread(target=lambda: tools.append(pdf_index.get_pdf_search_tool(documents[0]))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 1 and len({id(tool) for tool in tools}) == 1
+
+
+def test_only_the_most_recent_indexes_stay_open(documents, opened, monkeypatch):
+    monkeypatch.setattr(pdf_index, 'OPEN_INDEXES', 1)
+    pdf_index.get_pdf_search_tool(documents[0])
+    pdf_index.get_pdf_search_tool(documents[1])
+    pdf_index.get_pdf_search_tool(documents[0])
+    assert len(opened) == 3 and list(pdf_index.openTools) == [file_digest(documents[0])]
+
+
+@pytest.fixture
+def ingestion(monkeypatch):
+    monkeypatch.setattr(pdf_index, 'ingestJobs', type(pdf_index.ingestJobs)())
+    state = {"calls": 0, "fail": False, "release": threading.Event()}
+
+    def get_pdf_search_tool(pdf_paths, digest=None):
+        state["calls"] += 1
+        state["release"].wait(5)
+        if state["fail"]:
+            raise RuntimeError("embedding failed")
+
+    monkeypatch.setattr(pdf_index, 'get_pdf_search_tool', get_pdf_search_tool)
+    return state
+
+
+def wait_for(digest):
+    pdf_index.get_ingestion(digest).future.exception(timeout=5)
+    return pdf_index.ingestion_status(digest)
+
+
+def test_ingestion_runs_once_per_document_and_reports_progress(documents, ingestion):
+    digest = pdf_index.start_ingestion(documents[0])
+    assert pdf_index.start_ingestion(documents[0]) == digest == file_digest(documents[0])
+    assert pdf_index.ingestion_status(digest)["status"] in ("pending", "running")
+    ingestion["release"].set()
+    assert wait_for(digest)["status"] == "ready"
+    assert ingestion["calls"] == 1
+
+
+def test_a_failed_ingestion_is_reported_and_can_be_started_again(documents, ingestion):
+    ingestion["fail"] = True
+    ingestion["release"].set()
+    digest = pdf_index.start_ingestion(documents)
+    assert wait_for(digest) == {"id": digest, "status": "failed", "error": "embedding failed"}
+    ingestion["fail"] = False
+    pdf_index.start_ingestion(documents)
+    assert wait_for(digest)["status"] == "ready" and ingestion["calls"] == 2
+
+
+def test_an_index_built_by_another_worker_is_ready(documents, ingestion, tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_index, 'INDEX_DIR', str(tmp_path / 'pdf_index'))
+    digest = file_digest(documents[0])
+    assert pdf_index.ingestion_status(digest) is None
+    (tmp_path / 'pdf_index' / digest).mkdir(parents=True)
+    (tmp_path / 'pdf_index' / digest / '.indexed').write_text('policy.pdf')
+    assert pdf_index.ingestion_status(digest) == {"id": digest, "status": "ready"}
@@ -0,0 +1,41 @@
+import pytest
+from pydantic import ValidationError
+from utils import registry
+
+
+def test_every_agent_id_resolves_to_a_crew_and_an_input_model():
+    for agent_id, spec in registry.AGENTS.items():
+        assert registry.get_agent(agent_id) is spec
+    assert registry.get_agent('99') is None
+
+
+def test_inputs_are_validated_against_the_agent_model():
+    spec = registry.get_agent('0')
+    inputs = spec.validate({"project_description": "Car insurance", "geographical_location": "UAE"})
+    assert inputs.customer_domain is None
+    with pytest.raises(ValidationError):
+        spec.validate({"project_description": "Car insurance"})
+
+
+def test_configs_are_parsed_once_and_copied_per_crew(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, 'configCache', {})
+    path = tmp_path / 'agents.yaml'
+    path.write_text("writer:\n  role: Writer\n")
+    first = registry.load_yaml_cached(path)
+    first['writer']['tools'] = ['search']
+    path.write_text("writer:\n  role: Changed\n")
+    second = registry.load_yaml_cached(path)
+    assert second == {"writer": {"role": "Writer"}}
+
+
+def test_kickoff_builds_a_named_crew_and_shows_it_to_the_caller_first():
+    calls = []
+    spec = registry.AgentSpec('agents.seo_agent.crew:SeoAgent', registry.SEOAgent,
+                              kickoff=lambda crew, inputs: calls.append(('kickoff', crew, inputs)) or "done")
+    inputs = spec.validate({"project_description": "Car insurance", "geographical_location": "UAE"})
+    assert spec.kickoff(inputs, on_crew=lambda crew: calls.append(('on_crew', crew))) == "done"
+    (first, crew), (second, kicked, passed) = calls
+    assert (first, second) == ('on_crew', 'kickoff') and kicked is crew and passed is inputs
+    assert crew.name == spec.name == 'SeoAgent'
+    # each request gets a crew of its own
+    assert spec.build() is not crew
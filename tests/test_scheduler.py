@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from utils.scheduler import BATCH, INTERACTIVE, NORMAL, KickoffScheduler, QueueFull, parse_limits
+
+
+def scheduler(**options):
+    options.setdefault('concurrency', 1)
+    options.setdefault('agent_concurrency', 1)
+    options.setdefault('max_queue', 10)
+    options.setdefault('max_agent_queue', 10)
+    options.setdefault('limits', {})
+    return KickoffScheduler(**options)
+
+
+def test_parse_limits():
+    assert parse_limits("3=1, file/15=2,,") == {'3': 1, 'file/15': 2}
+    assert parse_limits(None) == {}
+
+
+def test_grants_up_to_the_global_cap_and_queues_the_rest():
+    kickoffs = scheduler(concurrency=2, agent_concurrency=5)
+    tickets = [kickoffs.enqueue('a') for _ in range(3)]
+    assert [ticket.granted.done() for ticket in tickets] == [True, True, False]
+    kickoffs.release(tickets[0])
+    assert tickets[2].granted.done()
+
+
+def test_per_agent_cap_lets_other_agents_through():
+    kickoffs = scheduler(concurrency=4, agent_concurrency=1)
+    first, second = kickoffs.enqueue('a'), kickoffs.enqueue('a')
+    other = kickoffs.enqueue('b')
+    assert first.granted.done() and not second.granted.done() and other.granted.done()
+
+
+def test_higher_priority_is_granted_first():
+    kickoffs = scheduler(agent_concurrency=5)
+    running = kickoffs.enqueue('x')
+    batch = kickoffs.enqueue('batch', priority=BATCH)
+    normal = kickoffs.enqueue('normal', priority=NORMAL)
+    interactive = kickoffs.enqueue('chat', priority=INTERACTIVE)
+    kickoffs.release(running)
+    assert interactive.granted.done() and not normal.granted.done() and not batch.granted.done()
+    kickoffs.release(interactive)
+    assert normal.granted.done() and not batch.granted.done()
+
+
+def test_agents_of_one_priority_take_turns():
+    kickoffs = scheduler(agent_concurrency=5)
+    running = kickoffs.enqueue('x')
+    a1, a2, b1 = kickoffs.enqueue('a'), kickoffs.enqueue('a'), kickoffs.enqueue('b')
+    kickoffs.release(running)
+    assert a1.granted.done()
+    kickoffs.release(a1)
+    # b has waited less than a2 but a just had its turn
+    assert b1.granted.done() and not a2.granted.done()
+
+
+def test_rejects_when_the_agent_queue_is_full():
+    kickoffs = scheduler(max_agent_queue=1)
+    kickoffs.enqueue('a')
+    kickoffs.enqueue('a')
+    with pytest.raises(QueueFull) as rejected:
+        kickoffs.enqueue('a')
+    assert rejected.value.retry_after >= 1
+    assert kickoffs.snapshot()['agents']['a']['rejected'] == 1
+
+
+def test_rejects_when_the_global_queue_is_full():
+    kickoffs = scheduler(max_queue=1)
+    kickoffs.enqueue('a')
+    kickoffs.enqueue('b')
+    with pytest.raises(QueueFull):
+        kickoffs.enqueue('c')
+    # without rejection the request is admitted anyway
+    assert kickoffs.enqueue('c', reject=False) is not None
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    kickoffs = scheduler()
+    running = kickoffs.enqueue('a')
+    waiting = kickoffs.enqueue('b')
+    after = kickoffs.enqueue('c')
+    waiting.granted.cancel()
+    kickoffs.release(waiting)
+    assert kickoffs.snapshot()['queued'] == 1
+    kickoffs.release(running)
+    assert after.granted.done() and kickoffs.snapshot()['running'] == 1
+
+
+def test_release_frees_the_slot_after_a_failed_call():
+    kickoffs = scheduler()
+    ticket = kickoffs.enqueue('a')
+
+    def fail():
+        raise RuntimeError("crew failed")
+
+    with pytest.raises(RuntimeError):
+        kickoffs.call(ticket, fail)
+    snapshot = kickoffs.snapshot()
+    assert snapshot['running'] == 0 and snapshot['agents']['a']['completed'] == 1
+
+
+def test_execute_releases_a_request_cancelled_while_queued():
+    kickoffs = scheduler()
+    running = kickoffs.enqueue('a')
+
+    async def scenario():
+        waiting = asyncio.ensure_future(kickoffs.run('b', lambda: 'never'))
+        await asyncio.sleep(0.01)
+        assert kickoffs.snapshot()['queued'] == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert kickoffs.snapshot()['queued'] == 0
+        kickoffs.release(running)
+        return await kickoffs.run('c', lambda: 'ran')
+
+    assert asyncio.run(scenario()) == 'ran'
+    assert kickoffs.snapshot()['running'] == 0
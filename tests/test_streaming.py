@@ -0,0 +1,18 @@
+import asyncio
+from types import SimpleNamespace
+from crewai import LLM
+from utils.streaming import CrewEventStream
+
+
+def test_streaming_kickoff_does_not_switch_shared_llms_to_streaming():
+    shared = LLM(model="gpt-4o-mini")
+    agents = [SimpleNamespace(id="a1", llm=shared), SimpleNamespace(id="a2", llm=shared)]
+    crew = SimpleNamespace(tasks=[], agents=agents)
+    stream = CrewEventStream(asyncio.new_event_loop())
+    stream.on_crew(crew)
+    try:
+        assert shared.stream is False
+        assert all(agent.llm is not shared and agent.llm.stream for agent in agents)
+        assert all(agent.llm.model == shared.model for agent in agents)
+    finally:
+        stream.close()
@@ -0,0 +1,104 @@
+import threading
+import time
+import pytest
+from crewai import Agent, Crew, LLM, Process, Task
+from crewai.tasks.task_output import TaskOutput
+from utils import jobs
+from utils.task_graph import run_task_graph, task_dependencies
+
+llm = LLM(model='gpt-4o-mini')
+
+
+class Recorder:
+    """Stands in for Task.execute_sync: records when and where each task ran and what context it got."""
+    def __init__(self, seconds=0.1):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.runs = {}
+        self.before = {}
+
+    def __call__(self, task, agent=None, context=None, tools=None):
+        started = time.perf_counter()
+        if task.name in self.before:
+            self.before[task.name]()
+        time.sleep(self.seconds)
+        with self.lock:
+            self.runs[task.name] = {"started": started, "ended": time.perf_counter(), "context": context or "",
+                                    "job": jobs.currentJob.get()}
+        task.output = TaskOutput(description=task.description, name=task.name, raw=f"output of {task.name}", agent=agent.role)
+        return task.output
+
+    def overlapped(self, first, second):
+        a, b = self.runs[first], self.runs[second]
+        return a["started"] < b["ended"] and b["started"] < a["ended"]
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = Recorder()
+    monkeypatch.setattr(Task, 'execute_sync', lambda task, agent=None, context=None, tools=None: recorder(task, agent, context, tools))
+    return recorder
+
+
+def agent(role):
+    return Agent(role=role, goal=f"{role} goal", backstory=f"{role} backstory", llm=llm)
+
+
+def task(name, owner, **options):
+    return Task(name=name, description=f"{name} description", expected_output="text", agent=owner, **options)
+
+
+def crew(tasks):
+    return Crew(agents=list({id(item.agent): item.agent for item in tasks}.values()), tasks=tasks, process=Process.sequential)
+
+
+def test_dependencies_follow_context_or_every_earlier_task():
+    a, b = agent("a"), agent("b")
+    first, second = task("first", a, context=[]), task("second", b, context=[])
+    merge = task("merge", a, context=[first, second])
+    last = task("last", b)
+    assert task_dependencies([first, second, merge, last]) == {0: set(), 1: set(), 2: {0, 1}, 3: {0, 1, 2}}
+
+
+def test_independent_tasks_overlap_and_outputs_keep_declared_order(recorder):
+    a, b, c = agent("a"), agent("b"), agent("c")
+    first, second = task("first", a, context=[]), task("second", b, context=[])
+    merge = task("merge", c, context=[first, second])
+    output = run_task_graph(crew([first, second, merge]), {})
+    assert recorder.overlapped("first", "second")
+    assert recorder.runs["merge"]["started"] >= max(recorder.runs["first"]["ended"], recorder.runs["second"]["ended"])
+    assert "output of first" in recorder.runs["merge"]["context"] and "output of second" in recorder.runs["merge"]["context"]
+    assert [item.raw for item in output.tasks_output] == ["output of first", "output of second", "output of merge"]
+    assert output.raw == "output of merge"
+
+
+def test_tasks_of_one_agent_never_overlap(recorder):
+    a = agent("a")
+    run_task_graph(crew([task("first", a, context=[]), task("second", a, context=[])]), {})
+    assert not recorder.overlapped("first", "second")
+
+
+def test_max_parallel_bounds_running_tasks(recorder):
+    tasks = [task(f"t{number}", agent(f"agent {number}"), context=[]) for number in range(4)]
+    run_task_graph(crew(tasks), {}, max_parallel=2)
+    peak = max(sum(1 for other in recorder.runs.values() if other["started"] < run["ended"] and run["started"] < other["ended"])
+               for run in recorder.runs.values())
+    assert peak == 2
+
+
+def test_a_job_cancelled_while_tasks_run_starts_no_further_tasks(recorder, tmp_path):
+    store = jobs.JobStore(str(tmp_path / 'jobs.sqlite3'))
+    job = jobs.Job('job', 'agent', store)
+    store.create(job.id, job.agent_id)
+    first, second = task("first", agent("a"), context=[]), task("second", agent("b"), context=[])
+    merge = task("merge", agent("c"), context=[first, second])
+    recorder.before["first"] = lambda: store.request_cancel(job.id)
+    token = jobs.currentJob.set(job)
+    try:
+        with pytest.raises(jobs.JobCancelled):
+            run_task_graph(crew([first, second, merge]), {})
+    finally:
+        jobs.currentJob.reset(token)
+    # the task threads worked for the job, and the dependent task never started
+    assert {run["job"] for run in recorder.runs.values()} == {job}
+    assert "merge" not in recorder.runs
@@ -0,0 +1,86 @@
+import fitz
+import pytest
+from docx import Document
+from utils import text_extraction
+
+
+@pytest.fixture(autouse=True)
+def text_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_extraction, 'TEXT_CACHE_DIR', str(tmp_path / 'text'))
+    monkeypatch.setattr(text_extraction, 'textCache', None)
+
+
+def pdf(path, pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_pdf_pages_are_normalized_and_empty_pages_skipped(tmp_path):
+    path = pdf(tmp_path / 'policy.pdf', ["Cover   page", "", "Section  1:  Scope"])
+    assert text_extraction.extract_text(path) == "Cover page\n\nSection 1: Scope"
+
+
+def test_docx_and_txt_are_read_line_by_line(tmp_path):
+    document = Document()
+    document.add_paragraph("First   clause")
+    document.add_paragraph("   ")
+    document.add_paragraph("Second clause")
+    document.save(str(tmp_path / 'contract.docx'))
+    (tmp_path / 'notes.txt').write_text("one  two\n\n\tthree\n", encoding='utf-8')
+    assert text_extraction.extract_text(str(tmp_path / 'contract.docx')) == "First clause\nSecond clause"
+    assert text_extraction.extract_text(str(tmp_path / 'notes.txt')) == "one two\nthree"
+
+
+def test_a_document_is_parsed_once_per_normalizer(tmp_path, monkeypatch):
+    path = pdf(tmp_path / 'policy.pdf', ["Claims  #1"])
+    calls = []
+    extract_pdf = text_extraction.extract_pdf
+    monkeypatch.setitem(text_extraction.EXTRACTORS, '.pdf', lambda *args: calls.append(args[1].__name__) or extract_pdf(*args))
+    assert text_extraction.extract_text(path) == "Claims #1"
+    assert text_extraction.extract_text(path) == "Claims #1"
+    assert text_extraction.clean_document_text(path) == "Claims 1"
+    assert calls == ['normalize_whitespace', 'clean_text']
+
+
+def test_large_pdfs_split_across_processes_give_the_same_text(tmp_path, monkeypatch):
+    path = pdf(tmp_path / 'long.pdf', [f"Page  {number}" for number in range(7)])
+    serial = text_extraction.extract_pdf(path, text_extraction.normalize_whitespace, parallel=False)
+    monkeypatch.setattr(text_extraction, 'PARALLEL_PAGES', 3)
+    monkeypatch.setattr(text_extraction, 'EXTRACT_WORKERS', 2)
+    assert text_extraction.extract_pdf(path, text_extraction.normalize_whitespace) == serial
+    assert serial.split("\n\n") == [f"Page {number}" for number in range(7)]
+
+
+def test_unsupported_and_broken_files_raise_value_errors(tmp_path):
+    (tmp_path / 'image.png').write_bytes(b'png')
+    (tmp_path / 'broken.pdf').write_bytes(b'not a pdf')
+    with pytest.raises(ValueError, match="Unsupported file type"):
+        text_extraction.extract_text(str(tmp_path / 'image.png'))
+    with pytest.raises(ValueError, match="Failed to load PDF document"):
+        text_extraction.extract_text(str(tmp_path / 'broken.pdf'))
+
+
+def test_batches_report_each_failure_in_place(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_extraction, 'EXTRACT_WORKERS', 1)
+    good = pdf(tmp_path / 'good.pdf', ["Claim  one"])
+    (tmp_path / 'broken.pdf').write_bytes(b'not a pdf')
+    texts = text_extraction.extract_texts([good, str(tmp_path / 'broken.pdf')])
+    assert texts[good] == "Claim one" and isinstance(texts[str(tmp_path / 'broken.pdf')], ValueError)
+
+
+def test_document_crews_read_through_the_shared_extractor(tmp_path):
+    from agents.claims_processor.crew import ClaimsProcessor
+    from agents.contract_summarizer_agent.crew import ContractSummarizer
+    from agents.document_processor.crew import DocumentProcessor
+    rules = pdf(tmp_path / 'rules.pdf', ["Rule  #1"])
+    claim = pdf(tmp_path / 'claim.pdf', ["Claim  #7"])
+    inputs = ClaimsProcessor().preprocess_inputs({'rules_document': rules, 'claims_document': claim})
+    assert (inputs['rules_text'], inputs['claims_text']) == ("Rule 1", "Claim 7")
+    assert ContractSummarizer().preprocess_inputs({'contract_file': claim})['contract_text'] == "Claim #7"
+    assert DocumentProcessor().preprocess_inputs({'document_file': claim})['document_text'] == "Claim #7"
+    # all three were served from one cache entry per document and normalizer
+    assert len(text_extraction.get_text_cache()) == 3
@@ -0,0 +1,36 @@
+import random
+import re
+import pytest
+from utils.text_normalize import clean_text, normalize_pages, normalize_whitespace
+
+
+def legacy_clean_text(text):
+    text = re.sub(r"[^\S\r\n]+", " ", text)
+    text = re.sub(r"\s*\n\s*", "\n", text)
+    text = re.sub(r"[^\w\s.,;:'\"!?()-]", "", text)
+    return text.strip()
+
+
+@pytest.mark.parametrize("text", [
+    "a\x0cb", "a\rb", "x\u2028y", "x\u2029y", "a \r b\nc", "a\r\nb", "a\r\n\r\nb", "a\x1cb\x1dc\x1ed\x85e",
+    "page one\x0c\x0cpage two", "  lead\n\n\n trail  ", "a\t\tb  #c\n\n$d", "\r", "a \r", "",
+])
+def test_clean_text_matches_the_legacy_regex_passes(text):
+    assert clean_text(text) == legacy_clean_text(text)
+
+
+def test_clean_text_matches_the_legacy_regex_passes_on_random_text():
+    alphabet = "ab .,#$\t \n\r\x0b\x0c\x1c\x1d\x1e\x85  \xa0\u2028"
+    generator = random.Random(14)
+    for _ in range(2000):
+        text = "".join(generator.choice(alphabet) for _ in range(generator.randint(0, 24)))
+        assert clean_text(text) == legacy_clean_text(text), repr(text)
+
+
+def test_normalize_whitespace_keeps_line_breaks_between_words():
+    assert normalize_whitespace("  one   two \n\n\tthree\x0cfour\n") == "one two\nthree four"
+
+
+def test_normalize_pages_skips_pages_without_text():
+    assert list(normalize_pages(["a  b", " \n ", "c"])) == ["a b", "c"]
+
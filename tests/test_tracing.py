@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+from tests.conftest import API_DIR
+
+# the tracer provider can only be installed once per process, so the server is imported in a fresh one
+PROBE = """
+import server
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from crewai.telemetry import Telemetry
+from utils import images
+with images.tracer.start_as_current_span('probe'):
+    pass
+TestClient(server.app).get('/health')
+getattr(trace.get_tracer_provider(), 'force_flush', lambda: None)()
+print(Telemetry().ready)
+"""
+
+
+def run_probe(tmp_path, **settings):
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('CREWAI_DISABLE_TELEMETRY', 'OTEL_SDK_DISABLED', 'TRACE_EXPORTER')}
+    env.update(PYTHONPATH=API_DIR, TRACE_FILE=str(tmp_path / 'traces.jsonl'), **settings)
+    return subprocess.run([sys.executable, '-c', PROBE], cwd=API_DIR, env=env, capture_output=True, text=True, timeout=300)
+
+
+def test_spans_reach_the_file_exporter_with_default_settings(tmp_path):
+    probe = run_probe(tmp_path)
+    assert probe.returncode == 0, probe.stderr
+    # crewai's own telemetry stays off, so its collector never sees our spans
+    assert probe.stdout.strip().splitlines()[-1] == 'False'
+    with open(tmp_path / 'traces.jsonl', encoding='utf-8') as f:
+        spans = [json.loads(line) for line in f]
+    names = {span['name'] for span in spans}
+    assert 'probe' in names and 'GET /health' in names
+    assert all(span['resource']['attributes']['service.name'] == 'crewai-api' for span in spans)
+
+
+def test_nothing_is_exported_when_tracing_is_off(tmp_path):
+    probe = run_probe(tmp_path, TRACE_EXPORTER='none', CREWAI_DISABLE_TELEMETRY='true')
+    assert probe.returncode == 0, probe.stderr
+    assert not (tmp_path / 'traces.jsonl').exists()
+
+
+def overlapping_calls(wrapper, usages):
+    """
+    Two LLM calls through wrapper: model-b starts and records its usage while
+    model-a is in flight, then model-a completes while model-b is still open.
+    Callbacks are delivered as crewai and litellm do: to the call's own list
+    in its thread, and from a thread of litellm's to the process-wide list,
+    which holds whichever call set it last.
+    """
+    import threading
+    from types import SimpleNamespace
+    shared = []
+    first_started, second_started, first_done = threading.Event(), threading.Event(), threading.Event()
+
+    def inner(llm, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        if llm.model == 'model-b':
+            assert first_started.wait(5)
+        shared[:] = callbacks
+        if llm.model == 'model-a':
+            first_started.set()
+            assert second_started.wait(5)
+        usage = SimpleNamespace(prompt_tokens=usages[llm.model][0], completion_tokens=usages[llm.model][1], prompt_tokens_details=None)
+        logger = threading.Thread(target=lambda: [callback.log_success_event({}, {"usage": usage}, None, None) for callback in list(shared)])
+        logger.start()
+        logger.join()
+        for callback in callbacks:
+            callback.log_success_event({}, {"usage": usage}, None, None)
+        if llm.model == 'model-b':
+            second_started.set()
+            assert first_done.wait(5)
+        return "answer"
+
+    def call(model):
+        wrapper(SimpleNamespace(model=model, stream=False), "hello")
+        if model == 'model-a':
+            first_done.set()
+
+    return inner, call
+
+
+def test_overlapping_llm_calls_keep_their_own_token_usage(monkeypatch):
+    import threading
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from utils import tracing
+    monkeypatch.setenv('OTEL_SDK_DISABLED', 'false')
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, 'tracer', provider.get_tracer('tests'))
+    inner, call = overlapping_calls(tracing.traced_call, {'model-a': (100, 10), 'model-b': (7, 3)})
+    monkeypatch.setattr(tracing, 'innerCall', inner)
+    first = threading.Thread(target=call, args=('model-a',))
+    first.start()
+    call('model-b')
+    first.join(5)
+    usage = {span.name: (span.attributes["gen_ai.usage.input_tokens"], span.attributes["gen_ai.usage.output_tokens"])
+             for span in exporter.get_finished_spans()}
+    assert usage == {'llm model-a': (100, 10), 'llm model-b': (7, 3)}
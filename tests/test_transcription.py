@@ -0,0 +1,66 @@
+import asyncio
+import io
+import os
+import wave
+import pytest
+from utils import transcription
+
+
+def write_wav(path, seconds=0.2, rate=16000):
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(os.urandom(2*int(rate*seconds)))
+    return str(path)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcription, 'TRANSCRIPT_CACHE_DIR', str(tmp_path / 'transcripts'))
+    monkeypatch.setattr(transcription, 'transcriptCache', None)
+    return tmp_path
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    state = {"calls": [], "in_flight": 0, "peak": 0, "fail": set()}
+
+    async def request_transcript(client, audio):
+        state["calls"].append(audio[0])
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.05)
+        state["in_flight"] -= 1
+        if len(audio[1]) in state["fail"]:
+            raise RuntimeError("upstream error")
+        return f"transcript of {len(audio[1])} bytes"
+
+    monkeypatch.setattr(transcription, 'request_transcript', request_transcript)
+    return state
+
+
+def test_transcripts_keep_file_order_and_are_cached(cache_dir, requests):
+    paths = [write_wav(cache_dir / f'{number}.wav', seconds=0.1*(number+1)) for number in range(3)]
+    first = transcription.transcribe_files(paths)
+    assert len(requests["calls"]) == 3
+    assert len(set(first)) == 3 and first == sorted(first, key=lambda text: int(text.split()[2]))
+    assert transcription.transcribe_files(paths) == first
+    assert len(requests["calls"]) == 3
+
+
+def test_no_more_than_the_configured_requests_run_at_once(cache_dir, requests, monkeypatch):
+    monkeypatch.setattr(transcription, 'TRANSCRIBE_CONCURRENCY', 2)
+    paths = [write_wav(cache_dir / f'{number}.wav') for number in range(5)]
+    transcription.transcribe_files(paths)
+    assert len(requests["calls"]) == 5 and requests["peak"] == 2
+
+
+def test_a_failed_clip_is_reported_in_place_and_retried_next_time(cache_dir, requests):
+    good, bad = write_wav(cache_dir / 'good.wav', seconds=0.1), write_wav(cache_dir / 'bad.wav', seconds=0.3)
+    from utils.audio import preprocess_audio
+    requests["fail"].add(len(preprocess_audio(bad)[1]))
+    texts = transcription.transcribe_files([good, bad])
+    assert texts[0].startswith("transcript of") and texts[1] == "An error occurred during transcription: upstream error"
+    transcription.transcribe_files([good, bad])
+    assert requests["calls"].count("bad.wav") == 2 and requests["calls"].count("good.wav") == 1
@@ -0,0 +1,67 @@
+import io
+import os
+import zipfile
+import pytest
+from fastapi import HTTPException
+from utils.uploads import copy_stream, extract_archive
+
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def test_member_names_never_become_paths(tmp_path):
+    folder = tmp_path / 'out'
+    folder.mkdir()
+    archive = make_zip(tmp_path / 'evil.zip', {
+        '../../escaped.txt': b'outside',
+        '/etc/absolute.txt': b'absolute',
+        'docs/report.pdf': b'%PDF-1.4',
+    })
+    saved = extract_archive(archive, str(folder), ('.pdf', '.txt'))
+    assert sorted(name for _, name in saved) == ['absolute.txt', 'escaped.txt', 'report.pdf']
+    for path, _ in saved:
+        assert os.path.dirname(os.path.abspath(path)) == str(folder)
+    assert not (tmp_path / 'escaped.txt').exists()
+    assert sorted(os.listdir(folder)) == sorted(os.path.basename(path) for path, _ in saved)
+
+
+def test_only_wanted_extensions_are_unpacked(tmp_path):
+    archive = make_zip(tmp_path / 'mixed.zip', {'a.pdf': b'1', 'b.exe': b'2', 'dir/': b'', 'c.TXT': b'3'})
+    saved = extract_archive(archive, str(tmp_path), ('.pdf', '.txt'))
+    assert sorted(name for _, name in saved) == ['a.pdf', 'c.TXT']
+
+
+def test_too_many_members_are_refused(tmp_path):
+    archive = make_zip(tmp_path / 'many.zip', {f'{number}.txt': b'x' for number in range(3)})
+    with pytest.raises(HTTPException) as raised:
+        extract_archive(archive, str(tmp_path), ('.txt',), max_files=2)
+    assert raised.value.status_code == 413
+
+
+def test_an_oversized_member_removes_everything_unpacked(tmp_path):
+    folder = tmp_path / 'out'
+    folder.mkdir()
+    archive = make_zip(tmp_path / 'big.zip', {'a.txt': b'small', 'b.txt': b'x' * 100})
+    with pytest.raises(HTTPException) as raised:
+        extract_archive(archive, str(folder), ('.txt',), max_bytes=10)
+    assert raised.value.status_code == 413
+    assert os.listdir(folder) == []
+
+
+def test_a_broken_archive_is_a_bad_request(tmp_path):
+    broken = tmp_path / 'broken.zip'
+    broken.write_bytes(b'not a zip')
+    with pytest.raises(HTTPException) as raised:
+        extract_archive(str(broken), str(tmp_path), ('.txt',))
+    assert raised.value.status_code == 400
+
+
+def test_copy_stream_hashes_what_it_writes(tmp_path):
+    path = str(tmp_path / 'copy.bin')
+    saved = copy_stream(io.BytesIO(b'hello'), path, 10)
+    assert saved.size == 5
+    assert saved.digest == '2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824'
@@ -0,0 +1,73 @@
+import sys
+from utils import warmup
+
+
+def lazy_modules(monkeypatch, tmp_path, **sources):
+    for name, source in sources.items():
+        (tmp_path / f"{name}.py").write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(warmup, 'lazyClasses', [])
+    monkeypatch.setattr(warmup, 'moduleTimes', {})
+    for name in sources:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+
+def test_a_lazy_class_imports_its_module_on_first_use_only(monkeypatch, tmp_path):
+    lazy_modules(monkeypatch, tmp_path, lazy_crew_a="class Crew:\n    def __init__(self, name):\n        self.name = name\n")
+    loads = []
+    crew = warmup.LazyClass('lazy_crew_a:Crew', on_load=loads.append)
+    assert 'lazy_crew_a' not in sys.modules
+    first = crew('first')
+    second = crew('second')
+    assert (first.name, second.name) == ('first', 'second')
+    assert type(first) is type(second)
+    assert loads == [type(first)]
+    assert list(warmup.moduleTimes) == ['lazy_crew_a']
+
+
+def test_warmup_loads_every_crew_and_records_failures(monkeypatch, tmp_path):
+    lazy_modules(monkeypatch, tmp_path,
+                 lazy_crew_b="class Crew:\n    pass\n",
+                 lazy_crew_c="raise ImportError('missing dependency')\n")
+    monkeypatch.setattr(warmup, 'AGENT_WARMUP', True)
+    good = warmup.LazyClass('lazy_crew_b:Crew')
+    warmup.LazyClass('lazy_crew_c:Crew')
+    after = []
+    agents = warmup.Warmup()
+    assert agents.status()["loaded"] == 0
+    agents.start(after=lambda: after.append(True))
+    agents.thread.join(10)
+    status = agents.status()
+    assert after == [True]
+    assert good.loaded is not None
+    assert status["loaded"] == 1 and status["agents"] == 2
+    assert status["warm"] is False
+    assert status["errors"] == {'lazy_crew_c': 'missing dependency'}
+    assert status["warmup_seconds"] is not None
+
+
+def test_without_warmup_crews_stay_unloaded_until_used(monkeypatch, tmp_path):
+    lazy_modules(monkeypatch, tmp_path, lazy_crew_d="class Crew:\n    pass\n")
+    monkeypatch.setattr(warmup, 'AGENT_WARMUP', False)
+    crew = warmup.LazyClass('lazy_crew_d:Crew')
+    agents = warmup.Warmup()
+    agents.start()
+    assert agents.thread is None
+    assert agents.status()["warm"] is False
+    crew()
+    assert agents.status()["warm"] is True
+
+
+def test_the_readiness_probe_fails_until_every_crew_is_loaded(monkeypatch, tmp_path):
+    import server
+    from fastapi.testclient import TestClient
+    lazy_modules(monkeypatch, tmp_path, lazy_crew_e="class Crew:\n    pass\n")
+    crew = warmup.LazyClass('lazy_crew_e:Crew')
+    monkeypatch.setattr(server, 'agentWarmup', warmup.Warmup())
+    client = TestClient(server.app)
+    assert client.get('/health').status_code == 200
+    assert client.get('/ready').status_code == 503
+    crew.load()
+    response = client.get('/ready')
+    assert response.status_code == 200
+    assert response.json()["loaded"] == 1